@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Compares the wall time of "python3 -m sys_detection" with and without the persistent on-disk cache.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import Dict, List
+
+
+def time_cli_runs(extra_args: List[str], env: Dict[str, str], num_runs: int) -> List[float]:
+    cmd = [sys.executable, '-m', 'sys_detection'] + extra_args
+    times: List[float] = []
+    for _ in range(num_runs):
+        start_time = time.perf_counter()
+        subprocess.check_call(cmd, env=env, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start_time)
+    return times
+
+
+def report(label: str, times: List[float]) -> None:
+    print('%-8s runs=%d mean=%.2f ms median=%.2f ms min=%.2f ms' % (
+        label,
+        len(times),
+        statistics.mean(times) * 1000,
+        statistics.median(times) * 1000,
+        min(times) * 1000))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--runs', type=int, default=30, help='Number of runs per mode.')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='sys_detection_bench_') as cache_home:
+        env = dict(os.environ)
+        env.pop('SYS_DETECTION_CACHE', None)
+        env['XDG_CACHE_HOME'] = cache_home
+
+        cold_times = time_cli_runs([], env, args.runs)
+        # Populate the cache before measuring cached runs.
+        time_cli_runs(['--cache'], env, 1)
+        cached_times = time_cli_runs(['--cache'], env, args.runs)
+
+    report('cold', cold_times)
+    report('cached', cached_times)
+    print('speedup (median): %.2fx' % (
+        statistics.median(cold_times) / statistics.median(cached_times)))
+
+
+if __name__ == '__main__':
+    main()
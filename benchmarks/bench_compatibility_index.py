@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Compares selecting the prebuilt archives compatible with a target operating system using
+CompatibilityIndex with calling is_compatible_os for every archive.
+"""
+
+import argparse
+import random
+import time
+
+from typing import List, Tuple
+
+from sys_detection.os_compatibility import CompatibilityIndex, is_compatible_os
+
+
+OS_AND_VERSIONS = [
+    'almalinux8', 'almalinux9', 'centos7', 'centos8', 'ol7', 'ol8', 'rhel9', 'rocky8', 'rocky9',
+    'ubuntu18.04', 'ubuntu20.04', 'ubuntu22.04', 'debian10', 'debian11', 'alpine3.14', 'amzn2',
+    'fedora35', 'macos', 'opensuse-leap15.3', 'arch',
+]
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--entries', type=int, default=100000, help='Catalog size.')
+    arg_parser.add_argument('--targets', type=int, default=20, help='Number of lookups.')
+    args = arg_parser.parse_args()
+
+    rng = random.Random(42)
+    entries: List[Tuple[str, str]] = []
+    for i in range(args.entries):
+        os_and_version = rng.choice(OS_AND_VERSIONS)
+        entries.append((os_and_version, 'thirdparty-%d-%s-x86_64.tar.gz' % (i, os_and_version)))
+    targets = [rng.choice(OS_AND_VERSIONS) for _ in range(args.targets)]
+
+    start_time = time.perf_counter()
+    pairwise_results = [
+        [item for os_and_version, item in entries if is_compatible_os(os_and_version, target)]
+        for target in targets
+    ]
+    pairwise_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    index: CompatibilityIndex[str] = CompatibilityIndex()
+    index.add_all(entries)
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    index_results = [list(index.find_compatible(target)) for target in targets]
+    lookup_time = time.perf_counter() - start_time
+
+    assert pairwise_results == index_results
+    print('entries: %d, targets: %d' % (len(entries), len(targets)))
+    print('pairwise:     %10.2f ms total, %10.3f ms per target' % (
+        pairwise_time * 1000, pairwise_time * 1000 / len(targets)))
+    print('index build:  %10.2f ms' % (build_time * 1000))
+    print('index lookup: %10.2f ms total, %10.3f ms per target' % (
+        lookup_time * 1000, lookup_time * 1000 / len(targets)))
+
+
+if __name__ == '__main__':
+    main()
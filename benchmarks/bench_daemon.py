@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Compares the latency of a request to the detection server with the wall time of a cold start of
+"python3 -m sys_detection", and of the same command acting as a thin client of the server.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import Dict, List
+
+from sys_detection.daemon import query
+
+
+def time_cli_runs(extra_args: List[str], env: Dict[str, str], num_runs: int) -> List[float]:
+    cmd = [sys.executable, '-m', 'sys_detection'] + extra_args
+    times: List[float] = []
+    for _ in range(num_runs):
+        start_time = time.perf_counter()
+        subprocess.check_call(cmd, env=env, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start_time)
+    return times
+
+
+def time_requests(socket_path: str, num_requests: int) -> List[float]:
+    times: List[float] = []
+    for _ in range(num_requests):
+        start_time = time.perf_counter()
+        response = query(socket_path, dict(fields=['id_for_packaging']))
+        times.append(time.perf_counter() - start_time)
+        assert response is not None and 'values' in response, response
+    return times
+
+
+def wait_for_server(socket_path: str, timeout_sec: float) -> None:
+    deadline = time.monotonic() + timeout_sec
+    while time.monotonic() < deadline:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+                client_socket.connect(socket_path)
+                return
+        except OSError:
+            time.sleep(0.01)
+    raise RuntimeError("The detection server did not start in %.1f seconds" % timeout_sec)
+
+
+def report(label: str, times: List[float]) -> None:
+    print('%-12s runs=%d mean=%.3f ms median=%.3f ms min=%.3f ms' % (
+        label,
+        len(times),
+        statistics.mean(times) * 1000,
+        statistics.median(times) * 1000,
+        min(times) * 1000))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--runs', type=int, default=30, help='Number of CLI runs per mode.')
+    arg_parser.add_argument(
+        '--requests', type=int, default=1000, help='Number of requests to the server.')
+    args = arg_parser.parse_args()
+
+    env = dict(os.environ)
+    env.pop('SYS_DETECTION_CACHE', None)
+    env.pop('SYS_DETECTION_SOCKET', None)
+
+    with tempfile.TemporaryDirectory(prefix='sys_detection_bench_') as tmp_dir:
+        socket_path = os.path.join(tmp_dir, 'sys-detection.sock')
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'sys_detection', 'serve', '--socket', socket_path], env=env)
+        try:
+            wait_for_server(socket_path, timeout_sec=10)
+            cold_times = time_cli_runs([], env, args.runs)
+            client_times = time_cli_runs(['--socket', socket_path], env, args.runs)
+            request_times = time_requests(socket_path, args.requests)
+        finally:
+            server.terminate()
+            server.wait()
+
+    report('cold CLI', cold_times)
+    report('client CLI', client_times)
+    report('request', request_times)
+    print('request speedup over cold CLI (median): %.0fx' % (
+        statistics.median(cold_times) / statistics.median(request_times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Measures aggregating a synthetic fleet inventory of several million reports, split into
+gzip-compressed shards, sequentially and with parallel worker processes. The reports are scan
+results of the directories of the test data corpus with varying root names and architectures.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+
+from typing import List
+
+from sys_detection.batch import scan_root
+from sys_detection.fleet import aggregate_files
+
+
+TEST_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'sys_detection_test', 'test_data')
+
+ARCHITECTURES = ['x86_64', 'aarch64']
+
+
+def get_report_templates() -> List[str]:
+    """
+    Returns report lines with a %d placeholder for the node number in the root path.
+    """
+    templates: List[str] = []
+    for dir_name in sorted(os.listdir(TEST_DATA_DIR)):
+        for architecture in ARCHITECTURES:
+            record = scan_root(
+                os.path.join(TEST_DATA_DIR, dir_name), architecture=architecture).to_dict()
+            record['root'] = '/nodes/node%d'
+            templates.append(json.dumps(record).replace('%', '%%').replace(
+                '/nodes/node%%d', '/nodes/node%d') + '\n')
+    return templates
+
+
+def write_shards(output_dir: str, num_lines: int, num_shards: int) -> List[str]:
+    templates = get_report_templates()
+    rng = random.Random(42)
+    shard_paths: List[str] = []
+    for shard_index in range(num_shards):
+        shard_path = os.path.join(output_dir, 'reports%d.jsonl.gz' % shard_index)
+        with gzip.open(shard_path, 'wt', compresslevel=1) as shard_file:
+            for node_index in range(shard_index, num_lines, num_shards):
+                shard_file.write(rng.choice(templates) % node_index)
+        shard_paths.append(shard_path)
+    return shard_paths
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        '--lines', type=int, default=2000000, help='Total number of reports.')
+    arg_parser.add_argument('--shards', type=int, default=8, help='Number of input files.')
+    arg_parser.add_argument(
+        '--jobs', type=int, default=os.cpu_count() or 1,
+        help='Number of worker processes for the parallel run. Default: the number of CPUs.')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start_time = time.perf_counter()
+        shard_paths = write_shards(tmp_dir, args.lines, args.shards)
+        print('reports: %d in %d shards, %d compressed bytes, generated in %.1f s' % (
+            args.lines, args.shards, sum(os.path.getsize(path) for path in shard_paths),
+            time.perf_counter() - start_time))
+
+        results = []
+        for jobs in sorted({1, args.jobs}):
+            start_time = time.perf_counter()
+            results.append(aggregate_files(shard_paths, jobs=jobs))
+            elapsed_time = time.perf_counter() - start_time
+            print('jobs=%-3d %.2f s, %.0f reports/s' % (
+                jobs, elapsed_time, args.lines / elapsed_time))
+        assert all(result == results[0] for result in results)
+        print('distinct identifiers: %d' % len(results[0].histograms['id_for_packaging']))
+
+
+if __name__ == '__main__':
+    main()
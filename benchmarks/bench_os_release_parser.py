@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Compares the dedicated os-release parser with the previous shlex-based implementation over the
+os-release files in the test data corpus. File contents are read into memory up front, so only
+parsing is measured.
+"""
+
+import argparse
+import glob
+import os
+import shlex
+import timeit
+
+from typing import Dict, List
+
+from sys_detection.os_release_parser import parse_os_release
+
+
+TEST_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'sys_detection_test', 'test_data')
+
+
+def parse_os_release_with_shlex(text: str) -> Dict[str, str]:
+    result: Dict[str, str] = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        items = line.split('=', 1)
+        tokens = list(shlex.shlex(items[1], posix=True))
+        result[items[0].lower()] = tokens[0] if len(tokens) == 1 else items[1]
+    return result
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        '--iterations', type=int, default=200,
+        help='Number of passes over the corpus per measurement.')
+    args = arg_parser.parse_args()
+
+    corpus: List[bytes] = []
+    for file_path in sorted(glob.glob(os.path.join(TEST_DATA_DIR, '*', 'etc', 'os-release'))):
+        with open(file_path, 'rb') as input_file:
+            corpus.append(input_file.read())
+
+    def run_shlex() -> None:
+        for data in corpus:
+            parse_os_release_with_shlex(data.decode('utf-8'))
+
+    def run_parser() -> None:
+        for data in corpus:
+            parse_os_release(data)
+
+    num_files = len(corpus) * args.iterations
+    shlex_time = min(timeit.repeat(run_shlex, number=args.iterations, repeat=5))
+    parser_time = min(timeit.repeat(run_parser, number=args.iterations, repeat=5))
+    print('corpus: %d files, %d bytes' % (len(corpus), sum(len(data) for data in corpus)))
+    print('shlex:  %.2f us/file' % (shlex_time / num_files * 1e6))
+    print('parser: %.2f us/file' % (parser_time / num_files * 1e6))
+    print('speedup: %.1fx' % (shlex_time / parser_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Measures the throughput of PackagingIdParser.parse_many over a synthetic bucket listing.
+"""
+
+import argparse
+import random
+import time
+
+from typing import List
+
+from sys_detection.packaging_id import KNOWN_ARCHITECTURES, PackagingIdParser
+
+
+OS_AND_VERSIONS = [
+    'almalinux8', 'centos7', 'centos8', 'ol8', 'rocky9', 'ubuntu18.04', 'ubuntu20.04',
+    'ubuntu22.04', 'debian11', 'alpine3.14', 'amzn2', 'fedora35', 'macos', 'opensuse-leap15.3',
+    'arch',
+]
+
+MID_PARTS = ['', '-clang11', '-clang12', '-gcc9', '-gcc11', '-clang12-lto', '-gcc9-asan']
+
+
+def generate_listing(num_lines: int, invalid_fraction: float) -> List[str]:
+    rng = random.Random(42)
+    lines: List[str] = []
+    for i in range(num_lines):
+        if rng.random() < invalid_fraction:
+            lines.append('README-%d.txt\n' % i)
+            continue
+        lines.append('%s%s-%s\n' % (
+            rng.choice(OS_AND_VERSIONS), rng.choice(MID_PARTS), rng.choice(KNOWN_ARCHITECTURES)))
+    return lines
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--lines', type=int, default=1000000, help='Listing size.')
+    arg_parser.add_argument(
+        '--invalid-fraction', type=float, default=0.05,
+        help='Fraction of lines that are not packaging identifiers.')
+    args = arg_parser.parse_args()
+
+    lines = generate_listing(args.lines, args.invalid_fraction)
+    parser = PackagingIdParser()
+
+    start_time = time.perf_counter()
+    num_parsed = 0
+    for _ in parser.parse_many(lines):
+        num_parsed += 1
+    elapsed_time = time.perf_counter() - start_time
+
+    print('lines: %d, parsed: %d' % (len(lines), num_parsed))
+    print('elapsed: %.2f s, throughput: %.0f lines/s, %.3f us/line' % (
+        elapsed_time, len(lines) / elapsed_time, elapsed_time / len(lines) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
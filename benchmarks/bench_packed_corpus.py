@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Measures detecting the configurations of a large synthetic fleet of root directories, each a copy
+of a directory of the test data corpus, in-process through a memory-mapped packed archive, through
+an in-memory DictFileProvider, and from directories on disk.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from typing import Dict, List, Optional
+
+from sys_detection import SysConfiguration
+from sys_detection.file_provider import DictFileProvider, FileProvider
+from sys_detection.packed_archive import PackedArchive, write_packed_archive
+
+
+TEST_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'sys_detection_test', 'test_data')
+
+ETC_FILE_NAMES = ['os-release', 'redhat-release']
+
+
+def read_corpus() -> List[Dict[str, bytes]]:
+    """
+    Returns the release files of every directory of the corpus that contains etc/os-release.
+    """
+    corpus: List[Dict[str, bytes]] = []
+    for dir_name in sorted(os.listdir(TEST_DATA_DIR)):
+        etc_dir = os.path.join(TEST_DATA_DIR, dir_name, 'etc')
+        if not os.path.isfile(os.path.join(etc_dir, 'os-release')):
+            continue
+        etc_files: Dict[str, bytes] = {}
+        for file_name in ETC_FILE_NAMES:
+            file_path = os.path.join(etc_dir, file_name)
+            if os.path.isfile(file_path):
+                with open(file_path, 'rb') as input_file:
+                    etc_files[file_name] = input_file.read()
+        corpus.append(etc_files)
+    return corpus
+
+
+def make_fleet(corpus: List[Dict[str, bytes]], num_roots: int) -> Dict[str, bytes]:
+    return {
+        'root%06d/etc/%s' % (root_index, file_name): data
+        for root_index in range(num_roots)
+        for file_name, data in corpus[root_index % len(corpus)].items()
+    }
+
+
+def detect_fleet(
+        num_roots: int,
+        file_provider: Optional[FileProvider],
+        base_dir: str = '') -> float:
+    """
+    Detects the configurations of all roots and returns the time per root, in microseconds.
+    """
+    start_time = time.perf_counter()
+    for root_index in range(num_roots):
+        SysConfiguration.from_etc_dir(
+            'Linux', 'x86_64', os.path.join(base_dir, 'root%06d' % root_index, 'etc'),
+            file_provider=file_provider)
+    return (time.perf_counter() - start_time) / num_roots * 1e6
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        '--roots', type=int, default=100000, help='Number of synthetic root directories.')
+    arg_parser.add_argument(
+        '--disk-roots', type=int, default=5000,
+        help='Number of root directories to create on disk for comparison, 0 to skip.')
+    args = arg_parser.parse_args()
+
+    corpus = read_corpus()
+    fleet = make_fleet(corpus, args.roots)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive_path = os.path.join(tmp_dir, 'fleet.pack')
+        start_time = time.perf_counter()
+        write_packed_archive(sorted(fleet.items()), archive_path)
+        print('roots: %d, files: %d, archive: %d bytes, written in %.2f s' % (
+            args.roots, len(fleet), os.path.getsize(archive_path),
+            time.perf_counter() - start_time))
+
+        start_time = time.perf_counter()
+        with PackedArchive(archive_path) as archive:
+            print('archive opened in %.2f ms' % ((time.perf_counter() - start_time) * 1000))
+            print('packed archive: %.2f us/root' % detect_fleet(args.roots, archive))
+        print('dict provider:  %.2f us/root' % detect_fleet(
+            args.roots, DictFileProvider(fleet)))
+
+        if args.disk_roots:
+            disk_dir = os.path.join(tmp_dir, 'roots')
+            for path, data in make_fleet(corpus, args.disk_roots).items():
+                file_path = os.path.join(disk_dir, path)
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with open(file_path, 'wb') as output_file:
+                    output_file.write(data)
+            print('directories:    %.2f us/root (%d roots)' % (
+                detect_fleet(args.disk_roots, None, disk_dir), args.disk_roots))
+
+
+if __name__ == '__main__':
+    main()
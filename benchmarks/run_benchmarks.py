@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Runs the benchmark suite over every directory of the test data corpus and prints the results as
+JSON. With --compare, also checks the results against a baseline produced by an earlier run, and
+exits with a non-zero status if any metric regressed by more than the allowed threshold.
+
+Example:
+    benchmarks/run_benchmarks.py --output baseline.json
+    # ... make changes ...
+    benchmarks/run_benchmarks.py --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+from typing import Any, Callable, Dict, List, Tuple
+
+from sys_detection import OsReleaseVars, SysConfiguration
+
+
+TEST_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'sys_detection_test', 'test_data')
+
+RESULTS_FORMAT_VERSION = 1
+
+
+def get_etc_dirs() -> List[str]:
+    etc_dirs: List[str] = []
+    for dir_name in sorted(os.listdir(TEST_DATA_DIR)):
+        etc_dir = os.path.join(TEST_DATA_DIR, dir_name, 'etc')
+        if os.path.isfile(os.path.join(etc_dir, 'os-release')):
+            etc_dirs.append(etc_dir)
+    return etc_dirs
+
+
+def time_per_item_us(func: Callable[[], Any], num_items: int, repeat: int, number: int) -> float:
+    """
+    Returns the best observed time, in microseconds, per item processed by one call of func.
+    """
+    best_time = min(timeit.repeat(func, repeat=repeat, number=number))
+    return best_time / number / num_items * 1e6
+
+
+def time_cli_cold_start_ms(num_runs: int) -> float:
+    env = dict(os.environ)
+    env.pop('SYS_DETECTION_CACHE', None)
+    times: List[float] = []
+    for _ in range(num_runs):
+        start_time = time.perf_counter()
+        subprocess.check_call(
+            [sys.executable, '-m', 'sys_detection'], env=env, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start_time)
+    return min(times) * 1000
+
+
+def run_benchmarks(quick: bool) -> Dict[str, Tuple[float, str]]:
+    repeat = 3 if quick else 7
+    number = 5 if quick else 50
+    etc_dirs = get_etc_dirs()
+    os_release_paths = [os.path.join(etc_dir, 'os-release') for etc_dir in etc_dirs]
+    sys_confs = [
+        SysConfiguration.from_etc_dir('Linux', 'x86_64', etc_dir) for etc_dir in etc_dirs
+    ]
+
+    def read_files() -> None:
+        for path in os_release_paths:
+            OsReleaseVars.read_file(path)
+
+    def detect_from_etc_dirs() -> None:
+        for etc_dir in etc_dirs:
+            SysConfiguration.from_etc_dir('Linux', 'x86_64', etc_dir)
+
+    # SysConfiguration caches the short OS name and version, which both of the following use.
+    # Resetting the cached value before every call measures the computation rather than the cache.
+    def compute_short_os_names_and_versions() -> None:
+        for sys_conf in sys_confs:
+            object.__setattr__(sys_conf, '_short_os_name_and_version', None)
+            sys_conf.short_os_name_and_version()
+
+    def compute_ids_for_packaging() -> None:
+        for sys_conf in sys_confs:
+            object.__setattr__(sys_conf, '_short_os_name_and_version', None)
+            sys_conf.id_for_packaging()
+
+    num_items = len(etc_dirs)
+    return {
+        'os_release_vars.read_file': (
+            time_per_item_us(read_files, num_items, repeat, number), 'us'),
+        'sys_configuration.from_etc_dir': (
+            time_per_item_us(detect_from_etc_dirs, num_items, repeat, number), 'us'),
+        'sys_configuration.short_os_name_and_version': (
+            time_per_item_us(compute_short_os_names_and_versions, num_items, repeat, number * 10),
+            'us'),
+        'sys_configuration.id_for_packaging': (
+            time_per_item_us(compute_ids_for_packaging, num_items, repeat, number * 10), 'us'),
+        'cli.cold_start': (time_cli_cold_start_ms(5 if quick else 20), 'ms'),
+    }
+
+
+def compare(
+        results: Dict[str, Any],
+        baseline: Dict[str, Any],
+        threshold: float) -> List[str]:
+    """
+    Compares results with a baseline, prints a report, and returns the names of metrics that
+    regressed by more than the given fraction.
+    """
+    regressions: List[str] = []
+    for name, metric in sorted(results['metrics'].items()):
+        baseline_metric = baseline['metrics'].get(name)
+        if baseline_metric is None:
+            print('%-45s %10.3f %-2s (no baseline)' % (name, metric['value'], metric['unit']),
+                  file=sys.stderr)
+            continue
+        ratio = metric['value'] / baseline_metric['value']
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(name)
+        print('%-45s %10.3f %-2s baseline %10.3f %-2s %+7.1f%%%s' % (
+            name, metric['value'], metric['unit'],
+            baseline_metric['value'], baseline_metric['unit'],
+            (ratio - 1) * 100,
+            '  REGRESSION' if regressed else ''), file=sys.stderr)
+    return regressions
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--output', help='Write the JSON results to this file.')
+    arg_parser.add_argument('--compare', metavar='BASELINE', help='Baseline JSON file.')
+    arg_parser.add_argument(
+        '--threshold', type=float, default=0.2,
+        help='Maximum allowed slowdown relative to the baseline, as a fraction. Default: 0.2.')
+    arg_parser.add_argument(
+        '--quick', action='store_true', help='Use fewer iterations, for a rough estimate.')
+    args = arg_parser.parse_args()
+
+    results = dict(
+        version=RESULTS_FORMAT_VERSION,
+        python=platform.python_version(),
+        machine=platform.machine(),
+        metrics={
+            name: dict(value=value, unit=unit)
+            for name, (value, unit) in run_benchmarks(args.quick).items()
+        })
+    results_json = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(results_json + '\n')
+    else:
+        print(results_json)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print('Regressed by more than %.0f%%: %s' % (
+                args.threshold * 100, ', '.join(regressions)), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+Packs the test data corpus in tests/sys_detection_test/test_data into a single archive that is read
+through mmap by sys_detection.packed_archive.PackedArchive, e.g. to detect the configurations of
+all directories of the corpus without opening hundreds of files.
+
+With --synthetic-roots, the archive instead contains the given number of root directories, named
+root000000, root000001, etc., each a copy of one of the directories of the corpus, for load tests.
+Identical file contents are only stored once, so the size of the archive is dominated by its
+index.
+"""
+
+import argparse
+import itertools
+import os
+import sys
+
+from typing import Iterator, List, Optional, Tuple
+
+from sys_detection.packed_archive import iter_dir_files, write_packed_archive
+
+
+TEST_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'sys_detection_test', 'test_data')
+
+
+def iter_synthetic_roots(
+        files: List[Tuple[str, bytes]], num_roots: int) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yields the files of the given number of root directories, cycling through the top-level
+    directories of the given files that contain etc/os-release.
+    """
+    files_by_dir_name = {
+        dir_name: [(path.split('/', 1)[1], data) for path, data in dir_files]
+        for dir_name, dir_files in itertools.groupby(files, key=lambda item: item[0].split('/')[0])
+    }
+    dir_names = sorted(
+        dir_name for dir_name, dir_files in files_by_dir_name.items()
+        if any(relative_path == 'etc/os-release' for relative_path, _ in dir_files))
+    for root_index in range(num_roots):
+        root_name = 'root%06d' % root_index
+        for relative_path, data in files_by_dir_name[dir_names[root_index % len(dir_names)]]:
+            yield root_name + '/' + relative_path, data
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        '--test-data-dir',
+        default=TEST_DATA_DIR,
+        help='Directory to pack. Default: %(default)s.')
+    arg_parser.add_argument(
+        '--output',
+        required=True,
+        help='Path of the archive to write.')
+    arg_parser.add_argument(
+        '--synthetic-roots',
+        type=int,
+        metavar='N',
+        help='Pack N synthetic root directories copied from the directories of the corpus.')
+    args = arg_parser.parse_args(argv)
+
+    files = [(path, data) for path, data in iter_dir_files(args.test_data_dir) if '/' in path]
+    if args.synthetic_roots is not None:
+        num_files = write_packed_archive(
+            iter_synthetic_roots(files, args.synthetic_roots), args.output)
+    else:
+        num_files = write_packed_archive(files, args.output)
+    sys.stderr.write('Packed %d files into %s (%d bytes)\n' % (
+        num_files, args.output, os.path.getsize(args.output)))
+
+
+if __name__ == '__main__':
+    main()
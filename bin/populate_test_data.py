@@ -1,13 +1,28 @@
 #!/usr/bin/env python3
 
+"""
+Regenerates the test data corpus in tests/sys_detection_test/test_data by running a container of
+every image in VERSIONS_BY_OS and capturing its OS release files and libc version.
+
+Containers run concurrently. The digest of every image is recorded in a manifest, which is created
+on the first run, and images whose digest has not changed since the last run are skipped. Only
+files whose contents changed are written.
+"""
+
+import argparse
+import hashlib
+import json
 import os
 import subprocess
 import pathlib
 import sys
+import threading
 
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 
-from typing import Any, Dict, List, Union, Iterable
+from typing import Any, Dict, Generator, List, Optional, Union, Iterable, Tuple
 
 
 FILE_CONTENT_HEADER = '--- Contents of file: '
@@ -38,6 +53,39 @@ VERSIONS_BY_OS: Dict[str, Iterable[Union[int, str]]] = {
     'amazonlinux': ['latest', '2018.03', '2022'],
 }
 
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TEST_DATA_DIR = os.path.join(REPO_DIR, 'tests', 'sys_detection_test', 'test_data')
+
+# Maps every Docker image to the digest it had when the test data was last generated from it. It is
+# not checked in, and is created by the first run.
+DEFAULT_MANIFEST_PATH = os.path.join(
+    REPO_DIR, 'tests', 'sys_detection_test', 'test_data_manifest.json')
+
+DOCKER_ENV_VAR = 'DOCKER'
+
+CONTAINER_SCRIPT = f'''
+ldd --version >/tmp/libc_version.txt 2>&1
+files=$( ls /etc/*release* /etc/*version* )
+for file_path in $files /tmp/libc_version.txt; do
+  if [ -f $file_path ]; then
+    echo "{FILE_CONTENT_HEADER}$file_path"
+    cat "$file_path"
+    echo "{END_OF_FILE_HEADER}"
+  else
+    echo "{SPECIAL_MESSAGE_HEADER}File $file_path does not exist"
+  fi
+done
+'''
+
+print_lock = threading.Lock()
+
+
+def log(message: str) -> None:
+    with print_lock:
+        print(message)
+        sys.stdout.flush()
+
 
 def get_docker_image(os_name: str, os_version: Any) -> str:
     image_prefix = os_name
@@ -50,68 +98,205 @@ def get_docker_image(os_name: str, os_version: Any) -> str:
     return '%s:%s' % (image_prefix, os_version)
 
 
-def main() -> None:
-    test_data_dir = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-        'tests',
-        'sys_detection_test',
-        'test_data'
-    )
-    for os_name, os_versions in VERSIONS_BY_OS.items():
-        for os_version in os_versions:
-            docker_image = get_docker_image(os_name, os_version)
-            if os_version == 'latest':
-                output_dir_name = os_name
-            else:
-                output_dir_name = os_name + str(os_version)
-            output_dir = os.path.join(test_data_dir, output_dir_name)
-
-            print("Docker tag: %s" % docker_image)
-            output = subprocess.check_output([
-                'docker', 'run', '-it', docker_image,
-                'sh', '-c',
-                f'''
-                ldd --version >/tmp/libc_version.txt 2>&1
-                files=$( ls /etc/*release* /etc/*version* )
-                for file_path in $files /tmp/libc_version.txt; do
-                  if [ -f $file_path ]; then
-                    echo "{FILE_CONTENT_HEADER}$file_path"
-                    cat "$file_path"
-                    echo "{END_OF_FILE_HEADER}"
-                  else
-                    echo "{SPECIAL_MESSAGE_HEADER}File $file_path does not exist"
-                  fi
-                done
-                '''
-            ]).decode('utf-8')
-            file_path = None
-            lines_by_file = defaultdict(list)
-            messages = []
-            for line in output.split('\n'):
-                line = line.strip()
-                if line.startswith(FILE_CONTENT_HEADER):
-                    file_path = line[len(FILE_CONTENT_HEADER):]
-                elif line == END_OF_FILE_HEADER:
-                    file_path = None
-                elif line.startswith(SPECIAL_MESSAGE_HEADER):
-                    messages.append(line[len(SPECIAL_MESSAGE_HEADER):])
-                elif file_path is not None:
-                    lines_by_file[file_path].append(line)
-                elif (line.startswith('ls: cannot access') or
-                        line.endswith(': No such file or directory')):
-                    pass
-                elif line:
-                    raise ValueError("Unrecognized line: %s" % line)
-            if len(lines_by_file) == 0:
-                sys.stderr.write(output)
-                raise RuntimeError("No OS version files found for docker tag %s" % docker_image)
-            for file_path, lines in lines_by_file.items():
-                assert file_path.startswith('/')
-                full_path = os.path.join(output_dir, file_path[1:])
-                pathlib.Path(os.path.dirname(full_path)).mkdir(parents=True, exist_ok=True)
-                with open(full_path, 'w') as output_file:
-                    print("Writing file %s" % full_path)
-                    output_file.write('\n'.join(lines) + '\n')
+def get_output_dir_name(os_name: str, os_version: Any) -> str:
+    if os_version == 'latest':
+        return os_name
+    return os_name + str(os_version)
+
+
+class ContainerRunner:
+    """
+    Runs containers using a Docker-compatible command-line tool, e.g. docker or podman, or a fake
+    implementation in tests.
+    """
+    docker_cmd: str
+    pull: bool
+
+    def __init__(self, docker_cmd: str, pull: bool = True) -> None:
+        self.docker_cmd = docker_cmd
+        self.pull = pull
+
+    def get_image_digest(self, docker_image: str) -> str:
+        if self.pull:
+            subprocess.check_call(
+                [self.docker_cmd, 'pull', '--quiet', docker_image], stdout=subprocess.DEVNULL)
+        return subprocess.check_output(
+            [self.docker_cmd, 'image', 'inspect', '--format', '{{.Id}}', docker_image]
+        ).decode('utf-8').strip()
+
+    def run_script(self, docker_image: str, script: str) -> Generator[str, None, None]:
+        """
+        Runs the given shell script in a new container, and yields its standard output line by
+        line as it is produced. Standard error, e.g. warnings of the docker command itself, is not
+        captured. If the generator is closed before the output ends, e.g. because a line could not
+        be parsed, the process is killed.
+        """
+        process = subprocess.Popen(
+            [self.docker_cmd, 'run', '--rm', docker_image, 'sh', '-c', script],
+            stdout=subprocess.PIPE)
+        assert process.stdout is not None
+        completed = False
+        try:
+            with process.stdout:
+                for line_bytes in process.stdout:
+                    yield line_bytes.decode('utf-8', 'replace')
+            completed = True
+        finally:
+            if not completed:
+                process.kill()
+                process.wait()
+        return_code = process.wait()
+        if return_code != 0:
+            raise subprocess.CalledProcessError(return_code, process.args)
+
+
+class ContainerOutputParser:
+    """
+    Splits the output of CONTAINER_SCRIPT into the contents of individual files, one line at a
+    time.
+    """
+    file_path: Optional[str]
+    lines_by_file: Dict[str, List[str]]
+    messages: List[str]
+
+    def __init__(self) -> None:
+        self.file_path = None
+        self.lines_by_file = defaultdict(list)
+        self.messages = []
+
+    def feed_line(self, line: str) -> None:
+        line = line.strip()
+        if line.startswith(FILE_CONTENT_HEADER):
+            self.file_path = line[len(FILE_CONTENT_HEADER):]
+        elif line == END_OF_FILE_HEADER:
+            self.file_path = None
+        elif line.startswith(SPECIAL_MESSAGE_HEADER):
+            self.messages.append(line[len(SPECIAL_MESSAGE_HEADER):])
+        elif self.file_path is not None:
+            self.lines_by_file[self.file_path].append(line)
+        elif (line.startswith('ls: cannot access') or
+                line.endswith(': No such file or directory')):
+            pass
+        elif line:
+            raise ValueError("Unrecognized line: %s" % line)
+
+
+def write_if_changed(full_path: str, content: str) -> bool:
+    """
+    Writes the given content to the given file unless the file already has the same content, as
+    determined by comparing hashes. Returns True if the file was written.
+    """
+    new_hash = hashlib.sha256(content.encode('utf-8')).digest()
+    try:
+        with open(full_path, 'rb') as existing_file:
+            if hashlib.sha256(existing_file.read()).digest() == new_hash:
+                return False
+    except FileNotFoundError:
+        pass
+    pathlib.Path(os.path.dirname(full_path)).mkdir(parents=True, exist_ok=True)
+    with open(full_path, 'w') as output_file:
+        output_file.write(content)
+    return True
+
+
+def load_manifest(manifest_path: str) -> Dict[str, str]:
+    try:
+        with open(manifest_path) as manifest_file:
+            manifest: Dict[str, str] = json.load(manifest_file)
+            return manifest
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(manifest_path: str, manifest: Dict[str, str]) -> None:
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        manifest_file.write('\n')
+    os.replace(tmp_path, manifest_path)
+
+
+def process_image(
+        runner: ContainerRunner,
+        docker_image: str,
+        output_dir: str,
+        known_digest: Optional[str],
+        force: bool) -> Tuple[str, List[str]]:
+    """
+    Regenerates the test data of one image, unless its digest is unchanged. Returns the digest of
+    the image and the list of files written.
+    """
+    digest = runner.get_image_digest(docker_image)
+    if not force and digest == known_digest and os.path.isdir(output_dir):
+        log("Docker image %s: digest unchanged, skipping" % docker_image)
+        return digest, []
+
+    log("Docker image %s: running container" % docker_image)
+    parser = ContainerOutputParser()
+    with closing(runner.run_script(docker_image, CONTAINER_SCRIPT)) as output_lines:
+        for line in output_lines:
+            parser.feed_line(line)
+    if len(parser.lines_by_file) == 0:
+        raise RuntimeError("No OS version files found for docker image %s: %s" % (
+            docker_image, '; '.join(parser.messages)))
+
+    written_files: List[str] = []
+    for file_path, file_lines in parser.lines_by_file.items():
+        assert file_path.startswith('/')
+        full_path = os.path.join(output_dir, file_path[1:])
+        if write_if_changed(full_path, '\n'.join(file_lines) + '\n'):
+            log("Writing file %s" % full_path)
+            written_files.append(full_path)
+    return digest, written_files
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        '--docker',
+        default=os.environ.get(DOCKER_ENV_VAR, 'docker'),
+        help='Docker-compatible command to run containers with. Defaults to the value of the '
+             '%s environment variable, or docker.' % DOCKER_ENV_VAR)
+    arg_parser.add_argument(
+        '--jobs', type=int, default=8, help='Maximum number of containers to run concurrently.')
+    arg_parser.add_argument(
+        '--test-data-dir', default=DEFAULT_TEST_DATA_DIR, help='Directory to write test data to.')
+    arg_parser.add_argument(
+        '--manifest', default=DEFAULT_MANIFEST_PATH, help='Image digest manifest file.')
+    arg_parser.add_argument(
+        '--no-pull', action='store_true', help='Use local images instead of pulling them.')
+    arg_parser.add_argument(
+        '--force', action='store_true', help='Run containers even if image digests are unchanged.')
+    args = arg_parser.parse_args(argv)
+
+    runner = ContainerRunner(args.docker, pull=not args.no_pull)
+    manifest = load_manifest(args.manifest)
+    new_manifest = dict(manifest)
+    errors: List[str] = []
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {}
+        for os_name, os_versions in VERSIONS_BY_OS.items():
+            for os_version in os_versions:
+                docker_image = get_docker_image(os_name, os_version)
+                output_dir = os.path.join(
+                    args.test_data_dir, get_output_dir_name(os_name, os_version))
+                futures[docker_image] = executor.submit(
+                    process_image, runner, docker_image, output_dir,
+                    manifest.get(docker_image), args.force)
+
+        for docker_image, future in futures.items():
+            try:
+                digest, _ = future.result()
+            except Exception as ex:
+                errors.append('%s: %s' % (docker_image, ex))
+                continue
+            new_manifest[docker_image] = digest
+
+    if new_manifest != manifest:
+        save_manifest(args.manifest, new_manifest)
+    if errors:
+        raise RuntimeError("Failed to process some images:\n" + '\n'.join(errors))
 
 
 if __name__ == '__main__':
@@ -10,19 +10,32 @@
 # or implied. See the License for the specific language governing permissions and limitations
 # under the License.
 
-import os
-import platform
-import shlex
-import re
+"""
+Detects the operating system, its version, architecture, etc.
+
+This module is imported by short-lived command-line tools, so it avoids importing heavy modules
+and compiling regular expressions at import time. Those are loaded lazily on first use.
+"""
 
-from typing import Optional, Any, Dict, Optional, List
+import os
+import sys
 
-from autorepr import autorepr  # type: ignore
+from typing import (
+    Any, Callable, ContextManager, Dict, Optional, List, Mapping, Tuple, TYPE_CHECKING)
 
-from sys_detection.os_compatibility import is_compatible_os
+from sys_detection.lazy_regex import LazyRegex
+from sys_detection.os_compatibility import REDHAT_FAMILY_OS_NAMES, is_compatible_os
+from sys_detection.os_release_parser import (
+    OsReleaseData, parse_os_release, parse_os_release_value)
 
+if TYPE_CHECKING:
+    from sys_detection.cgroup_limits import CgroupLimits
+    from sys_detection.cpu_features import CpuFeatures
+    from sys_detection.file_provider import FileProvider
+    from sys_detection.kernel_info import NumaNode
+    from sys_detection.libc_detection import LibcInfo
+    from types import ModuleType
 
-VALID_ATTR_RE = re.compile('^[a-z_]+$')
 
 SHORT_LINUX_OS_NAMES = [
     'almalinux',
@@ -44,15 +57,98 @@ SHORT_OS_NAMES = ['macos'] + SHORT_LINUX_OS_NAMES
 
 SHORT_OS_NAME_REGEX_STR = '|'.join(SHORT_OS_NAMES)
 
-REDHAT_FAMILY_OS_NAMES = ['almalinux', 'centos', 'rhel', 'rocky', 'ol']
 REDHAT_FAMILY_OS_NAMES_RE_STR = '|'.join(REDHAT_FAMILY_OS_NAMES)
-REDHAT_FAMILY_OS_AND_VERSION_NAME_RE = re.compile(
-    f'^({REDHAT_FAMILY_OS_NAMES_RE_STR})([0-9]+)$')
+
+# Files in the etc directory that the detected configuration depends on.
+CONFIGURATION_FILE_NAMES = ['os-release', 'redhat-release']
+
+VALID_ATTR_RE = LazyRegex('^[a-z_]+$')
+
+REDHAT_FAMILY_OS_AND_VERSION_NAME_RE = LazyRegex(f'^({REDHAT_FAMILY_OS_NAMES_RE_STR})([0-9]+)$')
+
+
+# The sys_detection.stats module while it collects statistics, and None otherwise. Checking this
+# instead of importing that module keeps "import sys_detection" fast.
+_stats: Optional['ModuleType'] = None
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _stats_timer(name: str) -> ContextManager[None]:
+    if _stats is None:
+        return _NULL_TIMER
+    timer: ContextManager[None] = _stats.timer(name)
+    return timer
+
+
+def _stats_increment(name: str, amount: int = 1) -> None:
+    if _stats is not None:
+        _stats.increment(name, amount)
+
+
+def _lazy_autorepr(attr_names: List[str]) -> Callable[[Any], str]:
+    """
+    Equivalent to autorepr(attr_names), but only imports the autorepr module the first time the
+    resulting function is called.
+    """
+    repr_funcs: List[Callable[[Any], str]] = []
+
+    def lazy_repr(self: Any) -> str:
+        if not repr_funcs:
+            from autorepr import autorepr  # type: ignore
+            repr_funcs.append(autorepr(attr_names))
+        return repr_funcs[0](self)
+
+    return lazy_repr
+
+
+def get_system_and_machine() -> Tuple[str, str]:
+    """
+    Returns the same values as platform.system() and platform.machine() without importing the
+    platform module on POSIX systems.
+    """
+    if hasattr(os, 'uname'):
+        uname_result = os.uname()
+        return uname_result.sysname, uname_result.machine
+    import platform
+    return platform.system(), platform.machine()
+
+
+def get_configuration_files_signature(
+        etc_dir_path: str) -> List[Optional[Tuple[int, int, int]]]:
+    """
+    Returns the inode number, modification time and size of each of CONFIGURATION_FILE_NAMES in
+    the given directory, or None for files that do not exist. This is a cheap way to find out if
+    the detected configuration may have changed.
+    """
+    signature: List[Optional[Tuple[int, int, int]]] = []
+    for file_name in CONFIGURATION_FILE_NAMES:
+        try:
+            stat_result = os.stat(os.path.join(etc_dir_path, file_name))
+        except OSError:
+            signature.append(None)
+            continue
+        signature.append((stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size))
+    return signature
 
 
 def read_file(file_path: str) -> str:
     with open(file_path) as input_file:
-        return input_file.read()
+        content = input_file.read()
+    _stats_increment('files_read')
+    _stats_increment('bytes_read', len(content))
+    return content
 
 
 def is_compatible_os_and_version(os_and_version1: str, os_and_version2: str) -> bool:
@@ -67,11 +163,7 @@ def is_compatible_os_and_version(os_and_version1: str, os_and_version2: str) ->
     >>> is_compatible_os_and_version('ubuntu18.04', 'ubuntu20.04')
     False
     """
-    rhel_like1 = REDHAT_FAMILY_OS_AND_VERSION_NAME_RE.match(os_and_version1)
-    rhel_like2 = REDHAT_FAMILY_OS_AND_VERSION_NAME_RE.match(os_and_version2)
-    if rhel_like1 and rhel_like2 and rhel_like1.group(2) == rhel_like2.group(2):
-        return True
-    return os_and_version1 == os_and_version2
+    return is_compatible_os(os_and_version1, os_and_version2)
 
 
 def parse_value(s: str) -> str:
@@ -83,24 +175,99 @@ def parse_value(s: str) -> str:
     >>> parse_value('Hello World')
     'Hello World'
     """
-    tokens = list(shlex.shlex(s, posix=True))
-    if len(tokens) == 1:
-        return tokens[0]
-    return s
+    return parse_os_release_value(s)
+
+
+# The variables used to compute identifiers are stored in slots as well, because __getattr__ is
+# only called after the regular attribute lookup has failed, which is much slower.
+SLOT_ATTRS = ('id', 'version_id')
 
 
 class OsReleaseVars:
-    # Maps lowercase versions of keys in /etc/os-release to their values.
-    vars: Dict[str, str]
+    """
+    The variables from an os-release file. Keys are lowercase versions of the variable names, and
+    the variables with names matching VALID_ATTR_RE are also accessible as attributes, e.g. id or
+    version_id.
+
+    Objects of this class are immutable and hashable. To keep them compact, keys and values are
+    interned, and the keys and their order are stored once in a dictionary shared by all objects
+    with the same set of keys, while each object only stores a tuple of values.
+    """
+    __slots__ = ('_key_indexes', '_attr_indexes', '_values', '_hash') + SLOT_ATTRS
+
+    _key_indexes: Dict[str, int]
+    # The subset of _key_indexes for the keys that are accessible as attributes.
+    _attr_indexes: Dict[str, int]
+    _values: Tuple[str, ...]
+    _hash: Optional[int]
 
     id: str
     version_id: str
 
-    def __init__(self, vars: Dict[str, str]) -> None:
-        self.vars = vars
-        for k, v in self.vars.items():
-            if VALID_ATTR_RE.match(k):
-                setattr(self, k, v)
+    # Maps a tuple of keys to a dictionary from each key to its position in that tuple, and the
+    # subset of that dictionary for valid attribute names. These dictionaries are shared between
+    # objects, so attribute names are only validated once per set of keys.
+    _key_indexes_by_keys: Dict[Tuple[str, ...], Tuple[Dict[str, int], Dict[str, int]]] = {}
+
+    def __init__(self, vars: Mapping[str, str]) -> None:
+        keys = tuple(sys.intern(k) for k in vars)
+        shared_indexes = OsReleaseVars._key_indexes_by_keys.get(keys)
+        if shared_indexes is None:
+            key_indexes = {k: i for i, k in enumerate(keys)}
+            valid_attr_re = VALID_ATTR_RE.get()
+            shared_indexes = (key_indexes, {
+                k: i for k, i in key_indexes.items()
+                if not k.startswith('_') and valid_attr_re.match(k)
+            })
+            OsReleaseVars._key_indexes_by_keys[keys] = shared_indexes
+        object.__setattr__(self, '_key_indexes', shared_indexes[0])
+        object.__setattr__(self, '_attr_indexes', shared_indexes[1])
+        values = tuple(sys.intern(v) for v in vars.values())
+        object.__setattr__(self, '_values', values)
+        for name in SLOT_ATTRS:
+            index = shared_indexes[0].get(name)
+            if index is not None:
+                object.__setattr__(self, name, values[index])
+        object.__setattr__(self, '_hash', None)
+
+    @property
+    def vars(self) -> Dict[str, str]:
+        """
+        A new dictionary mapping lowercase versions of keys in /etc/os-release to their values.
+        """
+        return dict(zip(self._key_indexes, self._values))
+
+    def __getattr__(self, name: str) -> str:
+        # Only called when regular attribute lookup fails. Names starting with an underscore are
+        # never keys, and are rejected first so that missing slots do not cause infinite recursion.
+        if not name.startswith('_'):
+            index = self._attr_indexes.get(name)
+            if index is not None:
+                return self._values[index]
+        raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{type(self).__name__!r} object is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__!r} object is immutable')
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, OsReleaseVars):
+            return NotImplemented
+        if self._key_indexes is other._key_indexes:
+            return self._values == other._values
+        return self.vars == other.vars
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            object.__setattr__(
+                self, '_hash', hash(frozenset(zip(self._key_indexes, self._values))))
+        assert self._hash is not None
+        return self._hash
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (OsReleaseVars, (self.vars,))
 
     def __repr__(self) -> str:
         return repr(self.vars)
@@ -108,28 +275,73 @@ class OsReleaseVars:
     __str__ = __repr__
 
     @staticmethod
-    def read_file(file_path: str) -> 'OsReleaseVars':
-        vars: Dict[str, str] = {}
-        with open(file_path) as input_file:
-            for line in input_file:
-                line = line.strip()
-                if not line:
-                    continue
-                items = line.split('=', 1)
-                vars[items[0].lower()] = parse_value(items[1])
-        return OsReleaseVars(vars)
+    def read_file(
+            file_path: str,
+            file_provider: Optional['FileProvider'] = None) -> 'OsReleaseVars':
+        """
+        Reads an os-release file, from the local file system or from the given file provider, see
+        sys_detection.file_provider.
+        """
+        data: OsReleaseData
+        with _stats_timer('os_release.read'):
+            if file_provider is None:
+                with open(file_path, 'rb') as input_file:
+                    data = input_file.read()
+            else:
+                data = file_provider.read_bytes(file_path)
+        try:
+            _stats_increment('files_read')
+            _stats_increment('bytes_read', len(data))
+            return OsReleaseVars.from_bytes(data)
+        finally:
+            # Allow the provider to be closed even if parsing fails.
+            if isinstance(data, memoryview):
+                data.release()
+
+    @staticmethod
+    def from_bytes(data: OsReleaseData) -> 'OsReleaseVars':
+        with _stats_timer('os_release.parse'):
+            _stats_increment('bytes_parsed', len(data))
+            return OsReleaseVars(parse_os_release(data))
 
     def get(self, k: str) -> Optional[str]:
-        return self.vars.get(k)
+        index = self._key_indexes.get(k)
+        if index is None:
+            return None
+        return self._values[index]
+
+    def to_dict(self) -> Dict[str, str]:
+        return self.vars
+
+    @staticmethod
+    def from_dict(d: Mapping[str, str]) -> 'OsReleaseVars':
+        return OsReleaseVars(d)
 
 
 class SysConfiguration:
+    """
+    The detected configuration of a system. Objects of this class are immutable and hashable, so
+    they can be used as dictionary keys and deduplicated.
+
+    The base directory the configuration was detected from, if any, is used to lazily detect
+    properties of the machine, such as CPU features, which are not part of the configuration files.
+    Since these properties depend on it, it is a part of the identity of the configuration.
+    """
+    __slots__ = (
+        'system', 'architecture', 'linux_os_release', 'redhat_release', 'base_dir', '_hash',
+        '_lazy_values', '_short_os_name_and_version')
+
     system: str
     architecture: str
     linux_os_release: Optional[OsReleaseVars]
     redhat_release: Optional[str]
+    base_dir: Optional[str]
+    _hash: Optional[int]
+    _lazy_values: Optional[Dict[str, Any]]
+    # Cached, since it is a part of every identifier for packaging.
+    _short_os_name_and_version: Optional[str]
 
-    __repr__ = __str__ = autorepr(["system", "architecture", "linux_os_release"])
+    __repr__ = __str__ = _lazy_autorepr(["system", "architecture", "linux_os_release"])
 
     ID_COMPONENT_SEPARATOR = '-'
 
@@ -138,15 +350,86 @@ class SysConfiguration:
             system: str,
             architecture: str,
             linux_os_release: Optional[OsReleaseVars],
-            redhat_release: Optional[str]):
-        self.system = system
-        self.architecture = architecture
-        self.linux_os_release = linux_os_release
-        self.redhat_release = redhat_release
+            redhat_release: Optional[str],
+            base_dir: Optional[str] = None):
+        object.__setattr__(self, 'system', sys.intern(system))
+        object.__setattr__(self, 'architecture', sys.intern(architecture))
+        object.__setattr__(self, 'linux_os_release', linux_os_release)
+        object.__setattr__(
+            self, 'redhat_release',
+            sys.intern(redhat_release) if redhat_release is not None else None)
+        object.__setattr__(self, 'base_dir', base_dir)
+        object.__setattr__(self, '_hash', None)
+        object.__setattr__(self, '_lazy_values', None)
+        object.__setattr__(self, '_short_os_name_and_version', None)
+
+    def _key(self) -> Tuple[Any, ...]:
+        return (
+            self.system, self.architecture, self.linux_os_release, self.redhat_release,
+            self.base_dir)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{type(self).__name__!r} object is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__!r} object is immutable')
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SysConfiguration):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash(self._key()))
+        assert self._hash is not None
+        return self._hash
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (SysConfiguration, self._key())
+
+    def _get_lazy_value(self, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the value computed by the given function the first time it is called for the given
+        name on this object.
+        """
+        lazy_values = self._lazy_values
+        if lazy_values is None:
+            lazy_values = {}
+            object.__setattr__(self, '_lazy_values', lazy_values)
+        if name not in lazy_values:
+            with _stats_timer('lazy.' + name):
+                lazy_values[name] = compute()
+        return lazy_values[name]
 
     def is_linux(self) -> bool:
         return self.system == 'Linux'
 
+    def to_dict(self) -> Dict[str, Any]:
+        '''
+        Returns a JSON-serializable representation of this configuration. The result can be turned
+        back into an equivalent object using from_dict.
+        '''
+        return dict(
+            system=self.system,
+            architecture=self.architecture,
+            linux_os_release=(
+                self.linux_os_release.to_dict() if self.linux_os_release is not None else None),
+            redhat_release=self.redhat_release,
+            base_dir=self.base_dir)
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> 'SysConfiguration':
+        linux_os_release_dict: Optional[Dict[str, str]] = d.get('linux_os_release')
+        return SysConfiguration(
+            system=d['system'],
+            architecture=d['architecture'],
+            linux_os_release=(
+                OsReleaseVars.from_dict(linux_os_release_dict)
+                if linux_os_release_dict is not None else None),
+            redhat_release=d.get('redhat_release'),
+            base_dir=d.get('base_dir'))
+
     def is_macos(self) -> bool:
         return self.system == 'Darwin'
 
@@ -157,37 +440,79 @@ class SysConfiguration:
     def from_etc_dir(
             system: str,
             architecture: str,
-            etc_dir_path: str) -> 'SysConfiguration':
+            etc_dir_path: str,
+            file_provider: Optional['FileProvider'] = None) -> 'SysConfiguration':
+        """
+        Detects the configuration from the files in the given etc directory.
+
+        :param file_provider: Read the files from the given source instead of the local file
+            system, see sys_detection.file_provider. The resulting configuration has no base
+            directory.
+        """
+        with _stats_timer('from_etc_dir'):
+            return SysConfiguration._from_etc_dir(
+                system, architecture, etc_dir_path, file_provider)
+
+    @staticmethod
+    def _from_etc_dir(
+            system: str,
+            architecture: str,
+            etc_dir_path: str,
+            file_provider: Optional['FileProvider']) -> 'SysConfiguration':
         linux_os_release: Optional[OsReleaseVars] = None
         redhat_release: Optional[str] = None
         if system == 'Linux':
             os_release_path = os.path.join(etc_dir_path, 'os-release')
-            linux_os_release = OsReleaseVars.read_file(os_release_path)
+            linux_os_release = OsReleaseVars.read_file(os_release_path, file_provider)
             redhat_release_path = os.path.join(etc_dir_path, 'redhat-release')
-            if os.path.isfile(redhat_release_path):
-                redhat_release = read_file(redhat_release_path).strip()
-                if len(redhat_release) == 0:
-                    redhat_release = None
-            else:
+            if file_provider is None:
+                if os.path.isfile(redhat_release_path):
+                    with _stats_timer('redhat_release.read'):
+                        redhat_release = read_file(redhat_release_path).strip()
+            elif file_provider.is_file(redhat_release_path):
+                with _stats_timer('redhat_release.read'):
+                    data = file_provider.read_bytes(redhat_release_path)
+                    try:
+                        redhat_release = str(data, 'utf-8', 'replace').strip()
+                    finally:
+                        if isinstance(data, memoryview):
+                            data.release()
+            if not redhat_release:
                 redhat_release = None
         return SysConfiguration(
             system=system,
             architecture=architecture,
             linux_os_release=linux_os_release,
-            redhat_release=redhat_release)
+            redhat_release=redhat_release,
+            base_dir=(
+                os.path.dirname(os.path.abspath(etc_dir_path)) if file_provider is None
+                else None))
 
-    _local_system_instance: Optional['SysConfiguration'] = None
+    @staticmethod
+    async def from_etc_dir_async(
+            system: str,
+            architecture: str,
+            etc_dir_path: str) -> 'SysConfiguration':
+        """
+        The asynchronous counterpart of from_etc_dir. File I/O runs in an executor, and concurrent
+        requests for the same directory are deduplicated, see sys_detection.async_detection.
+        """
+        from sys_detection.async_detection import get_default_async_detector
+        return await get_default_async_detector().from_etc_dir(
+            system, architecture, etc_dir_path)
 
     @staticmethod
-    def from_local_system(base_dir: str = '/') -> 'SysConfiguration':
-        if SysConfiguration._local_system_instance is not None:
-            return SysConfiguration._local_system_instance
-        local_system_instance = SysConfiguration.from_etc_dir(
-            system=platform.system(),
-            architecture=platform.machine(),
-            etc_dir_path=os.path.join(base_dir, 'etc'))
-        SysConfiguration._local_system_instance = local_system_instance
-        return local_system_instance
+    def from_local_system(base_dir: str = '/', validate: bool = False) -> 'SysConfiguration':
+        """
+        Returns the configuration of the system rooted at the given directory, as seen from the
+        local machine. Results are memoized per base directory in a thread-safe cache, see
+        sys_detection.root_cache.
+
+        :param validate: Check that the configuration files have not changed since the memoized
+            result was detected, and detect the configuration again if they have.
+        """
+        from sys_detection.root_cache import get_default_root_cache
+        return get_default_root_cache().get(base_dir, validate=validate)
 
     def short_os_name(self) -> Optional[str]:
         """
@@ -203,8 +528,14 @@ class SysConfiguration:
         raise ValueError("Unrecognized platform: %s" % self)
 
     def short_os_version(self) -> str:
+        if self.is_macos():
+            macos_version = self.macos_version()
+            if macos_version is None:
+                return ''
+            from sys_detection.macos_version import short_macos_version
+            return short_macos_version(macos_version)
+
         if not self.is_linux():
-            # TODO: short version strings for macOS.
             return ''
 
         assert self.linux_os_release is not None
@@ -223,27 +554,199 @@ class SysConfiguration:
         return '.'.join(version_id.split('.')[:num_version_components])
 
     def short_os_name_and_version(self) -> str:
-        return '%s%s' % (self.short_os_name(), self.short_os_version())
+        result = self._short_os_name_and_version
+        if result is None:
+            result = '%s%s' % (self.short_os_name(), self.short_os_version())
+            object.__setattr__(self, '_short_os_name_and_version', result)
+        return result
+
+    def macos_version(self) -> Optional[str]:
+        """
+        Returns the macOS product version, e.g. 14.2.1, read from
+        <base_dir>/System/Library/CoreServices/SystemVersion.plist, or None if this is not macOS,
+        the base directory is unknown, or the version cannot be determined.
+        """
+        if self.base_dir is None or not self.is_macos():
+            return None
+        base_dir = self.base_dir
+
+        def read_macos_version() -> Optional[str]:
+            from sys_detection import macos_version
+            return macos_version.read_macos_version(base_dir)
+        result: Optional[str] = self._get_lazy_value('macos_version', read_macos_version)
+        return result
+
+    def cpu_features(self) -> Optional['CpuFeatures']:
+        """
+        Returns the features of the CPU from <base_dir>/proc/cpuinfo, or None if the base directory
+        is unknown or the file does not exist. Only the first processor is examined.
+        """
+        if self.base_dir is None:
+            return None
+        cpuinfo_path = os.path.join(self.base_dir, 'proc', 'cpuinfo')
+
+        def read_cpuinfo() -> Optional['CpuFeatures']:
+            from sys_detection import cpu_features
+            return cpu_features.read_cpuinfo(cpuinfo_path)
+        result: Optional['CpuFeatures'] = self._get_lazy_value('cpu_features', read_cpuinfo)
+        return result
+
+    def cpu_level(self) -> Optional[str]:
+        """
+        Returns the CPU microarchitecture level: v1 to v4 on x86_64, as defined in the x86-64
+        psABI, and base, lse or sve on aarch64. Returns None if it cannot be determined.
+        """
+        features = self.cpu_features()
+        if features is None:
+            return None
+        from sys_detection.cpu_features import get_cpu_level
+        return get_cpu_level(self.architecture, features)
+
+    def libc(self) -> Optional['LibcInfo']:
+        """
+        Returns the C library (glibc or musl) and its version, or None if the base directory is
+        unknown or the C library cannot be found. No programs are run: for the running system, the
+        glibc version is obtained from os.confstr, and otherwise the C library shared objects
+        under the base directory are examined.
+        """
+        if self.base_dir is None or not self.is_linux():
+            return None
+        base_dir = self.base_dir
+
+        def detect_libc() -> Optional['LibcInfo']:
+            from sys_detection import libc_detection
+            return libc_detection.detect_libc(base_dir)
+        result: Optional['LibcInfo'] = self._get_lazy_value('libc', detect_libc)
+        return result
+
+    def cgroup_limits(self) -> Optional['CgroupLimits']:
+        """
+        Returns the CPU and memory limits imposed by control groups on the current process, read
+        from <base_dir>/proc/self/cgroup and <base_dir>/sys/fs/cgroup, or None if the base directory
+        is unknown. See sys_detection.cgroup_limits.
+        """
+        if self.base_dir is None or not self.is_linux():
+            return None
+        base_dir = self.base_dir
+
+        def get_cgroup_limits() -> 'CgroupLimits':
+            from sys_detection import cgroup_limits
+            return cgroup_limits.get_cgroup_limits(base_dir)
+        result: Optional['CgroupLimits'] = self._get_lazy_value(
+            'cgroup_limits', get_cgroup_limits)
+        return result
+
+    def recommended_jobs(self, memory_per_job_bytes: Optional[int] = None) -> int:
+        """
+        Returns the recommended number of parallel jobs, e.g. for a build, taking the limits
+        imposed by control groups into account. See CgroupLimits.recommended_jobs.
+        """
+        limits = self.cgroup_limits()
+        if limits is None:
+            from sys_detection.cgroup_limits import CgroupLimits
+            limits = CgroupLimits()
+        return limits.recommended_jobs(memory_per_job_bytes=memory_per_job_bytes)
+
+    def kernel_release(self) -> Optional[str]:
+        """
+        Returns the kernel release, e.g. 5.15.0-91-generic, read from
+        <base_dir>/proc/sys/kernel/osrelease, or None if the base directory is unknown.
+        """
+        if self.base_dir is None or not self.is_linux():
+            return None
+        base_dir = self.base_dir
+
+        def read_kernel_release() -> Optional[str]:
+            from sys_detection import kernel_info
+            return kernel_info.read_kernel_release(base_dir)
+        result: Optional[str] = self._get_lazy_value('kernel_release', read_kernel_release)
+        return result
+
+    def page_size(self) -> Optional[int]:
+        """
+        Returns the base page size in bytes, e.g. 4096, or 65536 on some aarch64 kernels, or None
+        if the base directory is unknown. See sys_detection.kernel_info.get_page_size.
+        """
+        if self.base_dir is None or not self.is_linux():
+            return None
+        base_dir = self.base_dir
+
+        def get_page_size() -> Optional[int]:
+            from sys_detection import kernel_info
+            return kernel_info.get_page_size(base_dir)
+        result: Optional[int] = self._get_lazy_value('page_size', get_page_size)
+        return result
+
+    def transparent_hugepage_mode(self) -> Optional[str]:
+        """
+        Returns the transparent huge page mode, always, madvise or never, read from
+        <base_dir>/sys/kernel/mm/transparent_hugepage/enabled, or None if the base directory is
+        unknown.
+        """
+        if self.base_dir is None or not self.is_linux():
+            return None
+        base_dir = self.base_dir
+
+        def read_transparent_hugepage_mode() -> Optional[str]:
+            from sys_detection import kernel_info
+            return kernel_info.read_transparent_hugepage_mode(base_dir)
+        result: Optional[str] = self._get_lazy_value(
+            'transparent_hugepage_mode', read_transparent_hugepage_mode)
+        return result
+
+    def numa_nodes(self) -> Optional[List['NumaNode']]:
+        """
+        Returns the NUMA nodes, with their CPUs and memory, read from
+        <base_dir>/sys/devices/system/node, or None if the base directory is unknown or the kernel
+        does not report them.
+        """
+        if self.base_dir is None or not self.is_linux():
+            return None
+        base_dir = self.base_dir
+
+        def read_numa_nodes() -> Optional[List['NumaNode']]:
+            from sys_detection import kernel_info
+            return kernel_info.read_numa_nodes(base_dir)
+        result: Optional[List['NumaNode']] = self._get_lazy_value('numa_nodes', read_numa_nodes)
+        return result
 
     def id_for_packaging(
             self,
             mid_part: List[str] = [],
-            separator: str = ID_COMPONENT_SEPARATOR) -> str:
+            separator: str = ID_COMPONENT_SEPARATOR,
+            include_cpu_level: bool = False,
+            include_libc: bool = False) -> str:
         '''
         An identifier suitable for use as a file name during packaging.
         :param mid_part: Additional components to insert in the middle of the identifier,
             between the operating system and the architecture architecture.
         :param separator: The separator to use for identifier components.
+        :param include_cpu_level: Insert the CPU microarchitecture level, e.g. v3, right before
+            the architecture, if it can be determined.
+        :param include_libc: Insert the C library and its major and minor version, e.g. glibc2.28
+            or musl1.2, after the middle part, if they can be determined.
         '''
-        return separator.join(
-            [self.short_os_name_and_version()] + mid_part + [self.architecture]
-        )
+        components = [self.short_os_name_and_version()] + mid_part
+        if include_libc:
+            libc = self.libc()
+            if libc is not None:
+                components.append(libc.id_component())
+        if include_cpu_level:
+            cpu_level = self.cpu_level()
+            if cpu_level is not None:
+                components.append(cpu_level)
+        return separator.join(components + [self.architecture])
 
 
 def local_sys_conf() -> SysConfiguration:
     return SysConfiguration.from_local_system()
 
 
+async def local_sys_conf_async() -> SysConfiguration:
+    from sys_detection import async_detection
+    return await async_detection.local_sys_conf_async()
+
+
 def is_macos() -> bool:
     return local_sys_conf().is_macos()
 
@@ -16,14 +16,262 @@ Identifies various parameters about the system.
 """
 
 import argparse
-from sys_detection import local_sys_conf
+import itertools
+import json
+import os
+import sys
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sys_detection import _stats_timer
+from sys_detection.disk_cache import DiskCache, is_cache_enabled_by_env
+from sys_detection.fields import (
+    FIELDS, OUTPUT_FORMATS, FieldOptions, format_field_values, get_field_values,
+    parse_field_names)
+
+
+def read_roots(file_path: str) -> Iterator[str]:
+    """
+    Reads root directories to scan, one per line, from the given file, or from standard input if
+    the file path is "-".
+    """
+    if file_path == '-':
+        input_file = sys.stdin
+    else:
+        input_file = open(file_path)
+    with input_file:
+        for line in input_file:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def scan(roots: Iterable[str], jobs: Optional[int], use_processes: bool) -> None:
+    from sys_detection.batch import scan_roots
+    for result in scan_roots(roots, jobs=jobs, use_processes=use_processes):
+        sys.stdout.write(json.dumps(result.to_dict()) + '\n')
+        sys.stdout.flush()
+
+
+def aggregate(
+        report_files: List[str], jobs: Optional[int], output_format: str,
+        top: Optional[int]) -> None:
+    from sys_detection.fleet import aggregate_files
+    result = aggregate_files(report_files, jobs=jobs)
+    if output_format == 'json':
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        print(result.format(top=top))
 
 
 def main() -> None:
     arg_parser = argparse.ArgumentParser(__doc__)
-    arg_parser.parse_args()
-    sys_conf = local_sys_conf()
-    print(sys_conf.id_for_packaging())
+    arg_parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Use a persistent on-disk cache of the detected configuration. Can also be enabled '
+             'by setting the SYS_DETECTION_CACHE environment variable to 1.')
+    arg_parser.add_argument(
+        '--cache-dir',
+        help='Directory to store the cache in. Defaults to $XDG_CACHE_HOME/sys-detection.')
+    arg_parser.add_argument(
+        '--scan-root',
+        nargs='+',
+        metavar='DIR',
+        default=[],
+        help='Detect the configuration of the given root directories, e.g. unpacked container '
+             'images, instead of the local system. Files are treated as image tarballs produced '
+             'by "docker save" or containing an OCI image layout. One JSON object is printed per '
+             'line as results become available, including per-directory errors.')
+    arg_parser.add_argument(
+        '--scan-roots-from',
+        metavar='FILE',
+        help='Read root directories to scan from the given file, one per line. Use - for standard '
+             'input.')
+    arg_parser.add_argument(
+        '--jobs',
+        type=int,
+        help='Number of parallel workers to use for scanning. Defaults to the number of CPUs.')
+    arg_parser.add_argument(
+        '--processes',
+        action='store_true',
+        help='Use worker processes instead of threads for scanning.')
+    arg_parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default='id',
+        help='Output format. "id" prints the identifier for packaging, "json" prints a JSON '
+             'object, and "shell" prints export statements that can be evaluated by a shell. '
+             'Default: id.')
+    arg_parser.add_argument(
+        '--fields',
+        help='Comma-separated list of fields to print in the json and shell formats. Defaults to '
+             'all fields: %s.' % ', '.join(FIELDS))
+    arg_parser.add_argument(
+        '--mid-part',
+        action='append',
+        default=[],
+        metavar='COMPONENT',
+        help='Additional component to insert in the identifier for packaging, between the '
+             'operating system and the architecture. Can be specified multiple times.')
+    arg_parser.add_argument(
+        '--separator',
+        default=FieldOptions().separator,
+        help='Separator of the identifier for packaging components. Default: %(default)s.')
+    arg_parser.add_argument(
+        '--with-cpu-level',
+        action='store_true',
+        help='Include the CPU microarchitecture level, e.g. v3 on x86_64 or lse on aarch64, in '
+             'the identifier for packaging.')
+    arg_parser.add_argument(
+        '--with-libc',
+        action='store_true',
+        help='Include the C library and its version, e.g. glibc2.28 or musl1.2, in the '
+             'identifier for packaging.')
+    arg_parser.add_argument(
+        '--with-toolchain',
+        action='append',
+        default=[],
+        choices=['gcc', 'clang'],
+        help='Include the family and major version of the first compiler of the given family '
+             'found on PATH or in well-known installation directories, e.g. gcc9 or clang11, in '
+             'the identifier for packaging. Can be specified multiple times.')
+    arg_parser.add_argument(
+        '--memory-per-job-mb',
+        type=int,
+        metavar='MB',
+        help='Memory needed per job, in megabytes. If specified, the recommended_jobs field is '
+             'limited to the number of jobs that fit in the memory limit of the control group.')
+    arg_parser.add_argument(
+        '--socket',
+        metavar='PATH',
+        default=os.environ.get('SYS_DETECTION_SOCKET'),
+        help='Query the detection server listening on the given Unix domain socket, see the serve '
+             'command. Falls back to detecting in-process if the server cannot be reached. '
+             'Defaults to the value of the SYS_DETECTION_SOCKET environment variable.')
+    arg_parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Print the time spent in each detection stage, and counters such as the number of '
+             'files read and cache hits, to standard error.')
+
+    subparsers = arg_parser.add_subparsers(dest='command', metavar='COMMAND')
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help='Run a detection server that answers queries over a Unix domain socket, so that '
+             'clients do not have to detect the configuration themselves.')
+    serve_parser.add_argument(
+        '--socket',
+        metavar='PATH',
+        required=True,
+        help='Path of the Unix domain socket to listen on.')
+    aggregate_parser = subparsers.add_parser(
+        'aggregate',
+        help='Aggregate JSONL detection reports collected from many nodes, e.g. the output of '
+             '--scan-root, into histograms by identifier for packaging, operating system, '
+             'architecture and compatibility class.')
+    aggregate_parser.add_argument(
+        'report_files',
+        nargs='+',
+        metavar='FILE',
+        help='JSONL files of reports, optionally gzip-compressed. Use - for standard input. '
+             'Several files are aggregated in parallel.')
+    aggregate_parser.add_argument(
+        '--jobs',
+        type=int,
+        default=argparse.SUPPRESS,
+        help='Number of worker processes. Defaults to the number of CPUs.')
+    aggregate_parser.add_argument(
+        '--output-format',
+        choices=['text', 'json'],
+        default='text',
+        help='Output format. Default: %(default)s.')
+    aggregate_parser.add_argument(
+        '--top',
+        type=int,
+        metavar='N',
+        help='Only print the N most frequent values of each histogram in the text format.')
+    args = arg_parser.parse_args()
+
+    if args.command is not None and args.profile:
+        arg_parser.error('--profile cannot be used with the %s command' % args.command)
+    if args.command == 'serve':
+        from sys_detection.daemon import serve
+        serve(args.socket)
+        return
+    if args.command == 'aggregate':
+        aggregate(args.report_files, args.jobs, args.output_format, args.top)
+        return
+
+    field_names: Optional[List[str]] = None
+    if args.fields:
+        if args.format == 'id':
+            arg_parser.error('--fields requires --format json or --format shell')
+        try:
+            field_names = parse_field_names(args.fields)
+        except ValueError as ex:
+            arg_parser.error(str(ex))
+
+    if not args.profile:
+        run(args, field_names)
+        return
+
+    from sys_detection import stats
+    stats.enable()
+    try:
+        run(args, field_names)
+    finally:
+        stats.disable()
+        sys.stdout.flush()
+        sys.stderr.write(stats.get_stats().format() + '\n')
+
+
+def run(args: argparse.Namespace, field_names: Optional[List[str]]) -> None:
+    if args.scan_root or args.scan_roots_from:
+        roots: Iterable[str] = args.scan_root
+        if args.scan_roots_from:
+            roots = itertools.chain(roots, read_roots(args.scan_roots_from))
+        scan(roots, jobs=args.jobs, use_processes=args.processes)
+        return
+
+    mid_part: List[str] = list(args.mid_part)
+    if args.with_toolchain:
+        from sys_detection.toolchains import find_toolchain
+        for family in args.with_toolchain:
+            toolchain = find_toolchain(family, cache_dir=args.cache_dir)
+            if toolchain is None:
+                sys.exit("No %s compiler found" % family)
+            mid_part.append(toolchain.mid_part_token())
+
+    options = FieldOptions(
+        mid_part=mid_part,
+        separator=args.separator,
+        include_cpu_level=args.with_cpu_level,
+        include_libc=args.with_libc,
+        memory_per_job_bytes=(
+            args.memory_per_job_mb * 1024 * 1024 if args.memory_per_job_mb else None))
+    if args.format == 'id':
+        field_names = ['id_for_packaging']
+
+    values: Optional[Dict[str, Any]] = None
+    if args.socket:
+        from sys_detection.daemon import query_field_values
+        with _stats_timer('daemon.query'):
+            values = query_field_values(args.socket, field_names, options)
+    if values is None:
+        with _stats_timer('detect'):
+            if args.cache or args.cache_dir or is_cache_enabled_by_env():
+                sys_conf = DiskCache(args.cache_dir).get_sys_conf()
+            else:
+                from sys_detection import local_sys_conf
+                sys_conf = local_sys_conf()
+        with _stats_timer('get_field_values'):
+            values = get_field_values(sys_conf, field_names, options)
+
+    if args.format == 'id':
+        print(values['id_for_packaging'])
+    else:
+        print(format_field_values(values, args.format))
 
 
 if __name__ == '__main__':
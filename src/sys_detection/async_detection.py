@@ -0,0 +1,158 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+An asyncio API for system detection. File I/O is offloaded to an executor, so that detection over
+slow, e.g. network-mounted, file systems does not block the event loop.
+"""
+
+import asyncio
+import os
+import weakref
+
+from concurrent.futures import Executor
+from typing import AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+
+from sys_detection import SysConfiguration, get_system_and_machine
+from sys_detection.batch import ScanResult
+
+
+DEFAULT_MAX_CONCURRENCY = 32
+
+_DetectionKey = Tuple[str, str, str]
+
+
+class AsyncDetector:
+    """
+    Detects configurations of root directories from asyncio code.
+
+    Concurrent requests for the same etc directory share a single detection, and at most
+    max_concurrency detections run at the same time, so that probing thousands of root directories
+    does not exhaust file descriptors or executor threads.
+
+    An object of this class must only be used from one event loop.
+    """
+    max_concurrency: int
+    executor: Optional[Executor]
+
+    _semaphore: Optional[asyncio.Semaphore]
+    _in_flight: Dict[_DetectionKey, 'asyncio.Future[SysConfiguration]']
+
+    def __init__(
+            self,
+            max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+            executor: Optional[Executor] = None) -> None:
+        """
+        :param executor: The executor to run blocking file I/O in. Defaults to the default
+            executor of the event loop.
+        """
+        if max_concurrency < 1:
+            raise ValueError("The maximum concurrency must be positive, got: %d" % max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        # Created on first use, because before Python 3.10 it is bound to the current event loop.
+        self._semaphore = None
+        self._in_flight = {}
+
+    async def _detect(self, system: str, architecture: str, etc_dir_path: str) -> SysConfiguration:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await asyncio.get_event_loop().run_in_executor(
+                self.executor, SysConfiguration.from_etc_dir, system, architecture, etc_dir_path)
+
+    async def from_etc_dir(
+            self,
+            system: str,
+            architecture: str,
+            etc_dir_path: str) -> SysConfiguration:
+        """
+        The asynchronous counterpart of SysConfiguration.from_etc_dir.
+        """
+        key = (system, architecture, os.path.abspath(etc_dir_path))
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._detect(*key))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield the shared detection, so that a cancelled caller does not cancel it for others.
+        return await asyncio.shield(future)
+
+    async def detect_root(
+            self,
+            base_dir: str,
+            system: Optional[str] = None,
+            architecture: Optional[str] = None) -> SysConfiguration:
+        """
+        Detects the configuration of the system rooted at the given directory. The system name and
+        architecture default to those of the local system.
+        """
+        local_system, local_machine = get_system_and_machine()
+        return await self.from_etc_dir(
+            system=system or local_system,
+            architecture=architecture or local_machine,
+            etc_dir_path=os.path.join(base_dir, 'etc'))
+
+    async def _scan_root(self, root: str, system: str, architecture: str) -> ScanResult:
+        try:
+            sys_conf = await self.detect_root(root, system, architecture)
+            return ScanResult.from_sys_conf(root, sys_conf)
+        except Exception as ex:
+            return ScanResult.from_exception(root, ex)
+
+    async def scan_roots(
+            self,
+            roots: Iterable[str],
+            system: str = 'Linux',
+            architecture: Optional[str] = None) -> AsyncIterator[ScanResult]:
+        """
+        The asynchronous counterpart of sys_detection.batch.scan_roots. Yields results in the
+        order they complete, and reports per-root errors in the results. The input is consumed
+        lazily, with at most max_concurrency roots in flight.
+        """
+        if architecture is None:
+            architecture = get_system_and_machine()[1]
+        pending: Set['asyncio.Future[ScanResult]'] = set()
+        for root in roots:
+            if len(pending) >= self.max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(asyncio.ensure_future(self._scan_root(root, system, architecture)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+_default_detectors: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncDetector]' = (
+    weakref.WeakKeyDictionary())
+
+
+def get_default_async_detector() -> AsyncDetector:
+    """
+    Returns the detector used by SysConfiguration.from_etc_dir_async for the current event loop.
+    """
+    loop = asyncio.get_event_loop()
+    detector = _default_detectors.get(loop)
+    if detector is None:
+        detector = AsyncDetector()
+        _default_detectors[loop] = detector
+    return detector
+
+
+async def local_sys_conf_async() -> SysConfiguration:
+    """
+    The asynchronous counterpart of sys_detection.local_sys_conf.
+    """
+    return await asyncio.get_event_loop().run_in_executor(
+        get_default_async_detector().executor, SysConfiguration.from_local_system)
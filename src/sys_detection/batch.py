@@ -0,0 +1,146 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Detects the configuration of many root file systems, e.g. unpacked container images or chroot
+sysroots, in parallel.
+"""
+
+import os
+
+from concurrent.futures import (
+    Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait)
+from typing import Any, Dict, Iterable, Iterator, Optional, Set
+
+from sys_detection import SysConfiguration, get_system_and_machine
+
+
+class ScanResult:
+    """
+    The result of detecting the configuration of one root directory. Exactly one of sys_conf and
+    error_type is set.
+    """
+    root: str
+    sys_conf: Optional[SysConfiguration]
+    id_for_packaging: Optional[str]
+    error_type: Optional[str]
+    error_message: Optional[str]
+
+    def __init__(
+            self,
+            root: str,
+            sys_conf: Optional[SysConfiguration] = None,
+            error_type: Optional[str] = None,
+            error_message: Optional[str] = None,
+            id_for_packaging: Optional[str] = None) -> None:
+        self.root = root
+        self.sys_conf = sys_conf
+        self.id_for_packaging = id_for_packaging
+        self.error_type = error_type
+        self.error_message = error_message
+
+    @staticmethod
+    def from_sys_conf(root: str, sys_conf: SysConfiguration) -> 'ScanResult':
+        """
+        Returns a successful result, with everything that to_dict needs computed up front, so that
+        an error, e.g. a missing ID in os-release, is raised while the root is being scanned,
+        where it can be reported for that root.
+        """
+        return ScanResult(root, sys_conf=sys_conf, id_for_packaging=sys_conf.id_for_packaging())
+
+    @staticmethod
+    def from_exception(root: str, ex: Exception) -> 'ScanResult':
+        return ScanResult(root, error_type=type(ex).__name__, error_message=str(ex))
+
+    def is_ok(self) -> bool:
+        return self.sys_conf is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.sys_conf is None:
+            return dict(
+                root=self.root,
+                error=dict(type=self.error_type, message=self.error_message))
+        return dict(
+            root=self.root,
+            id_for_packaging=(
+                self.id_for_packaging if self.id_for_packaging is not None
+                else self.sys_conf.id_for_packaging()),
+            sys_conf=self.sys_conf.to_dict())
+
+
+def scan_root(root: str, system: str = 'Linux', architecture: Optional[str] = None) -> ScanResult:
+    """
+    Detects the configuration of the given root directory. Errors, e.g. a missing os-release file,
+    are reported in the result instead of being raised.
+
+    If the root is a file, it is treated as a container image tarball, see
+    sys_detection.container_image. The architecture is then taken from the image configuration if
+    it is specified there.
+    """
+    if architecture is None:
+        architecture = get_system_and_machine()[1]
+    try:
+        if os.path.isfile(root):
+            from sys_detection.container_image import detect_image_tarball
+            sys_conf = detect_image_tarball(root, architecture=architecture)
+        else:
+            sys_conf = SysConfiguration.from_etc_dir(
+                system=system,
+                architecture=architecture,
+                etc_dir_path=os.path.join(root, 'etc'))
+        return ScanResult.from_sys_conf(root, sys_conf)
+    except Exception as ex:
+        return ScanResult.from_exception(root, ex)
+
+
+def scan_roots(
+        roots: Iterable[str],
+        jobs: Optional[int] = None,
+        use_processes: bool = False,
+        system: str = 'Linux',
+        architecture: Optional[str] = None) -> Iterator[ScanResult]:
+    """
+    Detects the configuration of the given root directories in parallel, and yields the results in
+    the order they complete.
+
+    The input iterable is consumed lazily, and at most a small multiple of jobs roots are in flight
+    at any time, so arbitrarily long inputs are processed in constant memory.
+
+    :param jobs: The number of worker threads or processes. Defaults to the number of CPUs.
+    :param use_processes: Use a process pool instead of a thread pool.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs < 1:
+        raise ValueError("The number of jobs must be positive, got: %d" % jobs)
+    if architecture is None:
+        architecture = get_system_and_machine()[1]
+    max_in_flight = jobs * 2
+
+    executor: Executor
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    else:
+        executor = ThreadPoolExecutor(max_workers=jobs)
+
+    with executor:
+        in_flight: Set['Future[ScanResult]'] = set()
+        for root in roots:
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            in_flight.add(executor.submit(scan_root, root, system, architecture))
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
@@ -0,0 +1,256 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Detection of the CPU and memory limits imposed by control groups (cgroup v1 and v2), e.g. on
+containers, and of a recommended degree of parallelism derived from them.
+
+os.cpu_count() reports the number of CPUs of the host, which oversubscribes a container that is
+only allowed to use a fraction of them.
+"""
+
+import math
+import os
+
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+CGROUP_MOUNT_DIR = os.path.join('sys', 'fs', 'cgroup')
+
+# Directory names of cgroup v1 controller hierarchies under /sys/fs/cgroup, in order of preference.
+V1_CONTROLLER_DIR_NAMES: Dict[str, List[str]] = {
+    'cpu': ['cpu', 'cpu,cpuacct', 'cpuacct,cpu'],
+    'cpuset': ['cpuset'],
+    'memory': ['memory'],
+}
+
+# cgroup v1 reports "no limit" as a very large number, rounded down to a multiple of the page size.
+V1_UNLIMITED_MEMORY_THRESHOLD = 1 << 62
+
+
+class CgroupLimits(NamedTuple):
+    """
+    Limits imposed on a process by control groups. None means that there is no limit, or that it
+    could not be determined.
+    """
+    cgroup_version: Optional[int] = None
+    # The CPU bandwidth quota, in CPUs, e.g. 1.5 for a quota of 150ms every 100ms.
+    cpu_quota: Optional[float] = None
+    # The number of CPUs in the cpuset the process may run on.
+    cpuset_cpu_count: Optional[int] = None
+    memory_limit_bytes: Optional[int] = None
+
+    def recommended_jobs(
+            self,
+            cpu_count: Optional[int] = None,
+            memory_per_job_bytes: Optional[int] = None) -> int:
+        """
+        Returns the recommended number of parallel jobs, which is the smallest of the number of
+        CPUs, the size of the cpuset, and the CPU quota rounded up. If the memory needed per job is
+        specified, the number of jobs that fit in the memory limit is also taken into account. The
+        result is at least 1.
+
+        :param cpu_count: The number of CPUs of the machine. Defaults to the number of CPUs the
+            current process may run on.
+
+        >>> CgroupLimits(cgroup_version=2, cpu_quota=1.5).recommended_jobs(cpu_count=8)
+        2
+        >>> CgroupLimits(memory_limit_bytes=4 << 30).recommended_jobs(8, 1 << 30)
+        4
+        """
+        if cpu_count is None:
+            cpu_count = get_available_cpu_count()
+        jobs = cpu_count
+        if self.cpuset_cpu_count is not None:
+            jobs = min(jobs, self.cpuset_cpu_count)
+        if self.cpu_quota is not None:
+            jobs = min(jobs, int(math.ceil(self.cpu_quota)))
+        if self.memory_limit_bytes is not None and memory_per_job_bytes:
+            jobs = min(jobs, self.memory_limit_bytes // memory_per_job_bytes)
+        return max(1, jobs)
+
+
+def get_available_cpu_count() -> int:
+    """
+    Returns the number of CPUs the current process may run on.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def parse_cpu_list(s: str) -> int:
+    """
+    Returns the number of CPUs in a list in the format of cpuset.cpus.
+
+    >>> parse_cpu_list('0-3,8,10-11')
+    7
+    >>> parse_cpu_list('')
+    0
+    """
+    count = 0
+    for item in s.strip().split(','):
+        if not item:
+            continue
+        first, _, last = item.partition('-')
+        count += (int(last) - int(first) + 1) if last else 1
+    return count
+
+
+def parse_proc_cgroup(content: str) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    Parses /proc/<pid>/cgroup. Returns the cgroup path of each cgroup v1 controller, and the
+    cgroup v2 path, if any.
+
+    >>> parse_proc_cgroup('4:cpu,cpuacct:/docker/abc\\n1:name=systemd:/docker/abc\\n0::/\\n')
+    ({'cpu': '/docker/abc', 'cpuacct': '/docker/abc', 'name=systemd': '/docker/abc'}, '/')
+    """
+    v1_paths: Dict[str, str] = {}
+    v2_path: Optional[str] = None
+    for line in content.splitlines():
+        parts = line.split(':', 2)
+        if len(parts) != 3:
+            continue
+        hierarchy_id, controllers, path = parts
+        if hierarchy_id == '0' and not controllers:
+            v2_path = path
+        else:
+            for controller in controllers.split(','):
+                v1_paths[controller] = path
+    return v1_paths, v2_path
+
+
+def _read_file(path: str) -> Optional[str]:
+    try:
+        with open(path) as input_file:
+            return input_file.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_dirs(mount_dir: str, cgroup_path: str) -> Iterator[str]:
+    """
+    Yields the existing directories of the given cgroup and its ancestors, from the innermost, up
+    to the mount directory. Inside a container without its own cgroup namespace, the cgroup path
+    is that of the host, and only the mount directory, which is the cgroup of the container,
+    exists.
+    """
+    components = [component for component in cgroup_path.split('/') if component]
+    for num_components in range(len(components), -1, -1):
+        dir_path = os.path.join(mount_dir, *components[:num_components])
+        if os.path.isdir(dir_path):
+            yield dir_path
+
+
+def _read_values(mount_dir: str, cgroup_path: str, file_name: str) -> List[str]:
+    """
+    Returns the contents of the given file in the given cgroup and in its ancestors.
+    """
+    values: List[str] = []
+    for dir_path in _cgroup_dirs(mount_dir, cgroup_path):
+        value = _read_file(os.path.join(dir_path, file_name))
+        if value is not None:
+            values.append(value)
+    return values
+
+
+def _min_or_none(values: List[float]) -> Optional[float]:
+    return min(values) if values else None
+
+
+def _parse_v2_cpu_max(value: str) -> Optional[float]:
+    quota, _, period = value.partition(' ')
+    if quota == 'max' or not period:
+        return None
+    return int(quota) / int(period)
+
+
+def _get_v2_limits(base_dir: str, cgroup_path: str) -> CgroupLimits:
+    mount_dir = os.path.join(base_dir, CGROUP_MOUNT_DIR)
+    cpu_quotas = [
+        quota for quota in (
+            _parse_v2_cpu_max(value) for value in _read_values(mount_dir, cgroup_path, 'cpu.max'))
+        if quota is not None]
+    memory_limits = [
+        int(value) for value in _read_values(mount_dir, cgroup_path, 'memory.max')
+        if value != 'max']
+    cpusets = _read_values(mount_dir, cgroup_path, 'cpuset.cpus.effective')
+    return CgroupLimits(
+        cgroup_version=2,
+        cpu_quota=_min_or_none(cpu_quotas),
+        cpuset_cpu_count=parse_cpu_list(cpusets[0]) if cpusets else None,
+        memory_limit_bytes=int(min(memory_limits)) if memory_limits else None)
+
+
+def _find_v1_mount_dir(base_dir: str, controller: str) -> Optional[str]:
+    for dir_name in V1_CONTROLLER_DIR_NAMES[controller]:
+        mount_dir = os.path.join(base_dir, CGROUP_MOUNT_DIR, dir_name)
+        if os.path.isdir(mount_dir):
+            return mount_dir
+    return None
+
+
+def _get_v1_limits(base_dir: str, v1_paths: Dict[str, str]) -> CgroupLimits:
+    cpu_quota: Optional[float] = None
+    cpuset_cpu_count: Optional[int] = None
+    memory_limit_bytes: Optional[int] = None
+
+    cpu_mount_dir = _find_v1_mount_dir(base_dir, 'cpu')
+    if cpu_mount_dir is not None and 'cpu' in v1_paths:
+        cpu_quotas: List[float] = []
+        for dir_path in _cgroup_dirs(cpu_mount_dir, v1_paths['cpu']):
+            quota = _read_file(os.path.join(dir_path, 'cpu.cfs_quota_us'))
+            period = _read_file(os.path.join(dir_path, 'cpu.cfs_period_us'))
+            if quota is not None and period is not None and int(quota) > 0:
+                cpu_quotas.append(int(quota) / int(period))
+        cpu_quota = _min_or_none(cpu_quotas)
+
+    cpuset_mount_dir = _find_v1_mount_dir(base_dir, 'cpuset')
+    if cpuset_mount_dir is not None and 'cpuset' in v1_paths:
+        cpuset_path = v1_paths['cpuset']
+        cpusets = (_read_values(cpuset_mount_dir, cpuset_path, 'cpuset.effective_cpus') or
+                   _read_values(cpuset_mount_dir, cpuset_path, 'cpuset.cpus'))
+        if cpusets:
+            cpuset_cpu_count = parse_cpu_list(cpusets[0])
+
+    memory_mount_dir = _find_v1_mount_dir(base_dir, 'memory')
+    if memory_mount_dir is not None and 'memory' in v1_paths:
+        memory_limits = [
+            int(value)
+            for value in _read_values(
+                memory_mount_dir, v1_paths['memory'], 'memory.limit_in_bytes')
+            if int(value) < V1_UNLIMITED_MEMORY_THRESHOLD]
+        if memory_limits:
+            memory_limit_bytes = min(memory_limits)
+
+    return CgroupLimits(
+        cgroup_version=1,
+        cpu_quota=cpu_quota,
+        cpuset_cpu_count=cpuset_cpu_count,
+        memory_limit_bytes=memory_limit_bytes)
+
+
+def get_cgroup_limits(base_dir: str = '/') -> CgroupLimits:
+    """
+    Returns the limits imposed on the current process, reading <base_dir>/proc/self/cgroup and the
+    cgroup file system mounted at <base_dir>/sys/fs/cgroup. If the controllers used for CPU and
+    memory limits are mounted as cgroup v1 hierarchies, they take precedence over cgroup v2.
+    """
+    proc_cgroup = _read_file(os.path.join(base_dir, 'proc', 'self', 'cgroup'))
+    if proc_cgroup is None:
+        return CgroupLimits()
+    v1_paths, v2_path = parse_proc_cgroup(proc_cgroup)
+    if any(controller in v1_paths for controller in V1_CONTROLLER_DIR_NAMES):
+        return _get_v1_limits(base_dir, v1_paths)
+    if v2_path is not None:
+        return _get_v2_limits(base_dir, v2_path)
+    return CgroupLimits()
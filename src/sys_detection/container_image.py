@@ -0,0 +1,442 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Detection of the configuration of container images directly from the tarballs produced by
+"docker save" or containing an OCI image layout, without extracting them.
+
+Layers are streamed from the image tarball, from the topmost one down, and only the entries that
+can affect os-release and redhat-release are kept in memory. Lower layers are not read at all once
+the files have been found. Whiteout files, which delete files of lower layers, and opaque
+directories are honored, as are symbolic links and hard links, e.g. from /etc/os-release to
+/usr/lib/os-release.
+"""
+
+import json
+import posixpath
+import tarfile
+
+from typing import Any, Callable, Dict, IO, List, NamedTuple, Optional, Set
+
+from sys_detection import OsReleaseVars, SysConfiguration, _stats_increment
+
+
+OS_RELEASE_PATHS = ['etc/os-release', 'usr/lib/os-release']
+REDHAT_RELEASE_PATH = 'etc/redhat-release'
+
+WHITEOUT_PREFIX = '.wh.'
+OPAQUE_WHITEOUT_NAME = '.wh..wh..opq'
+
+# Maps the architecture names used in image configurations to those reported by uname.
+ARCHITECTURES_BY_IMAGE_ARCHITECTURE = {
+    'amd64': 'x86_64',
+    'arm64': 'aarch64',
+    '386': 'i686',
+    'arm': 'armv7l',
+    'ppc64le': 'ppc64le',
+    's390x': 's390x',
+}
+
+OCI_IMAGE_INDEX_MEDIA_TYPES = [
+    'application/vnd.oci.image.index.v1+json',
+    'application/vnd.docker.distribution.manifest.list.v2+json',
+]
+
+OCI_REF_NAME_ANNOTATION = 'org.opencontainers.image.ref.name'
+
+# Symbolic links are not followed more than this many times when looking up a file, as on Linux.
+MAX_SYMLINKS = 40
+
+# Files that are not configuration files are not read into memory.
+MAX_FILE_SIZE = 1024 * 1024
+
+# Entry kinds.
+FILE = 'file'
+SYMLINK = 'symlink'
+HARDLINK = 'hardlink'
+DIRECTORY = 'directory'
+OTHER = 'other'
+WHITEOUT = 'whiteout'
+
+
+class LayerEntry(NamedTuple):
+    kind: str
+    # The contents of regular files.
+    data: Optional[bytes] = None
+    # The normalized path of the target of symbolic and hard links.
+    link_target: Optional[str] = None
+
+
+class ImageManifest(NamedTuple):
+    # Paths of the layer tarballs inside the image tarball, from the bottom layer up.
+    layer_paths: List[str]
+    # The architecture from the image configuration, in the form reported by uname, if known.
+    architecture: Optional[str] = None
+
+
+def normalize_path(path: str, relative_to_dir: str = '') -> str:
+    """
+    Turns a path inside a layer or a link target into a path relative to the root, without leading
+    slashes or "." and ".." components.
+
+    >>> normalize_path('./etc/os-release')
+    'etc/os-release'
+    >>> normalize_path('../usr/lib/os-release', 'etc')
+    'usr/lib/os-release'
+    >>> normalize_path('/usr/lib/os-release', 'etc')
+    'usr/lib/os-release'
+    >>> normalize_path('../../../etc/os-release', 'etc')
+    'etc/os-release'
+    """
+    if not path.startswith('/'):
+        path = posixpath.join('/', relative_to_dir, path)
+    # Normalizing an absolute path drops ".." components above the root, like the kernel does.
+    return posixpath.normpath(posixpath.join('/', path)).lstrip('/')
+
+
+def get_parent_dirs(path: str) -> List[str]:
+    """
+    >>> get_parent_dirs('usr/lib/os-release')
+    ['usr', 'usr/lib']
+    """
+    components = path.split('/')[:-1]
+    return ['/'.join(components[:i]) for i in range(1, len(components) + 1)]
+
+
+def get_architecture(image_config: Dict[str, Any]) -> Optional[str]:
+    """
+    Returns the architecture specified in an image configuration, in the form reported by uname.
+
+    >>> get_architecture({'architecture': 'arm64', 'os': 'linux'})
+    'aarch64'
+    """
+    image_architecture = image_config.get('architecture')
+    if not isinstance(image_architecture, str):
+        return None
+    return ARCHITECTURES_BY_IMAGE_ARCHITECTURE.get(image_architecture, image_architecture)
+
+
+def is_release_file(path: str) -> bool:
+    """
+    Release files in /etc, e.g. centos-release, are often the targets of symbolic links from
+    redhat-release, so they are kept while scanning a layer to avoid reading it again.
+
+    >>> is_release_file('etc/centos-release')
+    True
+    >>> is_release_file('etc/passwd')
+    False
+    """
+    return posixpath.dirname(path) == 'etc' and path.endswith('-release')
+
+
+class LayerIndex:
+    """
+    The entries of one layer that are relevant to the looked up paths.
+    """
+    # The paths this layer was scanned for.
+    paths: Set[str]
+    entries: Dict[str, LayerEntry]
+    # Directories that hide the contents of the same directories in lower layers.
+    opaque_dirs: Set[str]
+
+    def __init__(self, paths: Set[str]) -> None:
+        self.paths = paths
+        self.entries = {}
+        self.opaque_dirs = set()
+
+    def is_scanned_for(self, path: str) -> bool:
+        return path in self.paths or is_release_file(path)
+
+    def lookup(self, path: str) -> Optional[LayerEntry]:
+        """
+        Returns the entry that determines what the given path is in the file system as seen from
+        this layer, or None if the path is not affected by this layer and lower layers have to be
+        consulted. A symbolic link to a parent directory is returned as a symbolic link to the
+        corresponding path under the link target.
+        """
+        for parent_dir in get_parent_dirs(path):
+            entry = self.entries.get(parent_dir)
+            if entry is None or entry.kind == DIRECTORY:
+                continue
+            if entry.kind == SYMLINK:
+                assert entry.link_target is not None
+                return LayerEntry(SYMLINK, link_target=normalize_path(
+                    posixpath.relpath(path, parent_dir), entry.link_target))
+            # Deleted or replaced with something that is not a directory.
+            return LayerEntry(WHITEOUT)
+        entry = self.entries.get(path)
+        if entry is not None:
+            return entry
+        if any(parent_dir in self.opaque_dirs for parent_dir in get_parent_dirs(path)):
+            return LayerEntry(WHITEOUT)
+        return None
+
+
+def scan_layer(layer_file: IO[bytes], paths: Set[str]) -> LayerIndex:
+    """
+    Streams through a layer tarball, which may be compressed with gzip, bzip2 or xz, and collects
+    the entries relevant to the given paths: the paths themselves, their parent directories, and
+    whiteouts of any of them.
+    """
+    layer_index = LayerIndex(set(paths))
+    relevant_paths = set(paths)
+    for path in paths:
+        relevant_paths.update(get_parent_dirs(path))
+
+    try:
+        with tarfile.open(fileobj=layer_file, mode='r|*') as layer_tar:
+            for member in layer_tar:
+                path = normalize_path(member.name)
+                dir_path, name = posixpath.split(path)
+                if name.startswith(WHITEOUT_PREFIX):
+                    if name == OPAQUE_WHITEOUT_NAME:
+                        if dir_path in relevant_paths:
+                            layer_index.opaque_dirs.add(dir_path)
+                        continue
+                    deleted_path = posixpath.join(dir_path, name[len(WHITEOUT_PREFIX):])
+                    if deleted_path in relevant_paths or is_release_file(deleted_path):
+                        layer_index.entries[deleted_path] = LayerEntry(WHITEOUT)
+                    continue
+                if path not in relevant_paths and not is_release_file(path):
+                    continue
+                layer_index.entries[path] = get_layer_entry(layer_tar, member, dir_path)
+    except tarfile.TarError as ex:
+        raise ValueError("Could not read a layer tarball: %s" % ex)
+    _stats_increment('container_image.layers_scanned')
+    return layer_index
+
+
+def get_layer_entry(
+        layer_tar: tarfile.TarFile, member: tarfile.TarInfo, dir_path: str) -> LayerEntry:
+    if member.isdir():
+        return LayerEntry(DIRECTORY)
+    if member.issym():
+        return LayerEntry(SYMLINK, link_target=normalize_path(member.linkname, dir_path))
+    if member.islnk():
+        # Hard link targets are relative to the root of the layer.
+        return LayerEntry(HARDLINK, link_target=normalize_path(member.linkname))
+    if member.isfile() and member.size <= MAX_FILE_SIZE:
+        member_file = layer_tar.extractfile(member)
+        assert member_file is not None
+        return LayerEntry(FILE, data=member_file.read())
+    return LayerEntry(OTHER)
+
+
+class ImageTarball:
+    """
+    An image tarball produced by "docker save", or containing an OCI image layout. The tarball
+    itself may be compressed, but random access to the layers is much faster if it is not.
+    """
+    tarball_path: str
+    manifest: ImageManifest
+
+    _tar: tarfile.TarFile
+    _members: Dict[str, tarfile.TarInfo]
+    _layers: List[Optional[LayerIndex]]
+
+    def __init__(self, tarball_path: str, tag: Optional[str] = None) -> None:
+        """
+        :param tag: The image to use if the tarball contains several, e.g. "centos:7". Defaults to
+            the first one.
+        """
+        self.tarball_path = tarball_path
+        try:
+            self._tar = tarfile.open(tarball_path, mode='r:*')
+        except tarfile.TarError as ex:
+            raise ValueError("Could not read image tarball %s: %s" % (tarball_path, ex))
+        try:
+            self._members = {
+                normalize_path(member.name): member for member in self._tar.getmembers()
+            }
+            self.manifest = self._read_manifest(tag)
+        except BaseException:
+            self._tar.close()
+            raise
+        # Lower layers are indexed lazily, topmost layer first.
+        self._layers = [None] * len(self.manifest.layer_paths)
+
+    def close(self) -> None:
+        self._tar.close()
+
+    def __enter__(self) -> 'ImageTarball':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _open_member(self, path: str) -> IO[bytes]:
+        member = self._members.get(normalize_path(path))
+        member_file = self._tar.extractfile(member) if member is not None else None
+        if member_file is None:
+            raise ValueError("File not found in image tarball %s: %s" % (self.tarball_path, path))
+        return member_file
+
+    def _read_json(self, path: str) -> Any:
+        with self._open_member(path) as member_file:
+            try:
+                return json.loads(member_file.read().decode('utf-8'))
+            except ValueError as ex:
+                raise ValueError("Invalid JSON in %s in image tarball %s: %s" % (
+                    path, self.tarball_path, ex))
+
+    def _read_manifest(self, tag: Optional[str]) -> ImageManifest:
+        if 'manifest.json' in self._members:
+            return self._read_docker_manifest(tag)
+        if 'index.json' in self._members:
+            return self._read_oci_manifest(tag)
+        raise ValueError(
+            "Neither manifest.json nor index.json found in image tarball %s" % self.tarball_path)
+
+    def _read_docker_manifest(self, tag: Optional[str]) -> ImageManifest:
+        images: List[Dict[str, Any]] = self._read_json('manifest.json')
+        image = self._select(images, tag, lambda image: image.get('RepoTags') or [])
+        config = self._read_json(image['Config']) if image.get('Config') else {}
+        return ImageManifest(
+            layer_paths=list(image['Layers']),
+            architecture=get_architecture(config))
+
+    def _read_oci_manifest(self, tag: Optional[str]) -> ImageManifest:
+        index: Dict[str, Any] = self._read_json('index.json')
+        descriptor = self._select(
+            index.get('manifests', []), tag,
+            lambda descriptor: [
+                descriptor.get('annotations', {}).get(OCI_REF_NAME_ANNOTATION)])
+        # Multi-platform images refer to a nested index with a manifest per platform. Attestation
+        # manifests have an "unknown" platform.
+        while descriptor.get('mediaType') in OCI_IMAGE_INDEX_MEDIA_TYPES:
+            nested_descriptors = [
+                nested_descriptor
+                for nested_descriptor in self._read_blob(descriptor).get('manifests', [])
+                if nested_descriptor.get('platform', {}).get('architecture') != 'unknown']
+            if not nested_descriptors:
+                raise ValueError("Empty image index in image tarball %s" % self.tarball_path)
+            descriptor = nested_descriptors[0]
+        manifest = self._read_blob(descriptor)
+        config = self._read_blob(manifest['config']) if manifest.get('config') else {}
+        return ImageManifest(
+            layer_paths=[self._get_blob_path(layer) for layer in manifest.get('layers', [])],
+            architecture=get_architecture(config))
+
+    def _select(
+            self,
+            images: List[Dict[str, Any]],
+            tag: Optional[str],
+            get_tags: Callable[[Dict[str, Any]], List[Optional[str]]]) -> Dict[str, Any]:
+        if not images:
+            raise ValueError("No images found in image tarball %s" % self.tarball_path)
+        if tag is None:
+            return images[0]
+        for image in images:
+            if tag in get_tags(image):
+                return image
+        raise ValueError("Image %s not found in image tarball %s" % (tag, self.tarball_path))
+
+    @staticmethod
+    def _get_blob_path(descriptor: Dict[str, Any]) -> str:
+        algorithm, _, digest = descriptor['digest'].partition(':')
+        return posixpath.join('blobs', algorithm, digest)
+
+    def _read_blob(self, descriptor: Dict[str, Any]) -> Any:
+        return self._read_json(self._get_blob_path(descriptor))
+
+    def _get_layer(self, layer_index: int, path: str) -> LayerIndex:
+        """
+        Returns the index of the given layer, counting from the top, scanning it if it has not
+        been scanned for the given path yet.
+        """
+        layer = self._layers[layer_index]
+        if layer is not None and layer.is_scanned_for(path):
+            return layer
+        paths = {path}
+        if layer is None:
+            # Look for all paths that may be needed at once, to avoid reading the layer again.
+            paths.update(OS_RELEASE_PATHS)
+            paths.add(REDHAT_RELEASE_PATH)
+        else:
+            paths.update(layer.paths)
+        layer_path = self.manifest.layer_paths[len(self._layers) - 1 - layer_index]
+        with self._open_member(layer_path) as layer_file:
+            layer = scan_layer(layer_file, paths)
+        self._layers[layer_index] = layer
+        return layer
+
+    def read_file(self, path: str) -> Optional[bytes]:
+        """
+        Returns the contents of the given file in the file system of the image, following symbolic
+        links, or None if it does not exist or is not a regular file. Only the layers above the
+        topmost one containing the file are read.
+        """
+        path = normalize_path(path)
+        for _ in range(MAX_SYMLINKS):
+            for layer_index in range(len(self._layers)):
+                entry = self._get_layer(layer_index, path).lookup(path)
+                if entry is None:
+                    continue
+                if entry.kind == HARDLINK:
+                    assert entry.link_target is not None
+                    entry = self._get_layer(layer_index, entry.link_target).entries.get(
+                        entry.link_target)
+                    if entry is None or entry.kind == HARDLINK:
+                        return None
+                if entry.kind == SYMLINK:
+                    assert entry.link_target is not None
+                    # Symbolic links are resolved in the merged file system.
+                    path = entry.link_target
+                    break
+                return entry.data if entry.kind == FILE else None
+            else:
+                return None
+        raise ValueError("Too many levels of symbolic links in image tarball %s: %s" % (
+            self.tarball_path, path))
+
+    def get_sys_conf(self, architecture: Optional[str] = None) -> SysConfiguration:
+        """
+        Detects the configuration of the image.
+
+        :param architecture: The architecture to use if the image configuration does not specify
+            one.
+        """
+        architecture = self.manifest.architecture or architecture
+        if architecture is None:
+            raise ValueError(
+                "The architecture of image tarball %s is unknown" % self.tarball_path)
+        os_release_data: Optional[bytes] = None
+        for os_release_path in OS_RELEASE_PATHS:
+            os_release_data = self.read_file(os_release_path)
+            if os_release_data is not None:
+                break
+        if os_release_data is None:
+            raise ValueError("No os-release file found in image tarball %s" % self.tarball_path)
+        redhat_release_data = self.read_file(REDHAT_RELEASE_PATH)
+        redhat_release: Optional[str] = None
+        if redhat_release_data is not None:
+            redhat_release = redhat_release_data.decode('utf-8', 'replace').strip() or None
+        return SysConfiguration(
+            system='Linux',
+            architecture=architecture,
+            linux_os_release=OsReleaseVars.from_bytes(os_release_data),
+            redhat_release=redhat_release)
+
+
+def detect_image_tarball(
+        tarball_path: str,
+        architecture: Optional[str] = None,
+        tag: Optional[str] = None) -> SysConfiguration:
+    """
+    Detects the configuration of the container image in the given tarball produced by
+    "docker save", or containing an OCI image layout.
+
+    :param architecture: The architecture to use if the image configuration does not specify one.
+    :param tag: The image to use if the tarball contains several. Defaults to the first one.
+    """
+    with ImageTarball(tarball_path, tag=tag) as image_tarball:
+        return image_tarball.get_sys_conf(architecture)
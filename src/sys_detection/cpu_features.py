@@ -0,0 +1,126 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Detection of CPU feature flags and the microarchitecture level derived from them, using
+/proc/cpuinfo.
+"""
+
+from typing import FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+
+# Flags required by the x86-64 microarchitecture levels defined in the x86-64 psABI, using the
+# names from /proc/cpuinfo. E.g. pni is SSE3, and abm includes LZCNT.
+X86_64_LEVEL_FLAGS: List[Tuple[str, FrozenSet[str]]] = [
+    ('v1', frozenset(['cmov', 'cx8', 'fpu', 'fxsr', 'mmx', 'syscall', 'sse', 'sse2'])),
+    ('v2', frozenset(['cx16', 'lahf_lm', 'popcnt', 'pni', 'sse4_1', 'sse4_2', 'ssse3'])),
+    ('v3', frozenset([
+        'avx', 'avx2', 'bmi1', 'bmi2', 'f16c', 'fma', 'abm', 'movbe', 'xsave'])),
+    ('v4', frozenset(['avx512f', 'avx512bw', 'avx512cd', 'avx512dq', 'avx512vl'])),
+]
+
+X86_64_ARCHITECTURES = ['x86_64']
+AARCH64_ARCHITECTURES = ['aarch64', 'arm64']
+
+# Keys of the feature flag line in /proc/cpuinfo on x86 and ARM respectively.
+FLAGS_KEYS = ['flags', 'Features']
+
+
+class CpuFeatures(NamedTuple):
+    """
+    CPU properties from the first processor block of /proc/cpuinfo.
+    """
+    flags: FrozenSet[str]
+    model_name: Optional[str] = None
+
+
+def parse_cpuinfo(lines: Iterable[str]) -> CpuFeatures:
+    """
+    Parses the contents of /proc/cpuinfo, line by line. Only the first processor block is parsed,
+    as all processors of a system are assumed to support the same features, so the rest of the
+    input is not consumed.
+
+    >>> sorted(parse_cpuinfo(['processor : 0', 'flags : fpu sse2', '', 'flags : avx']).flags)
+    ['fpu', 'sse2']
+    """
+    flags: FrozenSet[str] = frozenset()
+    model_name: Optional[str] = None
+    seen_keys = False
+    for line in lines:
+        key, sep, value = line.partition(':')
+        if not sep:
+            if seen_keys and not line.strip():
+                break
+            continue
+        seen_keys = True
+        key = key.strip()
+        if key in FLAGS_KEYS:
+            flags = frozenset(value.split())
+        elif key == 'model name':
+            model_name = value.strip()
+    return CpuFeatures(flags=flags, model_name=model_name)
+
+
+def read_cpuinfo(cpuinfo_path: str) -> Optional[CpuFeatures]:
+    """
+    Reads CPU features from the given file in the /proc/cpuinfo format. Returns None if the file
+    does not exist.
+    """
+    try:
+        with open(cpuinfo_path) as cpuinfo_file:
+            return parse_cpuinfo(cpuinfo_file)
+    except FileNotFoundError:
+        return None
+
+
+def get_x86_64_level(flags: FrozenSet[str]) -> Optional[str]:
+    """
+    Returns the highest x86-64 microarchitecture level, v1 to v4, supported with the given flags.
+
+    >>> get_x86_64_level(frozenset(X86_64_LEVEL_FLAGS[0][1] | X86_64_LEVEL_FLAGS[1][1]))
+    'v2'
+    >>> get_x86_64_level(frozenset(['fpu'])) is None
+    True
+    """
+    level: Optional[str] = None
+    for level_name, required_flags in X86_64_LEVEL_FLAGS:
+        if not required_flags.issubset(flags):
+            break
+        level = level_name
+    return level
+
+
+def get_aarch64_level(flags: FrozenSet[str]) -> str:
+    """
+    Returns "sve" if both the Large System Extensions (atomics) and the Scalable Vector Extension
+    are supported, "lse" if only the former is, and "base" otherwise.
+
+    >>> get_aarch64_level(frozenset(['fp', 'asimd', 'atomics']))
+    'lse'
+    """
+    if 'atomics' not in flags:
+        return 'base'
+    if 'sve' in flags:
+        return 'sve'
+    return 'lse'
+
+
+def get_cpu_level(architecture: str, features: CpuFeatures) -> Optional[str]:
+    """
+    Returns the microarchitecture level of a CPU of the given architecture, or None if it cannot be
+    determined.
+    """
+    if architecture in X86_64_ARCHITECTURES:
+        return get_x86_64_level(features.flags)
+    if architecture in AARCH64_ARCHITECTURES:
+        return get_aarch64_level(features.flags)
+    return None
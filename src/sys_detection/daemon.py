@@ -0,0 +1,241 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+A long-running detection server, and a client for it, communicating over a Unix domain socket.
+
+The protocol is line-based. Every request is a JSON object on one line, and is answered with a
+JSON object on one line. A connection can be used for any number of requests. Request keys, all
+optional:
+
+- root: the root directory to detect the configuration of. Default: /.
+- fields: the list of fields to return, see sys_detection.fields. Default: all fields except
+  PROCESS_FIELDS.
+- mid_part (a list of strings), separator, include_cpu_level, include_libc: options of the
+  id_for_packaging field.
+
+The fields in PROCESS_FIELDS, such as recommended_jobs, depend on the control group and CPU
+affinity of the process that asks for them, which the server cannot determine for its clients.
+They are rejected by the server, and query_field_values computes them in the client process.
+
+A successful response has a "values" key mapping field names to values. A failed one has an
+"error" key with the type and message of the error. For example:
+
+    $ echo '{"fields": ["id_for_packaging"]}' | socat - UNIX-CONNECT:/tmp/sys-detection.sock
+    {"values": {"id_for_packaging": "centos8-x86_64"}}
+
+Configurations are held in memory, and the configuration files are checked for changes on every
+request by comparing their inode numbers, modification times and sizes, see
+sys_detection.root_cache.
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from sys_detection import SysConfiguration, get_system_and_machine
+from sys_detection.fields import FIELDS, FieldOptions, get_field_values
+from sys_detection.root_cache import RootCache
+
+
+SOCKET_ENV_VAR = 'SYS_DETECTION_SOCKET'
+
+# The maximum length of a request line, in bytes.
+MAX_REQUEST_SIZE = 65536
+
+DEFAULT_CLIENT_TIMEOUT_SEC = 10.0
+
+# Fields that describe the limits of the calling process rather than the system.
+PROCESS_FIELDS = frozenset([
+    'cgroup_version', 'cpu_quota', 'cpuset_cpu_count', 'memory_limit_bytes', 'recommended_jobs'])
+
+
+def _get_mid_part(request: Dict[str, Any]) -> List[str]:
+    mid_part = request.get('mid_part', [])
+    if not isinstance(mid_part, list) or not all(isinstance(item, str) for item in mid_part):
+        raise TypeError("mid_part must be a list of strings, got: %r" % (mid_part,))
+    return mid_part
+
+
+def _get_field_names(request: Dict[str, Any]) -> List[str]:
+    field_names = request.get('fields')
+    if field_names is None:
+        return [name for name in FIELDS if name not in PROCESS_FIELDS]
+    for name in field_names:
+        if name in PROCESS_FIELDS:
+            raise ValueError(
+                "Field %s depends on the calling process, and must be computed by the client" %
+                name)
+    return list(field_names)
+
+
+def handle_request(request: Dict[str, Any], root_cache: RootCache) -> Dict[str, Any]:
+    """
+    Computes the response to one request. Errors are reported in the response.
+    """
+    try:
+        options = FieldOptions(
+            mid_part=_get_mid_part(request),
+            separator=request.get('separator', FieldOptions().separator),
+            include_cpu_level=bool(request.get('include_cpu_level', False)),
+            include_libc=bool(request.get('include_libc', False)))
+        field_names = _get_field_names(request)
+        sys_conf = root_cache.get(request.get('root', '/'), validate=True)
+        return dict(values=get_field_values(sys_conf, field_names, options))
+    except Exception as ex:
+        return dict(error=dict(type=type(ex).__name__, message=str(ex)))
+
+
+class DetectionRequestHandler(socketserver.StreamRequestHandler):
+    server: 'DetectionServer'
+
+    def handle(self) -> None:
+        try:
+            self.handle_requests()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client disconnected without reading all responses.
+            pass
+
+    def handle_requests(self) -> None:
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_SIZE)
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("The request must be a JSON object")
+            except ValueError as ex:
+                response: Dict[str, Any] = dict(
+                    error=dict(type=type(ex).__name__, message=str(ex)))
+            else:
+                response = handle_request(request, self.server.root_cache)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class DetectionServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Answers detection requests on a Unix domain socket, one thread per connection.
+    """
+    daemon_threads = True
+
+    root_cache: RootCache
+
+    def __init__(self, socket_path: str, root_cache: Optional[RootCache] = None) -> None:
+        self.root_cache = root_cache or RootCache()
+        super().__init__(socket_path, DetectionRequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.remove(self.server_address)  # type: ignore
+        except FileNotFoundError:
+            pass
+
+
+def create_server(socket_path: str) -> DetectionServer:
+    """
+    Creates a server listening on the given socket. A socket file left behind by a server that is
+    no longer running is removed, but it is an error if another server is still running.
+    """
+    if os.path.exists(socket_path):
+        if query(socket_path, dict(fields=[])) is not None:
+            raise RuntimeError("A server is already running on %s" % socket_path)
+        os.remove(socket_path)
+    return DetectionServer(socket_path)
+
+
+def serve(socket_path: str) -> None:
+    """
+    Serves requests until interrupted or terminated.
+    """
+    server = create_server(socket_path)
+    # Make sure the socket file is removed on termination.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def query(
+        socket_path: str,
+        request: Dict[str, Any],
+        timeout: float = DEFAULT_CLIENT_TIMEOUT_SEC) -> Optional[Dict[str, Any]]:
+    """
+    Sends one request to the server listening on the given socket, and returns its response.
+    Returns None if no server is running, or it cannot be reached, e.g. because it does not
+    respond within the timeout or the socket is not accessible.
+    """
+    client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with client_socket:
+        client_socket.settimeout(timeout)
+        try:
+            client_socket.connect(socket_path)
+            client_socket.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with client_socket.makefile('rb') as response_file:
+                response_line = response_file.readline()
+        except OSError:
+            # Including socket.timeout, PermissionError and ConnectionRefusedError.
+            return None
+    if not response_line:
+        return None
+    response: Dict[str, Any] = json.loads(response_line)
+    return response
+
+
+def query_field_values(
+        socket_path: str,
+        field_names: Optional[List[str]] = None,
+        options: FieldOptions = FieldOptions(),
+        root: str = '/') -> Optional[Dict[str, Any]]:
+    """
+    Returns the values of the given fields, or of all fields if none are specified, from the
+    server listening on the given socket, or None if the server cannot be reached, in which case
+    the caller is expected to detect them in-process. The fields in PROCESS_FIELDS are computed in
+    this process.
+    """
+    if field_names is None:
+        field_names = list(FIELDS)
+    values: Dict[str, Any] = {}
+    server_field_names = [name for name in field_names if name not in PROCESS_FIELDS]
+    if server_field_names:
+        response = query(socket_path, dict(
+            root=root,
+            fields=server_field_names,
+            mid_part=options.mid_part,
+            separator=options.separator,
+            include_cpu_level=options.include_cpu_level,
+            include_libc=options.include_libc))
+        if response is None:
+            return None
+        if 'error' in response:
+            raise RuntimeError("Detection server error: %s: %s" % (
+                response['error']['type'], response['error']['message']))
+        values.update(response['values'])
+    process_field_names = [name for name in field_names if name in PROCESS_FIELDS]
+    if process_field_names:
+        # These fields only depend on the base directory, not on the configuration files.
+        system, machine = get_system_and_machine()
+        values.update(get_field_values(
+            SysConfiguration(system, machine, None, None, base_dir=root),
+            process_field_names, options))
+    return OrderedDict((name, values[name]) for name in field_names)
@@ -0,0 +1,143 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+An opt-in persistent cache of the detected system configuration.
+
+The cache is stored as a small JSON file under $XDG_CACHE_HOME/sys-detection (or
+~/.cache/sys-detection). Each entry is keyed on the inode, modification time and size of the files
+the configuration is detected from, as well as on the system name and machine architecture, so it
+is invalidated as soon as any of them changes.
+
+A cache hit does not have to pay for reading and parsing the os-release files.
+"""
+
+import json
+import os
+import zlib
+
+from typing import Any, Dict, Optional
+
+from sys_detection import (
+    SysConfiguration, get_configuration_files_signature, get_system_and_machine,
+    _stats_increment, _stats_timer)
+
+
+CACHE_FORMAT_VERSION = 1
+
+# Setting this environment variable to a non-empty value other than 0 enables the cache in the
+# command-line tool.
+CACHE_ENABLED_ENV_VAR = 'SYS_DETECTION_CACHE'
+
+CACHE_SUBDIR_NAME = 'sys-detection'
+
+
+def is_cache_enabled_by_env() -> bool:
+    return os.environ.get(CACHE_ENABLED_ENV_VAR, '') not in ('', '0')
+
+
+def get_default_cache_dir() -> str:
+    cache_home = os.environ.get('XDG_CACHE_HOME')
+    if not cache_home:
+        cache_home = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, CACHE_SUBDIR_NAME)
+
+
+def compute_cache_key(base_dir: str) -> Dict[str, Any]:
+    system, machine = get_system_and_machine()
+    return dict(
+        version=CACHE_FORMAT_VERSION,
+        base_dir=base_dir,
+        system=system,
+        machine=machine,
+        files=[
+            list(file_signature) if file_signature is not None else None
+            for file_signature in get_configuration_files_signature(os.path.join(base_dir, 'etc'))
+        ])
+
+
+class DiskCache:
+    cache_dir: str
+
+    def __init__(self, cache_dir: Optional[str] = None) -> None:
+        self.cache_dir = cache_dir or get_default_cache_dir()
+
+    def get_cache_file_path(self, base_dir: str) -> str:
+        base_dir_hash = zlib.crc32(base_dir.encode('utf-8', 'surrogateescape'))
+        return os.path.join(self.cache_dir, 'sys_conf_%08x.json' % base_dir_hash)
+
+    def load_dict(self, base_dir: str, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the serialized configuration stored for the given base directory, or None if there
+        is no valid entry matching the given key.
+        """
+        try:
+            with open(self.get_cache_file_path(base_dir)) as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get('key') != key:
+            return None
+        sys_conf_dict = entry.get('sys_conf')
+        if not isinstance(sys_conf_dict, dict):
+            return None
+        return sys_conf_dict
+
+    def store_dict(self, base_dir: str, key: Dict[str, Any], sys_conf_dict: Dict[str, Any]) -> None:
+        """
+        Atomically replaces the cache entry for the given base directory. Errors are ignored, e.g.
+        when the cache directory is not writable, because the cache is only an optimization.
+        """
+        cache_file_path = self.get_cache_file_path(base_dir)
+        tmp_file_path = '%s.tmp.%d' % (cache_file_path, os.getpid())
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_file_path, 'w') as tmp_file:
+                json.dump(dict(key=key, sys_conf=sys_conf_dict), tmp_file)
+            os.replace(tmp_file_path, cache_file_path)
+        except OSError:
+            try:
+                os.unlink(tmp_file_path)
+            except OSError:
+                pass
+
+    def get_sys_conf(self, base_dir: str = '/') -> SysConfiguration:
+        """
+        Returns the configuration of the system rooted at the given directory, using the cached
+        value if it is still valid, and detecting and storing it otherwise.
+        """
+        base_dir = os.path.abspath(base_dir)
+        # The key is computed before the files are read, so that a concurrent modification results
+        # in a stale key being stored, and the entry being invalidated on the next lookup.
+        with _stats_timer('disk_cache.load'):
+            key = compute_cache_key(base_dir)
+            sys_conf_dict = self.load_dict(base_dir, key)
+        if sys_conf_dict is not None:
+            try:
+                sys_conf = SysConfiguration.from_dict(sys_conf_dict)
+                _stats_increment('disk_cache.hits')
+                return sys_conf
+            except (KeyError, TypeError, ValueError):
+                pass
+        _stats_increment('disk_cache.misses')
+
+        sys_conf = SysConfiguration.from_etc_dir(
+            system=key['system'],
+            architecture=key['machine'],
+            etc_dir_path=os.path.join(base_dir, 'etc'))
+        with _stats_timer('disk_cache.store'):
+            self.store_dict(base_dir, key, sys_conf.to_dict())
+        return sys_conf
+
+
+def cached_sys_conf(base_dir: str = '/', cache_dir: Optional[str] = None) -> SysConfiguration:
+    return DiskCache(cache_dir).get_sys_conf(base_dir)
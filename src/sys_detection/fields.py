@@ -0,0 +1,167 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Named fields derived from a detected configuration, and formatting of their values for the
+command-line tool.
+"""
+
+import json
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from sys_detection import SysConfiguration
+
+
+class FieldOptions(NamedTuple):
+    """
+    Parameters of fields that are not part of the configuration itself.
+    """
+    mid_part: List[str] = []
+    separator: str = SysConfiguration.ID_COMPONENT_SEPARATOR
+    include_cpu_level: bool = False
+    include_libc: bool = False
+    memory_per_job_bytes: Optional[int] = None
+
+
+FieldGetter = Callable[[SysConfiguration, FieldOptions], Any]
+
+FIELDS: 'OrderedDict[str, FieldGetter]' = OrderedDict()
+
+SHELL_VAR_PREFIX = 'SYS_DETECTION_'
+
+OUTPUT_FORMATS = ['id', 'json', 'shell']
+
+
+def register_field(name: str, getter: FieldGetter) -> None:
+    """
+    Adds a field to the output of the command-line tool. Values must be JSON-serializable.
+    """
+    if name in FIELDS:
+        raise ValueError("Field already registered: %s" % name)
+    FIELDS[name] = getter
+
+
+def _get_numa_nodes(sys_conf: SysConfiguration) -> Optional[List[Dict[str, Any]]]:
+    numa_nodes = sys_conf.numa_nodes()
+    if numa_nodes is None:
+        return None
+    return [node.to_dict() for node in numa_nodes]
+
+
+register_field('system', lambda sys_conf, _: sys_conf.system)
+register_field('architecture', lambda sys_conf, _: sys_conf.architecture)
+register_field('short_os_name', lambda sys_conf, _: sys_conf.short_os_name())
+register_field('short_os_version', lambda sys_conf, _: sys_conf.short_os_version())
+register_field(
+    'short_os_name_and_version', lambda sys_conf, _: sys_conf.short_os_name_and_version())
+register_field(
+    'id_for_packaging',
+    lambda sys_conf, options: sys_conf.id_for_packaging(
+        mid_part=options.mid_part,
+        separator=options.separator,
+        include_cpu_level=options.include_cpu_level,
+        include_libc=options.include_libc))
+register_field('macos_version', lambda sys_conf, _: sys_conf.macos_version())
+register_field('cpu_level', lambda sys_conf, _: sys_conf.cpu_level())
+register_field('libc_name', lambda sys_conf, _: getattr(sys_conf.libc(), 'name', None))
+register_field('libc_version', lambda sys_conf, _: getattr(sys_conf.libc(), 'version', None))
+register_field(
+    'cgroup_version', lambda sys_conf, _: getattr(sys_conf.cgroup_limits(), 'cgroup_version', None))
+register_field(
+    'cpu_quota', lambda sys_conf, _: getattr(sys_conf.cgroup_limits(), 'cpu_quota', None))
+register_field(
+    'cpuset_cpu_count',
+    lambda sys_conf, _: getattr(sys_conf.cgroup_limits(), 'cpuset_cpu_count', None))
+register_field(
+    'memory_limit_bytes',
+    lambda sys_conf, _: getattr(sys_conf.cgroup_limits(), 'memory_limit_bytes', None))
+register_field(
+    'recommended_jobs',
+    lambda sys_conf, options: sys_conf.recommended_jobs(options.memory_per_job_bytes))
+register_field('kernel_release', lambda sys_conf, _: sys_conf.kernel_release())
+register_field('page_size', lambda sys_conf, _: sys_conf.page_size())
+register_field(
+    'transparent_hugepage_mode', lambda sys_conf, _: sys_conf.transparent_hugepage_mode())
+register_field('numa_nodes', lambda sys_conf, _: _get_numa_nodes(sys_conf))
+register_field('is_redhat_family', lambda sys_conf, _: sys_conf.is_redhat_family())
+register_field('redhat_release', lambda sys_conf, _: sys_conf.redhat_release)
+register_field(
+    'linux_os_release',
+    lambda sys_conf, _: (
+        sys_conf.linux_os_release.to_dict() if sys_conf.linux_os_release is not None else None))
+
+
+def parse_field_names(s: str) -> List[str]:
+    """
+    Parses a comma-separated list of field names.
+
+    >>> parse_field_names('system, architecture')
+    ['system', 'architecture']
+    >>> parse_field_names('system,foo')
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown field: foo
+    """
+    field_names = [name.strip() for name in s.split(',') if name.strip()]
+    for name in field_names:
+        if name not in FIELDS:
+            raise ValueError("Unknown field: %s" % name)
+    return field_names
+
+
+def get_field_values(
+        sys_conf: SysConfiguration,
+        field_names: Optional[Sequence[str]] = None,
+        options: FieldOptions = FieldOptions()) -> Dict[str, Any]:
+    """
+    Returns the values of the given fields, or of all fields if none are specified, in order.
+    """
+    if field_names is None:
+        field_names = list(FIELDS)
+    return OrderedDict((name, FIELDS[name](sys_conf, options)) for name in field_names)
+
+
+def shell_value(value: Any) -> str:
+    """
+    Converts a field value to a string suitable for a shell variable. Missing values become empty
+    strings, booleans become "true" or "false", and dictionaries are encoded as JSON.
+
+    >>> shell_value(None), shell_value(True), shell_value({'ID': 'centos'})
+    ('', 'true', '{"ID": "centos"}')
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+def format_field_values(values: Dict[str, Any], output_format: str) -> str:
+    """
+    Formats field values as a JSON object, or as shell export statements that can be evaluated.
+
+    >>> print(format_field_values({'system': 'Linux', 'redhat_release': None}, 'shell'))
+    export SYS_DETECTION_SYSTEM=Linux
+    export SYS_DETECTION_REDHAT_RELEASE=''
+    """
+    if output_format == 'json':
+        return json.dumps(values, indent=2)
+    if output_format == 'shell':
+        import shlex
+        return '\n'.join(
+            'export %s%s=%s' % (SHELL_VAR_PREFIX, name.upper(), shlex.quote(shell_value(value)))
+            for name, value in values.items())
+    raise ValueError("Unknown output format: %s" % output_format)
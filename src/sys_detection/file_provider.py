@@ -0,0 +1,116 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Sources of file contents for SysConfiguration.from_etc_dir and OsReleaseVars.read_file, so that
+configurations can be detected from something other than the local file system, e.g. from an
+in-memory mapping or a packed archive (see sys_detection.packed_archive).
+
+Configurations detected through a file provider have no base directory, because the lazily
+detected properties, e.g. SysConfiguration.cpu_level(), read files on the local system.
+"""
+
+import errno
+import os
+import posixpath
+
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Mapping, Union
+
+
+# File contents. Memory views allow providers to return contents without copying them.
+FileData = Union[bytes, memoryview]
+
+
+def normalize_path(path: str) -> str:
+    """
+    Returns the form of a path used as a key by providers that are not backed by the local file
+    system: relative, with forward slashes, and without "." and ".." components.
+
+    >>> normalize_path('/centos7/./etc/../etc/os-release')
+    'centos7/etc/os-release'
+    """
+    return posixpath.normpath('/' + path.replace(os.sep, '/')).lstrip('/')
+
+
+class FileProvider(ABC):
+    """
+    The interface of file providers. Paths are the ones passed to from_etc_dir, joined with the
+    names of the files in the etc directory.
+    """
+
+    @abstractmethod
+    def read_bytes(self, path: str) -> FileData:
+        """
+        Returns the contents of the given file. Raises FileNotFoundError if it does not exist.
+
+        The contents may be a memory view of a buffer owned by the provider, e.g. of the mapped
+        archive of a PackedArchive, whose close() (also called on leaving a with block) raises
+        BufferError while any such view is still referenced. Callers that keep the contents
+        beyond the lifetime of the provider have to copy them with bytes(), and should release
+        views they no longer need with memoryview.release(), since a view referenced by a frame
+        of a traceback stays alive while the exception propagates.
+        """
+
+    @abstractmethod
+    def is_file(self, path: str) -> bool:
+        pass
+
+
+class LocalFileProvider(FileProvider):
+    """
+    Reads files from the local file system, like from_etc_dir does without a file provider.
+    """
+
+    def read_bytes(self, path: str) -> FileData:
+        with open(path, 'rb') as input_file:
+            return input_file.read()
+
+    def is_file(self, path: str) -> bool:
+        return os.path.isfile(path)
+
+
+def file_not_found_error(path: str) -> FileNotFoundError:
+    """
+    Returns the same exception as open() raises for a missing file.
+    """
+    return FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+
+
+class DictFileProvider(FileProvider):
+    """
+    Serves files from a mapping from paths to contents, e.g. to detect the configurations of large
+    numbers of synthetic root directories without creating any files.
+
+    >>> provider = DictFileProvider({'root1/etc/os-release': b'ID=ubuntu'})
+    >>> provider.is_file('/root1/etc/os-release'), provider.is_file('root1/etc/redhat-release')
+    (True, False)
+    """
+    _files: Dict[str, FileData]
+
+    def __init__(self, files: Mapping[str, FileData]) -> None:
+        self._files = {normalize_path(path): data for path, data in files.items()}
+
+    def read_bytes(self, path: str) -> FileData:
+        data = self._files.get(normalize_path(path))
+        if data is None:
+            raise file_not_found_error(path)
+        return data
+
+    def is_file(self, path: str) -> bool:
+        return normalize_path(path) in self._files
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._files)
+
+    def __len__(self) -> int:
+        return len(self._files)
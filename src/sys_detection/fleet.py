@@ -0,0 +1,330 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Aggregation of detection reports collected from a fleet of nodes into histograms by identifier
+for packaging, operating system, architecture and compatibility class.
+
+Reports are read from JSONL files, optionally gzip-compressed, one JSON object per line. Two kinds
+of records are recognized:
+
+- Records containing a sys_conf object, as printed by "python3 -m sys_detection --scan-root",
+  optionally with the id_for_packaging reported by the node. Records containing an error object
+  are counted as errors.
+- Records of field values, as printed by "python3 -m sys_detection --format json" on one line,
+  containing at least the id_for_packaging, short_os_name, short_os_name_and_version and
+  architecture fields.
+
+Files are streamed line by line, so memory use does not depend on the number of reports, only on
+the number of distinct configurations. Several files, e.g. shards written by different
+collectors, are aggregated in parallel worker processes, and the partial aggregates are merged.
+"""
+
+import gzip
+import io
+import json
+import os
+import sys
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import (
+    Any, BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, cast)
+
+from sys_detection import OsReleaseVars, SysConfiguration
+from sys_detection.os_compatibility import compatibility_class
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# The maximum number of distinct configurations remembered while reading reports. When it is
+# exceeded, e.g. because of malformed input, the table is cleared to keep memory use bounded.
+DEFAULT_MAX_INTERNED = 100000
+
+HISTOGRAM_NAMES = ['id_for_packaging', 'short_os_name', 'architecture', 'compatibility_class']
+
+FIELD_RECORD_KEYS = ['id_for_packaging', 'short_os_name', 'short_os_name_and_version',
+                     'architecture']
+
+
+class ConfigurationSummary(NamedTuple):
+    """
+    The values of a configuration that reports are aggregated by.
+    """
+    id_for_packaging: str
+    short_os_name: str
+    architecture: str
+    compatibility_class: str
+
+    @staticmethod
+    def from_sys_conf(
+            sys_conf: SysConfiguration,
+            id_for_packaging: Optional[str] = None) -> 'ConfigurationSummary':
+        """
+        :param id_for_packaging: The identifier reported by the node, which may contain components
+            that cannot be derived from the configuration alone, e.g. the CPU level. Computed from
+            the configuration if not specified.
+        """
+        return ConfigurationSummary(
+            id_for_packaging=id_for_packaging or sys_conf.id_for_packaging(),
+            short_os_name=sys_conf.short_os_name() or '',
+            architecture=sys_conf.architecture,
+            compatibility_class=compatibility_class(sys_conf.short_os_name_and_version()))
+
+
+class FleetAggregate:
+    """
+    Counts of reports, and histograms of their configurations. Aggregates of different sets of
+    reports are combined with merge.
+    """
+    num_reports: int
+    num_errors: int
+    num_invalid_lines: int
+    # The number of reports of each distinct summary, from which the histograms are computed.
+    summary_counts: 'Counter[ConfigurationSummary]'
+
+    def __init__(self) -> None:
+        self.num_reports = 0
+        self.num_errors = 0
+        self.num_invalid_lines = 0
+        self.summary_counts = Counter()
+
+    def add(self, summary: ConfigurationSummary, count: int = 1) -> None:
+        self.num_reports += count
+        self.summary_counts[summary] += count
+
+    def merge(self, other: 'FleetAggregate') -> None:
+        self.num_reports += other.num_reports
+        self.num_errors += other.num_errors
+        self.num_invalid_lines += other.num_invalid_lines
+        self.summary_counts.update(other.summary_counts)
+
+    @property
+    def histograms(self) -> Dict[str, 'Counter[str]']:
+        """
+        The number of reports by each of the values in HISTOGRAM_NAMES.
+        """
+        histograms: Dict[str, 'Counter[str]'] = {name: Counter() for name in HISTOGRAM_NAMES}
+        for summary, count in self.summary_counts.items():
+            for name, value in zip(HISTOGRAM_NAMES, summary):
+                histograms[name][value] += count
+        return histograms
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FleetAggregate):
+            return NotImplemented
+        return (
+            (self.num_reports, self.num_errors, self.num_invalid_lines, self.summary_counts) ==
+            (other.num_reports, other.num_errors, other.num_invalid_lines, other.summary_counts))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns a JSON-serializable representation, with histogram entries ordered by decreasing
+        count.
+        """
+        return dict(
+            num_reports=self.num_reports,
+            num_errors=self.num_errors,
+            num_invalid_lines=self.num_invalid_lines,
+            histograms={
+                name: dict(_sorted_items(histogram))
+                for name, histogram in self.histograms.items()
+            })
+
+    def format(self, top: Optional[int] = None) -> str:
+        """
+        Formats the aggregate as a human-readable report, with at most the given number of the
+        most frequent values per histogram.
+
+        >>> aggregate = FleetAggregate()
+        >>> aggregate.add(
+        ...     ConfigurationSummary('centos7-x86_64', 'centos', 'x86_64', 'rhel-family:7'))
+        >>> print(aggregate.format(top=1))
+        reports: 1, errors: 0, invalid lines: 0
+        <BLANKLINE>
+        id_for_packaging:
+                 1 100.0%  centos7-x86_64
+        <BLANKLINE>
+        short_os_name:
+                 1 100.0%  centos
+        <BLANKLINE>
+        architecture:
+                 1 100.0%  x86_64
+        <BLANKLINE>
+        compatibility_class:
+                 1 100.0%  rhel-family:7
+        """
+        lines = ['reports: %d, errors: %d, invalid lines: %d' % (
+            self.num_reports, self.num_errors, self.num_invalid_lines)]
+        for name, histogram in self.histograms.items():
+            items = _sorted_items(histogram)
+            lines.extend(['', name + ':'])
+            for value, count in items[:top]:
+                lines.append('%10d %5.1f%%  %s' % (
+                    count, count * 100.0 / max(self.num_reports, 1), value))
+            if top is not None and len(items) > top:
+                lines.append('%10s (%d more)' % ('...', len(items) - top))
+        return '\n'.join(lines)
+
+
+def _sorted_items(histogram: 'Counter[str]') -> List[Tuple[str, int]]:
+    return sorted(histogram.items(), key=lambda item: (-item[1], item[0]))
+
+
+class ReportAggregator:
+    """
+    Adds reports to an aggregate. Each distinct configuration is only parsed into a
+    SysConfiguration and summarized once, and repeated reports of it are looked up by the raw
+    values of the report.
+    """
+    aggregate: FleetAggregate
+    max_interned: int
+
+    _summaries: Dict[Tuple[Any, ...], ConfigurationSummary]
+
+    def __init__(self, max_interned: int = DEFAULT_MAX_INTERNED) -> None:
+        self.aggregate = FleetAggregate()
+        self.max_interned = max_interned
+        self._summaries = {}
+
+    def add_line(self, line: bytes) -> None:
+        if not line.strip():
+            return
+        try:
+            # Decoding first saves json.loads from detecting the encoding.
+            record = json.loads(line.decode('utf-8'))
+        except ValueError:
+            self.aggregate.num_invalid_lines += 1
+            return
+        self.add_record(record)
+
+    def add_record(self, record: Any) -> None:
+        summary: Optional[ConfigurationSummary] = None
+        if isinstance(record, dict):
+            if 'error' in record:
+                self.aggregate.num_errors += 1
+                return
+            try:
+                summary = self._get_summary(record)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                pass
+        if summary is None:
+            self.aggregate.num_invalid_lines += 1
+            return
+        self.aggregate.add(summary)
+
+    def _get_summary(self, record: Dict[str, Any]) -> Optional[ConfigurationSummary]:
+        sys_conf_dict = record.get('sys_conf')
+        if sys_conf_dict is None:
+            return self._get_field_record_summary(record)
+        linux_os_release = sys_conf_dict.get('linux_os_release')
+        key = (
+            sys_conf_dict['system'],
+            sys_conf_dict['architecture'],
+            tuple(linux_os_release.items()) if linux_os_release is not None else None,
+            sys_conf_dict.get('redhat_release'),
+            record.get('id_for_packaging'))
+        summary = self._summaries.get(key)
+        if summary is None:
+            # The base directory refers to the node the report was collected on, so it is not
+            # used, to avoid reading files on this machine.
+            sys_conf = SysConfiguration(
+                system=sys_conf_dict['system'],
+                architecture=sys_conf_dict['architecture'],
+                linux_os_release=(
+                    OsReleaseVars.from_dict(linux_os_release)
+                    if linux_os_release is not None else None),
+                redhat_release=sys_conf_dict.get('redhat_release'))
+            summary = ConfigurationSummary.from_sys_conf(sys_conf, record.get('id_for_packaging'))
+            self._intern(key, summary)
+        return summary
+
+    def _get_field_record_summary(
+            self, record: Dict[str, Any]) -> Optional[ConfigurationSummary]:
+        key = tuple(record.get(name) for name in FIELD_RECORD_KEYS)
+        summary = self._summaries.get(key)
+        if summary is None:
+            field_values: List[str] = []
+            for value in key:
+                if not isinstance(value, str):
+                    return None
+                field_values.append(value)
+            id_for_packaging, short_os_name, short_os_name_and_version, architecture = field_values
+            summary = ConfigurationSummary(
+                id_for_packaging=sys.intern(id_for_packaging),
+                short_os_name=sys.intern(short_os_name),
+                architecture=sys.intern(architecture),
+                compatibility_class=compatibility_class(short_os_name_and_version))
+            self._intern(key, summary)
+        return summary
+
+    def _intern(self, key: Tuple[Any, ...], summary: ConfigurationSummary) -> None:
+        if len(self._summaries) >= self.max_interned:
+            self._summaries.clear()
+        self._summaries[key] = summary
+
+
+@contextmanager
+def open_report_file(path: str) -> Iterator[BinaryIO]:
+    """
+    Opens a file of reports for reading, decompressing it if it starts with the gzip magic number,
+    regardless of its name. The path "-" stands for standard input, which is not closed.
+    """
+    raw_file: BinaryIO = sys.stdin.buffer if path == '-' else open(path, 'rb')
+    try:
+        magic = b''
+        if isinstance(raw_file, io.BufferedReader):
+            magic = raw_file.peek(len(GZIP_MAGIC))[:len(GZIP_MAGIC)]
+        if magic == GZIP_MAGIC:
+            with gzip.GzipFile(fileobj=raw_file, mode='rb') as gzip_file:
+                yield cast(BinaryIO, gzip_file)
+        else:
+            yield raw_file
+    finally:
+        if path != '-':
+            raw_file.close()
+
+
+def aggregate_file(path: str, max_interned: int = DEFAULT_MAX_INTERNED) -> FleetAggregate:
+    """
+    Aggregates the reports in the given file. Malformed lines are counted instead of raising.
+    """
+    aggregator = ReportAggregator(max_interned=max_interned)
+    with open_report_file(path) as input_file:
+        for line in input_file:
+            aggregator.add_line(line)
+    return aggregator.aggregate
+
+
+def aggregate_files(paths: Iterable[str], jobs: Optional[int] = None) -> FleetAggregate:
+    """
+    Aggregates the reports in the given files, in parallel worker processes if there is more than
+    one file, and merges the partial aggregates.
+
+    :param jobs: The number of worker processes. Defaults to the number of CPUs, and is limited to
+        the number of files.
+    """
+    paths = list(paths)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs < 1:
+        raise ValueError("The number of jobs must be positive, got: %d" % jobs)
+    result = FleetAggregate()
+    if jobs == 1 or len(paths) <= 1 or '-' in paths:
+        for path in paths:
+            result.merge(aggregate_file(path))
+        return result
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as executor:
+        for partial_aggregate in executor.map(aggregate_file, paths):
+            result.merge(partial_aggregate)
+    return result
@@ -0,0 +1,143 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Detection of kernel properties that runtime tuning depends on: the kernel release, the base page
+size, the transparent huge page mode and the NUMA topology. They are read from /proc and /sys
+under a root directory, so that they can be tested with fixture trees.
+"""
+
+import os
+import re
+
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sys_detection.cgroup_limits import parse_cpu_list
+
+
+KERNEL_RELEASE_PATH = os.path.join('proc', 'sys', 'kernel', 'osrelease')
+SMAPS_PATH = os.path.join('proc', 'self', 'smaps')
+TRANSPARENT_HUGEPAGE_ENABLED_PATH = os.path.join(
+    'sys', 'kernel', 'mm', 'transparent_hugepage', 'enabled')
+NUMA_NODE_DIR = os.path.join('sys', 'devices', 'system', 'node')
+
+NODE_DIR_NAME_RE = re.compile(r'^node([0-9]+)$')
+# A line of /sys/devices/system/node/node<N>/meminfo, e.g. "Node 0 MemTotal:  65843900 kB".
+NODE_MEM_TOTAL_RE = re.compile(r'^Node [0-9]+ MemTotal:\s+([0-9]+) kB$', re.MULTILINE)
+
+
+class NumaNode(NamedTuple):
+    node_id: int
+    # The CPUs of the node, in the format of the cpulist file, e.g. 0-15,32-47.
+    cpu_list: str
+    memory_bytes: Optional[int]
+
+    def cpu_count(self) -> int:
+        return parse_cpu_list(self.cpu_list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            node_id=self.node_id,
+            cpu_list=self.cpu_list,
+            cpu_count=self.cpu_count(),
+            memory_bytes=self.memory_bytes)
+
+
+def _read_file(path: str) -> Optional[str]:
+    try:
+        with open(path) as input_file:
+            return input_file.read().strip()
+    except OSError:
+        return None
+
+
+def read_kernel_release(base_dir: str) -> Optional[str]:
+    """
+    Returns the kernel release, e.g. 5.15.0-91-generic, as reported by uname -r.
+    """
+    return _read_file(os.path.join(base_dir, KERNEL_RELEASE_PATH)) or None
+
+
+def parse_selected_mode(content: str) -> Optional[str]:
+    """
+    Returns the selected value of a sysfs file that lists the possible values, with the selected
+    one in brackets.
+
+    >>> parse_selected_mode('always [madvise] never')
+    'madvise'
+    >>> parse_selected_mode('always madvise never')
+    """
+    for value in content.split():
+        if value.startswith('[') and value.endswith(']'):
+            return value[1:-1]
+    return None
+
+
+def read_transparent_hugepage_mode(base_dir: str) -> Optional[str]:
+    """
+    Returns the transparent huge page mode: always, madvise or never.
+    """
+    content = _read_file(os.path.join(base_dir, TRANSPARENT_HUGEPAGE_ENABLED_PATH))
+    if content is None:
+        return None
+    return parse_selected_mode(content)
+
+
+def get_page_size(base_dir: str) -> Optional[int]:
+    """
+    Returns the base page size in bytes, e.g. 4096, or 65536 on some aarch64 kernels. For the
+    running system, it is reported by os.sysconf. Otherwise, it is the kernel page size of the
+    first mapping in proc/self/smaps under the root directory.
+    """
+    if os.path.realpath(base_dir) == '/':
+        try:
+            return os.sysconf('SC_PAGE_SIZE')
+        except (AttributeError, ValueError, OSError):
+            pass
+    try:
+        with open(os.path.join(base_dir, SMAPS_PATH)) as smaps_file:
+            for line in smaps_file:
+                if line.startswith('KernelPageSize:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def read_numa_nodes(base_dir: str) -> Optional[List[NumaNode]]:
+    """
+    Returns the NUMA nodes, ordered by node id, or None if the kernel does not report them, e.g.
+    because it was built without NUMA support.
+    """
+    node_dir = os.path.join(base_dir, NUMA_NODE_DIR)
+    try:
+        dir_names = os.listdir(node_dir)
+    except OSError:
+        return None
+    nodes: List[NumaNode] = []
+    for dir_name in dir_names:
+        match = NODE_DIR_NAME_RE.match(dir_name)
+        if not match:
+            continue
+        memory_bytes: Optional[int] = None
+        meminfo = _read_file(os.path.join(node_dir, dir_name, 'meminfo'))
+        if meminfo is not None:
+            mem_total_match = NODE_MEM_TOTAL_RE.search(meminfo)
+            if mem_total_match:
+                memory_bytes = int(mem_total_match.group(1)) * 1024
+        nodes.append(NumaNode(
+            node_id=int(match.group(1)),
+            cpu_list=_read_file(os.path.join(node_dir, dir_name, 'cpulist')) or '',
+            memory_bytes=memory_bytes))
+    if not nodes:
+        return None
+    return sorted(nodes)
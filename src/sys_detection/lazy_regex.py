@@ -0,0 +1,59 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Regular expressions that are compiled on first use, so that importing the modules that define them
+stays cheap for short-lived command-line tools.
+"""
+
+from typing import Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import re
+
+
+class LazyRegex:
+    """
+    A regular expression that is compiled the first time it is used. Attributes of compiled
+    patterns, e.g. match() or pattern, are available directly, so it can be used in place of the
+    compiled pattern. Performance-sensitive code should call get() instead.
+
+    >>> regex = LazyRegex('^[a-z]+$')
+    >>> bool(regex.match('centos')), bool(regex.get().match('centos8'))
+    (True, False)
+    """
+    __slots__ = ('_pattern_str', '_compiled')
+
+    _pattern_str: str
+    _compiled: Optional['re.Pattern[str]']
+
+    def __init__(self, pattern_str: str) -> None:
+        self._pattern_str = pattern_str
+        self._compiled = None
+
+    def get(self) -> 're.Pattern[str]':
+        """
+        Returns the compiled pattern.
+        """
+        compiled = self._compiled
+        if compiled is None:
+            import re
+            compiled = re.compile(self._pattern_str)
+            self._compiled = compiled
+        return compiled
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes of the compiled pattern.
+        return getattr(self.get(), name)
+
+    def __repr__(self) -> str:
+        return 'LazyRegex(%r)' % self._pattern_str
@@ -0,0 +1,265 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Detection of the C library (glibc or musl) and its version without running any programs.
+
+For the running system, the version of glibc is reported by os.confstr. For other root
+directories, e.g. sysroots or unpacked container images, the C library is the one whose dynamic
+linker the shell of the root directory requests, and its version is read from the C library shared
+objects under the root directory.
+"""
+
+import glob
+import mmap
+import os
+import re
+import struct
+
+from typing import List, NamedTuple, Optional, Tuple
+
+
+GLIBC = 'glibc'
+MUSL = 'musl'
+
+# Locations of the dynamic linker and the C library relative to a root directory, in the order in
+# which they are examined.
+SHELL_PATHS = ['bin/sh', 'usr/bin/sh']
+MUSL_LIBRARY_PATTERNS = [
+    'lib/ld-musl-*.so.1',
+    'usr/lib/ld-musl-*.so.1',
+    'lib/libc.musl-*.so.1',
+]
+GLIBC_LIBRARY_PATTERNS = [
+    'lib/*-linux-gnu*/libc.so.6',
+    'usr/lib/*-linux-gnu*/libc.so.6',
+    'lib64/libc.so.6',
+    'usr/lib64/libc.so.6',
+    'lib/libc.so.6',
+    'usr/lib/libc.so.6',
+]
+
+# The type of the ELF program header that specifies the program interpreter.
+PT_INTERP = 3
+
+# Patterns searched for in the contents of the libraries.
+GLIBC_BANNER_RE = re.compile(rb'stable release version ([0-9]+\.[0-9]+(?:\.[0-9]+)?)')
+GLIBC_SYMBOL_VERSION_RE = re.compile(rb'\0GLIBC_([0-9]+\.[0-9]+(?:\.[0-9]+)?)\0')
+MUSL_VERSION_RE = re.compile(rb'\0(1\.[0-9]+\.[0-9]+)\0')
+
+
+class LibcInfo(NamedTuple):
+    name: str
+    version: Optional[str]
+
+    def short_version(self) -> Optional[str]:
+        """
+        Returns the major and minor version, e.g. 2.28 or 1.2.
+        """
+        if self.version is None:
+            return None
+        return '.'.join(self.version.split('.')[:2])
+
+    def id_component(self) -> str:
+        """
+        Returns a component of the identifier for packaging, e.g. glibc2.28 or musl1.2.
+
+        >>> LibcInfo(MUSL, '1.2.2').id_component()
+        'musl1.2'
+        """
+        return self.name + (self.short_version() or '')
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(component) for component in version.split('.'))
+
+
+def parse_confstr_libc_version(value: Optional[str]) -> Optional[LibcInfo]:
+    """
+    Parses the value of os.confstr('CS_GNU_LIBC_VERSION').
+
+    >>> parse_confstr_libc_version('glibc 2.31')
+    LibcInfo(name='glibc', version='2.31')
+    """
+    if not value:
+        return None
+    name, _, version = value.partition(' ')
+    if name != GLIBC or not version:
+        return None
+    return LibcInfo(GLIBC, version)
+
+
+_local_libc: Optional[LibcInfo] = None
+_local_libc_detected = False
+
+
+def get_local_libc() -> Optional[LibcInfo]:
+    """
+    Returns the C library of the running system. The result is cached for the lifetime of the
+    process.
+    """
+    global _local_libc, _local_libc_detected
+    if not _local_libc_detected:
+        try:
+            confstr_value: Optional[str] = os.confstr('CS_GNU_LIBC_VERSION')
+        except (AttributeError, ValueError, OSError):
+            # Not glibc, or not a Unix system.
+            confstr_value = None
+        libc = parse_confstr_libc_version(confstr_value)
+        if libc is None:
+            libc = detect_libc_in_root('/')
+        _local_libc = libc
+        _local_libc_detected = True
+    return _local_libc
+
+
+def _resolve_in_root(base_dir: str, path: str) -> str:
+    """
+    Follows symbolic links of the given file within the root directory, treating absolute link
+    targets as relative to the root directory rather than to the local file system.
+    """
+    for _ in range(40):
+        if not os.path.islink(path):
+            break
+        target = os.readlink(path)
+        if os.path.isabs(target):
+            path = os.path.join(base_dir, target.lstrip('/'))
+        else:
+            path = os.path.join(os.path.dirname(path), target)
+    return path
+
+
+def _find_libraries(base_dir: str, patterns: List[str]) -> List[str]:
+    paths: List[str] = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(os.path.join(base_dir, pattern))))
+    return paths
+
+
+def _search_file(path: str, pattern: 're.Pattern[bytes]') -> List[bytes]:
+    """
+    Returns the first group of all matches of the given pattern in the contents of the file. The
+    file is memory-mapped rather than read.
+    """
+    try:
+        with open(path, 'rb') as library_file:
+            if os.fstat(library_file.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(library_file.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+                return [match.group(1) for match in pattern.finditer(contents)]  # type: ignore
+    except (OSError, ValueError):
+        return []
+
+
+def _get_glibc_version(path: str) -> Optional[str]:
+    match = re.match(r'libc-([0-9]+\.[0-9]+(?:\.[0-9]+)?)\.so$', os.path.basename(path))
+    if match:
+        # Before glibc 2.34, libc.so.6 is a symbolic link to a file named after the version.
+        return match.group(1)
+    banner_versions = _search_file(path, GLIBC_BANNER_RE)
+    if banner_versions:
+        return banner_versions[0].decode('ascii')
+    # The newest symbol version defined by the library.
+    symbol_versions = set(_search_file(path, GLIBC_SYMBOL_VERSION_RE))
+    if symbol_versions:
+        return max((version.decode('ascii') for version in symbol_versions), key=_version_key)
+    return None
+
+
+def read_elf_interpreter(path: str) -> Optional[str]:
+    """
+    Returns the program interpreter, i.e. the dynamic linker, requested by an ELF executable, e.g.
+    /lib64/ld-linux-x86-64.so.2, or None if the file is not a dynamically linked ELF executable.
+    """
+    try:
+        with open(path, 'rb') as elf_file:
+            header = elf_file.read(64)
+            if len(header) < 52 or header[:4] != b'\x7fELF':
+                return None
+            byte_order = '<' if header[5] == 1 else '>'
+            if header[4] == 2 and len(header) == 64:
+                # 64-bit: p_type, p_offset and p_filesz of each program header.
+                phoff, = struct.unpack_from(byte_order + 'Q', header, 32)
+                phentsize, phnum = struct.unpack_from(byte_order + 'HH', header, 54)
+                program_header_format = byte_order + 'I4xQ16xQ'
+            elif header[4] == 1:
+                phoff, = struct.unpack_from(byte_order + 'I', header, 28)
+                phentsize, phnum = struct.unpack_from(byte_order + 'HH', header, 42)
+                program_header_format = byte_order + 'II8xI'
+            else:
+                return None
+            if phentsize < struct.calcsize(program_header_format):
+                return None
+            elf_file.seek(phoff)
+            program_headers = elf_file.read(phentsize * phnum)
+            for offset in range(0, len(program_headers) - phentsize + 1, phentsize):
+                p_type, p_offset, p_filesz = struct.unpack_from(
+                    program_header_format, program_headers, offset)
+                if p_type == PT_INTERP:
+                    elf_file.seek(p_offset)
+                    interpreter = elf_file.read(min(p_filesz, 4096)).split(b'\0', 1)[0]
+                    return interpreter.decode('utf-8', 'replace') or None
+    except (OSError, struct.error):
+        pass
+    return None
+
+
+def _is_musl_library(path: str) -> bool:
+    file_name = os.path.basename(path)
+    return file_name.startswith('ld-musl-') or file_name.startswith('libc.musl-')
+
+
+def _detect_musl(base_dir: str) -> Optional[LibcInfo]:
+    for path in _find_libraries(base_dir, MUSL_LIBRARY_PATTERNS):
+        musl_versions = _search_file(_resolve_in_root(base_dir, path), MUSL_VERSION_RE)
+        return LibcInfo(MUSL, musl_versions[0].decode('ascii') if musl_versions else None)
+    return None
+
+
+def _detect_glibc(base_dir: str) -> Optional[LibcInfo]:
+    for path in _find_libraries(base_dir, GLIBC_LIBRARY_PATTERNS):
+        resolved_path = _resolve_in_root(base_dir, path)
+        if _is_musl_library(resolved_path):
+            # E.g. the glibc compatibility links of musl-based distributions.
+            continue
+        return LibcInfo(GLIBC, _get_glibc_version(resolved_path))
+    return None
+
+
+def detect_libc_in_root(base_dir: str) -> Optional[LibcInfo]:
+    """
+    Detects the C library of the system rooted at the given directory by examining its shell and
+    shared objects. Returns None if no C library is found.
+
+    Systems based on glibc can have musl installed as well, e.g. Debian's musl package, so the
+    presence of musl does not mean that it is the C library of the system. The dynamic linker
+    requested by the shell decides. If the shell is not a dynamically linked ELF executable, glibc
+    takes precedence.
+    """
+    for shell_path in SHELL_PATHS:
+        interpreter = read_elf_interpreter(
+            _resolve_in_root(base_dir, os.path.join(base_dir, shell_path)))
+        if interpreter is not None:
+            if _is_musl_library(interpreter):
+                return _detect_musl(base_dir) or LibcInfo(MUSL, None)
+            return _detect_glibc(base_dir) or LibcInfo(GLIBC, None)
+    return _detect_glibc(base_dir) or _detect_musl(base_dir)
+
+
+def detect_libc(base_dir: str) -> Optional[LibcInfo]:
+    """
+    Detects the C library of the system rooted at the given directory, using os.confstr if it is
+    the root directory of the running system.
+    """
+    if os.path.realpath(base_dir) == '/':
+        return get_local_libc()
+    return detect_libc_in_root(base_dir)
@@ -0,0 +1,57 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Detection of the macOS version from System/Library/CoreServices/SystemVersion.plist under a root
+directory, without running sw_vers.
+"""
+
+import os
+import plistlib
+
+from typing import Optional
+from xml.parsers.expat import ExpatError
+
+
+SYSTEM_VERSION_PLIST_PATH = os.path.join(
+    'System', 'Library', 'CoreServices', 'SystemVersion.plist')
+
+
+def read_macos_version(base_dir: str) -> Optional[str]:
+    """
+    Returns the product version, e.g. 14.2.1, from the SystemVersion.plist file under the given
+    root directory, or None if the file does not exist or cannot be parsed.
+    """
+    try:
+        with open(os.path.join(base_dir, SYSTEM_VERSION_PLIST_PATH), 'rb') as plist_file:
+            plist = plistlib.load(plist_file)
+    except (OSError, ValueError, ExpatError):
+        return None
+    if not isinstance(plist, dict):
+        return None
+    version = plist.get('ProductVersion')
+    if not isinstance(version, str) or not version:
+        return None
+    return version
+
+
+def short_macos_version(version: str) -> str:
+    """
+    Returns the version to use in identifiers, which is the major version since macOS 11, and the
+    major and minor version before that, because e.g. 10.14 and 10.15 are different releases.
+
+    >>> short_macos_version('14.2.1'), short_macos_version('11.0'), short_macos_version('10.15.7')
+    ('14', '11', '10.15')
+    """
+    components = version.split('.')
+    num_version_components = 2 if components[0] == '10' else 1
+    return '.'.join(components[:num_version_components])
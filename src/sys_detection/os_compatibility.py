@@ -10,10 +10,54 @@
 # or implied. See the License for the specific language governing permissions and limitations
 # under the License.
 
-import re
+from typing import Dict, Generic, Iterable, List, Sequence, Tuple, TypeVar
 
+from sys_detection.lazy_regex import LazyRegex
 
-RHEL_FAMILY_RE = re.compile(r'^(almalinux|centos|rhel|rocky)([0-9]+)$')
+
+REDHAT_FAMILY_OS_NAMES = ['almalinux', 'centos', 'rhel', 'rocky', 'ol']
+
+# The rules that determine which operating systems are compatible with each other. Every entry maps
+# the name of a family to the operating systems in it. Operating systems of the same family are
+# compatible if they have the same major version, specified as a number right after the name, e.g.
+# centos8 and almalinux8. Any other operating system is only compatible with itself.
+OS_FAMILY_RULES: List[Tuple[str, List[str]]] = [
+    ('rhel-family', REDHAT_FAMILY_OS_NAMES),
+]
+
+_OS_FAMILY_BY_OS_NAME: Dict[str, str] = {
+    os_name: family_name
+    for family_name, os_names in OS_FAMILY_RULES
+    for os_name in os_names
+}
+
+RHEL_FAMILY_RE_STR = r'^(%s)([0-9]+)$' % '|'.join(REDHAT_FAMILY_OS_NAMES)
+RHEL_FAMILY_RE = LazyRegex(RHEL_FAMILY_RE_STR)
+
+DIGITS = '0123456789'
+
+
+def compatibility_class(os_and_version: str) -> str:
+    """
+    Returns a canonical name of the set of operating systems compatible with the given combination
+    of operating system name and version. Two combinations are compatible if and only if they have
+    the same compatibility class.
+
+    >>> compatibility_class('centos8')
+    'rhel-family:8'
+    >>> compatibility_class('ol7')
+    'rhel-family:7'
+    >>> compatibility_class('ubuntu20.04')
+    'ubuntu20.04'
+    >>> compatibility_class('centos')
+    'centos'
+    """
+    os_name = os_and_version.rstrip(DIGITS)
+    if len(os_name) < len(os_and_version):
+        family_name = _OS_FAMILY_BY_OS_NAME.get(os_name)
+        if family_name is not None:
+            return '%s:%s' % (family_name, os_and_version[len(os_name):])
+    return os_and_version
 
 
 def is_compatible_os(archive_os: str, target_os: str) -> bool:
@@ -28,11 +72,61 @@ def is_compatible_os(archive_os: str, target_os: str) -> bool:
     True
     >>> is_compatible_os('rocky8', 'almalinux8')
     True
+    >>> is_compatible_os('ol8', 'centos8')
+    True
     >>> is_compatible_os('ubuntu20.04', 'centos8')
     False
     """
-    rhel_like1 = RHEL_FAMILY_RE.match(archive_os)
-    rhel_like2 = RHEL_FAMILY_RE.match(target_os)
-    if rhel_like1 and rhel_like2 and rhel_like1.group(2) == rhel_like2.group(2):
-        return True
-    return archive_os == target_os
+    return archive_os == target_os or (
+        compatibility_class(archive_os) == compatibility_class(target_os))
+
+
+T = TypeVar('T')
+
+
+class CompatibilityIndex(Generic[T]):
+    """
+    An index of items, e.g. names of prebuilt archives, by the operating system name and version
+    they were built for. Every operating system name and version is canonicalized into its
+    compatibility class once on insertion, so looking up all items compatible with a target takes
+    constant time.
+
+    >>> index: CompatibilityIndex[str] = CompatibilityIndex()
+    >>> index.add_all([('centos7', 'a.tar.gz'), ('almalinux8', 'b.tar.gz'), ('ol8', 'c.tar.gz')])
+    >>> index.find_compatible('rocky8')
+    ['b.tar.gz', 'c.tar.gz']
+    >>> index.find_compatible('ubuntu20.04')
+    []
+    """
+    _items_by_class: Dict[str, List[T]]
+    _num_items: int
+
+    def __init__(self) -> None:
+        self._items_by_class = {}
+        self._num_items = 0
+
+    def add(self, os_and_version: str, item: T) -> None:
+        self._items_by_class.setdefault(compatibility_class(os_and_version), []).append(item)
+        self._num_items += 1
+
+    def add_all(self, entries: Iterable[Tuple[str, T]]) -> None:
+        # Catalogs typically contain many entries for the same operating system, so memoize the
+        # canonicalization within one bulk insertion.
+        items_by_os_and_version: Dict[str, List[T]] = {}
+        for os_and_version, item in entries:
+            items = items_by_os_and_version.get(os_and_version)
+            if items is None:
+                items = self._items_by_class.setdefault(compatibility_class(os_and_version), [])
+                items_by_os_and_version[os_and_version] = items
+            items.append(item)
+            self._num_items += 1
+
+    def find_compatible(self, target_os_and_version: str) -> Sequence[T]:
+        """
+        Returns all items compatible with the given operating system name and version, in the order
+        they were added. The returned sequence must not be modified.
+        """
+        return self._items_by_class.get(compatibility_class(target_os_and_version), [])
+
+    def __len__(self) -> int:
+        return self._num_items
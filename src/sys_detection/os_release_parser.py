@@ -0,0 +1,174 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+A single-pass parser for os-release files.
+
+The format is a subset of shell variable assignments, as described in os-release(5):
+- Lines starting with # are comments, and so are words starting with # in unquoted values.
+- Values can be unquoted, single-quoted or double-quoted, and adjacent parts are concatenated.
+- In double quotes, a backslash escapes $, `, " and \\. Outside of quotes, a backslash escapes
+  any character.
+- Every assignment is on one line. A quote that is not closed on the same line ends at the end of
+  the line, so that a broken value never affects the following lines.
+"""
+
+from typing import Dict, List, Tuple, Union
+
+
+OsReleaseData = Union[str, bytes, bytearray, memoryview]
+
+WHITESPACE = ' \t\r\f\v'
+
+# Characters that require the slow, character-by-character path when they occur in a value.
+SPECIAL_CHARS = '"\'\\#'
+
+DOUBLE_QUOTE_ESCAPABLE_CHARS = '$`"\\'
+
+
+def decode_os_release_data(data: OsReleaseData) -> str:
+    if isinstance(data, str):
+        return data
+    return str(data, 'utf-8', 'replace')
+
+
+def _parse_double_quoted(text: str, pos: int, end: int) -> Tuple[str, int]:
+    """
+    Parses the contents of a double-quoted string starting right after the opening quote, and
+    returns the contents and the position right after the closing quote, or the end position if
+    the quote is not closed.
+    """
+    chars: List[str] = []
+    while pos < end:
+        c = text[pos]
+        if c == '"':
+            return ''.join(chars), pos + 1
+        if c == '\\' and pos + 1 < end and text[pos + 1] in DOUBLE_QUOTE_ESCAPABLE_CHARS:
+            pos += 1
+            c = text[pos]
+        chars.append(c)
+        pos += 1
+    return ''.join(chars), end
+
+
+def _parse_value_slow(text: str, pos: int, end: int) -> str:
+    """
+    Parses a value from the given position to the end of its line, and returns the value. Handles
+    quoting, escaping and comments.
+    """
+    chars = []
+    # The length of the value without the trailing unquoted whitespace.
+    value_len = 0
+    at_word_start = True
+    while pos < end:
+        c = text[pos]
+        if c in WHITESPACE:
+            chars.append(c)
+            at_word_start = True
+            pos += 1
+            continue
+        if c == '#' and at_word_start:
+            # A comment extends to the end of the line.
+            break
+        at_word_start = False
+        if c == "'":
+            closing_pos = text.find("'", pos + 1, end)
+            if closing_pos == -1:
+                # An unterminated quote ends at the end of the line.
+                closing_pos = end
+            chars.append(text[pos + 1:closing_pos])
+            pos = closing_pos + 1
+        elif c == '"':
+            quoted, pos = _parse_double_quoted(text, pos + 1, end)
+            chars.append(quoted)
+        elif c == '\\':
+            if pos + 1 < end:
+                chars.append(text[pos + 1])
+                pos += 2
+            else:
+                pos += 1
+        else:
+            chars.append(c)
+            pos += 1
+        value_len = len(chars)
+    return ''.join(chars[:value_len])
+
+
+def _parse_value(text: str, pos: int, end: int) -> Tuple[str, int]:
+    while pos < end and text[pos] in WHITESPACE:
+        pos += 1
+    line_end = text.find('\n', pos, end)
+    if line_end == -1:
+        line_end = end
+    raw_value = text[pos:line_end].rstrip(WHITESPACE)
+
+    # Fast paths for the common cases of an unquoted value without special characters, and a
+    # double-quoted value without escapes.
+    if raw_value.startswith('"'):
+        if (len(raw_value) >= 2 and raw_value.endswith('"') and
+                raw_value.find('"', 1, -1) == -1 and raw_value.find('\\') == -1):
+            return raw_value[1:-1], line_end
+    elif not any(c in raw_value for c in SPECIAL_CHARS):
+        return raw_value, line_end
+
+    return _parse_value_slow(text, pos, line_end), line_end
+
+
+def parse_os_release(data: OsReleaseData) -> Dict[str, str]:
+    """
+    Parses the contents of an os-release file, given as a string or a bytes-like object, and
+    returns a dictionary mapping lowercase variable names to their values.
+
+    >>> parse_os_release(b'NAME="CentOS Linux"\\nVERSION_ID=8 # comment\\n# ID=x\\nID=centos\\n')
+    {'name': 'CentOS Linux', 'version_id': '8', 'id': 'centos'}
+    >>> parse_os_release('A="unterminated\\nB="x"\\nC=\\'x y\\'"z"\\nD=a=b\\n')
+    {'a': 'unterminated', 'b': 'x', 'c': 'x yz', 'd': 'a=b'}
+    """
+    text = decode_os_release_data(data)
+    result: Dict[str, str] = {}
+    pos = 0
+    end = len(text)
+    while pos < end:
+        c = text[pos]
+        if c == '\n' or c in WHITESPACE:
+            pos += 1
+            continue
+        line_end = text.find('\n', pos)
+        if line_end == -1:
+            line_end = end
+        if c == '#':
+            pos = line_end + 1
+            continue
+        equals_pos = text.find('=', pos, line_end)
+        if equals_pos == -1:
+            # Not an assignment, ignore the line.
+            pos = line_end + 1
+            continue
+        key = text[pos:equals_pos].rstrip(WHITESPACE).lower()
+        value, pos = _parse_value(text, equals_pos + 1, end)
+        result[key] = value
+        pos += 1
+    return result
+
+
+def parse_os_release_value(s: str) -> str:
+    """
+    Parses one value, e.g. the right-hand side of an assignment in an os-release file.
+
+    >>> parse_os_release_value('"a"')
+    'a'
+    >>> parse_os_release_value("'a b'\\"c\\\\\\"\\"")
+    'a bc"'
+    >>> parse_os_release_value('Hello World # comment')
+    'Hello World'
+    """
+    return _parse_value(s, 0, len(s))[0]
@@ -0,0 +1,126 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Parses identifiers produced by SysConfiguration.id_for_packaging, such as centos8-clang11-x86_64,
+back into their components.
+"""
+
+import re
+
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from sys_detection import SHORT_OS_NAMES, SysConfiguration
+
+
+KNOWN_ARCHITECTURES = ['x86_64', 'aarch64', 'arm64', 'i686', 'armv7l', 'ppc64le', 's390x']
+
+_EMPTY_MID_PART: Tuple[str, ...] = ()
+
+
+class PackagingId(NamedTuple):
+    os_name: str
+    # Empty for operating systems without a version, e.g. rolling distributions.
+    os_version: str
+    mid_part: Tuple[str, ...]
+    architecture: str
+
+    def short_os_name_and_version(self) -> str:
+        return self.os_name + self.os_version
+
+    def to_string(self, separator: str = SysConfiguration.ID_COMPONENT_SEPARATOR) -> str:
+        return separator.join(
+            (self.short_os_name_and_version(),) + self.mid_part + (self.architecture,))
+
+
+class PackagingIdParser:
+    """
+    Parses packaging identifiers using one regular expression compiled from the known operating
+    system names and architectures.
+
+    >>> parser = PackagingIdParser()
+    >>> parser.parse('centos8-clang11-x86_64')
+    PackagingId(os_name='centos', os_version='8', mid_part=('clang11',), architecture='x86_64')
+    >>> parser.parse('opensuse-leap15.0-aarch64')
+    PackagingId(os_name='opensuse-leap', os_version='15.0', mid_part=(), architecture='aarch64')
+    >>> parser.parse('unknown-x86_64') is None
+    True
+    >>> PackagingIdParser(separator='_').parse('arch_gcc9_lto_x86_64').mid_part
+    ('gcc9', 'lto')
+    """
+    separator: str
+    _pattern: 're.Pattern[str]'
+
+    def __init__(
+            self,
+            separator: str = SysConfiguration.ID_COMPONENT_SEPARATOR,
+            os_names: Iterable[str] = SHORT_OS_NAMES,
+            architectures: Iterable[str] = KNOWN_ARCHITECTURES) -> None:
+        if not separator:
+            raise ValueError("The separator must not be empty")
+        self.separator = separator
+
+        def alternation(names: Iterable[str]) -> str:
+            # Longer names first, so that a name is never cut short by another name it starts with.
+            return '|'.join(re.escape(name) for name in sorted(set(names), key=lambda s: -len(s)))
+
+        escaped_separator = re.escape(separator)
+        self._pattern = re.compile(
+            f'({alternation(os_names)})'
+            r'([0-9]+(?:\.[0-9]+)*)?'
+            f'(?:{escaped_separator}(.*?))?'
+            f'{escaped_separator}({alternation(architectures)})')
+
+    def parse(self, s: str) -> Optional[PackagingId]:
+        match = self._pattern.fullmatch(s)
+        if match is None:
+            return None
+        os_name, os_version, mid_part, architecture = match.groups()
+        return PackagingId(
+            os_name,
+            os_version or '',
+            _EMPTY_MID_PART if mid_part is None else tuple(mid_part.split(self.separator)),
+            architecture)
+
+    def parse_many(self, lines: Iterable[str], strict: bool = False) -> Iterator[PackagingId]:
+        """
+        Parses the given identifiers one by one, e.g. the lines of a bucket listing. Surrounding
+        whitespace, including trailing newlines, is ignored. Identifiers that cannot be parsed are
+        skipped, or cause a ValueError if strict is True.
+        """
+        fullmatch = self._pattern.fullmatch
+        separator = self.separator
+        for line in lines:
+            match = fullmatch(line.strip())
+            if match is None:
+                if strict:
+                    raise ValueError("Invalid packaging identifier: %r" % line)
+                continue
+            os_name, os_version, mid_part, architecture = match.groups()
+            yield PackagingId(
+                os_name,
+                os_version or '',
+                _EMPTY_MID_PART if mid_part is None else tuple(mid_part.split(separator)),
+                architecture)
+
+
+_default_parsers: Dict[str, PackagingIdParser] = {}
+
+
+def parse_packaging_id(
+        s: str,
+        separator: str = SysConfiguration.ID_COMPONENT_SEPARATOR) -> Optional[PackagingId]:
+    parser = _default_parsers.get(separator)
+    if parser is None:
+        parser = PackagingIdParser(separator)
+        _default_parsers[separator] = parser
+    return parser.parse(s)
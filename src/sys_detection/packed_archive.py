@@ -0,0 +1,170 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+A single-file archive of many small files, e.g. of the test data corpus or of a large synthetic
+fleet of root directories, that is read through mmap without copying file contents.
+
+The archive consists of the magic string, the contents of all files, with identical contents
+stored once, a JSON index mapping every path to the offset and size of its contents, and a trailer
+containing the offset and size of the index followed by the magic string again.
+
+    with PackedArchive('corpus.pack') as archive:
+        for root in archive.get_roots():
+            sys_conf = SysConfiguration.from_etc_dir(
+                'Linux', 'x86_64', root + '/etc', file_provider=archive)
+"""
+
+import json
+import mmap
+import os
+import struct
+
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from sys_detection.file_provider import (
+    FileData, FileProvider, file_not_found_error, normalize_path)
+
+
+MAGIC = b'SYSDPAK1'
+FORMAT_VERSION = 1
+
+# The offset and size of the index, followed by the magic string.
+TRAILER_STRUCT = struct.Struct('<QQ8s')
+
+
+def iter_dir_files(root_dir: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yields the paths, relative to the given directory, and contents of all regular files in it,
+    in sorted order. Symbolic links to files are stored as copies of their targets.
+    """
+    for dir_path, dir_names, file_names in os.walk(root_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            path = os.path.join(dir_path, file_name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'rb') as input_file:
+                data = input_file.read()
+            yield normalize_path(os.path.relpath(path, root_dir)), data
+
+
+def write_packed_archive(files: Iterable[Tuple[str, bytes]], output_path: str) -> int:
+    """
+    Writes an archive containing the given files, given as pairs of paths and contents, and returns
+    the number of files. The archive is written to a temporary file first, and then renamed.
+    """
+    index: Dict[str, List[int]] = {}
+    offsets_by_data: Dict[bytes, int] = {}
+    tmp_path = '%s.tmp.%d' % (output_path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as output_file:
+            output_file.write(MAGIC)
+            offset = len(MAGIC)
+            for path, data in files:
+                data_offset = offsets_by_data.get(data)
+                if data_offset is None:
+                    data_offset = offset
+                    offsets_by_data[data] = data_offset
+                    output_file.write(data)
+                    offset += len(data)
+                index[normalize_path(path)] = [data_offset, len(data)]
+            index_data = json.dumps(
+                dict(version=FORMAT_VERSION, files=index), separators=(',', ':')).encode('utf-8')
+            output_file.write(index_data)
+            output_file.write(TRAILER_STRUCT.pack(offset, len(index_data), MAGIC))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(index)
+
+
+class PackedArchive(FileProvider):
+    """
+    A file provider reading from an archive written by write_packed_archive. The contents returned
+    by read_bytes are memory views of the mapped archive. They have to be released before the
+    archive is closed, otherwise close() raises BufferError (see FileProvider.read_bytes).
+    """
+    path: str
+
+    _mmap: mmap.mmap
+    _view: memoryview
+    _index: Dict[str, List[int]]
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, 'rb') as archive_file:
+            try:
+                self._mmap = mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file cannot be mapped.
+                raise ValueError("Not a packed archive: %s" % path)
+        try:
+            self._index = self._read_index()
+        except BaseException:
+            self._mmap.close()
+            raise
+        self._view = memoryview(self._mmap)
+
+    def _read_index(self) -> Dict[str, List[int]]:
+        archive_size = len(self._mmap)
+        if archive_size < len(MAGIC) + TRAILER_STRUCT.size or \
+                self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a packed archive: %s" % self.path)
+        index_offset, index_size, trailer_magic = TRAILER_STRUCT.unpack_from(
+            self._mmap, archive_size - TRAILER_STRUCT.size)
+        if trailer_magic != MAGIC or \
+                index_offset + index_size != archive_size - TRAILER_STRUCT.size:
+            raise ValueError("Truncated or corrupted packed archive: %s" % self.path)
+        index = json.loads(self._mmap[index_offset:index_offset + index_size].decode('utf-8'))
+        if index.get('version') != FORMAT_VERSION:
+            raise ValueError("Unsupported packed archive version %s: %s" % (
+                index.get('version'), self.path))
+        files: Dict[str, List[int]] = index['files']
+        return files
+
+    def read_bytes(self, path: str) -> FileData:
+        entry = self._index.get(normalize_path(path))
+        if entry is None:
+            raise file_not_found_error(path)
+        offset, size = entry
+        return self._view[offset:offset + size]
+
+    def is_file(self, path: str) -> bool:
+        return normalize_path(path) in self._index
+
+    def get_roots(self) -> List[str]:
+        """
+        Returns the top-level directories of the archive that contain etc/os-release, e.g. the
+        names of the directories of the test data corpus.
+        """
+        return sorted(
+            path[:-len('/etc/os-release')] for path in self._index
+            if path.endswith('/etc/os-release') and path.count('/') == 2)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> 'PackedArchive':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
@@ -0,0 +1,140 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Thread-safe in-memory memoization of detected configurations, keyed by base directory.
+"""
+
+import os
+import threading
+
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from sys_detection import (
+    SysConfiguration, get_configuration_files_signature, get_system_and_machine,
+    _stats_increment)
+
+
+DEFAULT_MAX_SIZE = 64
+
+
+def detect_root(base_dir: str) -> SysConfiguration:
+    system, machine = get_system_and_machine()
+    return SysConfiguration.from_etc_dir(
+        system=system,
+        architecture=machine,
+        etc_dir_path=os.path.join(base_dir, 'etc'))
+
+
+class _Entry:
+    __slots__ = ('lock', 'sys_conf', 'signature')
+
+    lock: threading.Lock
+    sys_conf: Optional[SysConfiguration]
+    signature: Optional[List[Optional[Tuple[int, int, int]]]]
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.sys_conf = None
+        self.signature = None
+
+
+class RootCache:
+    """
+    A bounded LRU cache of configurations by base directory. Concurrent requests for the same base
+    directory wait for a single detection instead of duplicating the work, while requests for
+    different base directories proceed in parallel.
+    """
+    max_size: int
+
+    _lock: threading.Lock
+    _entries: 'OrderedDict[str, _Entry]'
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        if max_size < 1:
+            raise ValueError("The maximum cache size must be positive, got: %d" % max_size)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _get_entry(self, base_dir: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(base_dir)
+            if entry is None:
+                entry = _Entry()
+                self._entries[base_dir] = entry
+                if len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(base_dir)
+            return entry
+
+    def get(self, base_dir: str = '/', validate: bool = False) -> SysConfiguration:
+        """
+        Returns the configuration of the system rooted at the given directory, detecting it if it
+        is not cached yet.
+
+        :param validate: Compare the inode numbers, modification times and sizes of the
+            configuration files with those recorded when the cached configuration was detected,
+            and detect the configuration again if they differ.
+        """
+        base_dir = os.path.abspath(base_dir)
+        entry = self._get_entry(base_dir)
+        with entry.lock:
+            etc_dir_path = os.path.join(base_dir, 'etc')
+            if entry.sys_conf is not None and (
+                    not validate or
+                    entry.signature == get_configuration_files_signature(etc_dir_path)):
+                _stats_increment('root_cache.hits')
+                return entry.sys_conf
+            _stats_increment('root_cache.misses')
+            # Record the signature before reading the files, so that a concurrent modification is
+            # detected by the next validation.
+            signature = get_configuration_files_signature(etc_dir_path)
+            sys_conf = detect_root(base_dir)
+            entry.signature = signature
+            entry.sys_conf = sys_conf
+            return sys_conf
+
+    def invalidate(self, base_dir: Optional[str] = None) -> None:
+        """
+        Forgets the cached configuration of the given base directory, or of all base directories if
+        none is specified.
+        """
+        with self._lock:
+            if base_dir is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(base_dir), None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_default_root_cache = RootCache()
+
+
+def get_default_root_cache() -> RootCache:
+    """
+    Returns the cache used by SysConfiguration.from_local_system.
+    """
+    return _default_root_cache
+
+
+def invalidate(base_dir: Optional[str] = None) -> None:
+    """
+    Makes SysConfiguration.from_local_system detect the configuration of the given base directory,
+    or of all base directories, again on the next call.
+    """
+    _default_root_cache.invalidate(base_dir)
@@ -0,0 +1,228 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Opt-in instrumentation of the detection stages: per-stage timers and counters such as the number
+of files read or cache hits and misses.
+
+Collection is disabled by default. While it is disabled, recording a stage costs a function call
+and a check of a module-level flag, and nothing is stored. The sys_detection package itself does
+not import this module, so that "import sys_detection" stays fast, and only calls into it while
+collection is enabled.
+
+>>> enable()
+>>> increment('files_read')
+>>> increment('bytes_read', 100)
+>>> get_stats().counters
+{'files_read': 1, 'bytes_read': 100}
+>>> disable()
+>>> increment('files_read')
+>>> get_stats().counters['files_read']
+1
+"""
+
+import sys
+import time
+
+from typing import Any, ContextManager, Dict, List, Optional, TYPE_CHECKING
+
+import sys_detection
+
+from sys_detection import _NULL_TIMER
+
+if TYPE_CHECKING:
+    import threading
+
+
+# Read by the instrumented code. Use enable() and disable() to change it.
+enabled = False
+
+_lock: Optional['threading.Lock'] = None
+
+# Maps a stage name to a list of [number of calls, total time in seconds].
+_timers: Dict[str, List[float]] = {}
+_counters: Dict[str, int] = {}
+
+
+class TimerStats:
+    __slots__ = ('calls', 'total_sec')
+
+    calls: int
+    total_sec: float
+
+    def __init__(self, calls: int, total_sec: float) -> None:
+        self.calls = calls
+        self.total_sec = total_sec
+
+    @property
+    def mean_sec(self) -> float:
+        return self.total_sec / self.calls if self.calls else 0.0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TimerStats):
+            return NotImplemented
+        return (self.calls, self.total_sec) == (other.calls, other.total_sec)
+
+    def __repr__(self) -> str:
+        return 'TimerStats(calls=%d, total_sec=%r)' % (self.calls, self.total_sec)
+
+
+class Stats:
+    """
+    A snapshot of the collected statistics. Stages and counters are in the order in which they
+    were first recorded, so a stage is listed after the stages nested in it, whose time it
+    includes.
+    """
+    __slots__ = ('timers', 'counters')
+
+    timers: Dict[str, TimerStats]
+    counters: Dict[str, int]
+
+    def __init__(self, timers: Dict[str, TimerStats], counters: Dict[str, int]) -> None:
+        self.timers = timers
+        self.counters = counters
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Stats):
+            return NotImplemented
+        return (self.timers, self.counters) == (other.timers, other.counters)
+
+    def __repr__(self) -> str:
+        return 'Stats(timers=%r, counters=%r)' % (self.timers, self.counters)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            timers={
+                name: dict(calls=timer_stats.calls, total_sec=timer_stats.total_sec)
+                for name, timer_stats in self.timers.items()
+            },
+            counters=dict(self.counters))
+
+    def format(self) -> str:
+        """
+        Returns a human-readable breakdown of the statistics.
+
+        >>> print(Stats(timers={'from_etc_dir': TimerStats(2, 0.0005)},
+        ...             counters={'files_read': 4}).format())
+        stage                            calls   total ms    mean us
+        from_etc_dir                         2      0.500      250.0
+        <BLANKLINE>
+        counter                          value
+        files_read                           4
+        """
+        lines = ['%-30s %7s %10s %10s' % ('stage', 'calls', 'total ms', 'mean us')]
+        for name, timer_stats in self.timers.items():
+            lines.append('%-30s %7d %10.3f %10.1f' % (
+                name, timer_stats.calls, timer_stats.total_sec * 1e3,
+                timer_stats.mean_sec * 1e6))
+        lines.append('')
+        lines.append('%-30s %7s' % ('counter', 'value'))
+        for name, value in self.counters.items():
+            lines.append('%-30s %7d' % (name, value))
+        return '\n'.join(lines)
+
+
+def enable(reset_stats: bool = True) -> None:
+    """
+    Starts collecting statistics, discarding the previously collected ones unless reset_stats is
+    False.
+    """
+    global enabled, _lock
+    if _lock is None:
+        import threading
+        _lock = threading.Lock()
+    if reset_stats:
+        reset()
+    enabled = True
+    sys_detection._stats = sys.modules[__name__]
+
+
+def disable() -> None:
+    """
+    Stops collecting statistics. The collected ones remain available through get_stats().
+    """
+    global enabled
+    enabled = False
+    sys_detection._stats = None
+
+
+def reset() -> None:
+    global _timers, _counters
+    _timers = {}
+    _counters = {}
+
+
+def get_stats() -> Stats:
+    """
+    Returns a snapshot of the statistics collected so far. The snapshot is taken under the lock,
+    so that it is consistent even if other threads are recording statistics.
+    """
+    if _lock is None:
+        # Collection has never been enabled, so nothing has been recorded.
+        return Stats(timers={}, counters={})
+    with _lock:
+        return Stats(
+            timers={
+                name: TimerStats(int(calls), total_sec)
+                for name, (calls, total_sec) in _timers.items()
+            },
+            counters=dict(_counters))
+
+
+def increment(name: str, amount: int = 1) -> None:
+    if not enabled:
+        return
+    assert _lock is not None
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def add_time(name: str, elapsed_sec: float) -> None:
+    """
+    Records one run of the given stage that took the given time.
+    """
+    if not enabled:
+        return
+    assert _lock is not None
+    with _lock:
+        timer_stats = _timers.get(name)
+        if timer_stats is None:
+            _timers[name] = [1.0, elapsed_sec]
+        else:
+            timer_stats[0] += 1
+            timer_stats[1] += elapsed_sec
+
+
+class _Timer:
+    __slots__ = ('name', 'start_time')
+
+    name: str
+    start_time: float
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start_time = time.perf_counter()
+
+    def __exit__(self, *args: object) -> None:
+        add_time(self.name, time.perf_counter() - self.start_time)
+
+
+def timer(name: str) -> ContextManager[None]:
+    """
+    Returns a context manager that records the time spent in the given stage. When collection is
+    disabled, a shared object that does nothing is returned.
+    """
+    if not enabled:
+        return _NULL_TIMER
+    return _Timer(name)
@@ -0,0 +1,325 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Discovery of the GCC and Clang compilers installed on the local system, e.g. to include the
+compiler in the identifier for packaging:
+
+    sys_conf.id_for_packaging(mid_part=[find_toolchain('clang').mid_part_token()])
+
+Compilers are looked for in the directories on PATH and in well-known installation prefixes, and
+their versions are probed in parallel by running them with --version. The results are cached on
+disk, keyed by the path, modification time and size of each compiler binary, so the compilers only
+have to be run again after they change, or after CACHE_TTL_SEC in case they are scripts that run
+another compiler. Known wrappers that run another compiler, such as ccache or the xcrun shims in
+/usr/bin on macOS, are not cached at all, since the compiler they run can change at any time.
+"""
+
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from sys_detection.disk_cache import get_default_cache_dir
+
+
+GCC = 'gcc'
+CLANG = 'clang'
+TOOLCHAIN_FAMILIES = [GCC, CLANG]
+
+# Compiler drivers, optionally with a version suffix, e.g. gcc-11 or clang-14. Tools like gcc-ar
+# or clang-format are not compilers.
+COMPILER_NAME_RE = re.compile(r'^(gcc|clang)(-[0-9]+(\.[0-9]+)*)?$')
+
+# Directories where compilers are installed outside of PATH, e.g. Red Hat developer toolsets and
+# the LLVM packages of Debian and Ubuntu.
+WELL_KNOWN_DIR_PATTERNS = [
+    '/opt/rh/devtoolset-*/root/usr/bin',
+    '/opt/rh/gcc-toolset-*/root/usr/bin',
+    '/usr/lib/llvm-*/bin',
+    '/usr/local/opt/llvm/bin',
+    '/opt/homebrew/opt/llvm/bin',
+]
+
+# Programs that run another compiler, usually installed as symlinks named after the compiler.
+WRAPPER_NAMES = frozenset(['ccache', 'sccache', 'distcc', 'icecc'])
+
+# On macOS, the compilers in /usr/bin are shims that run the compiler of the developer directory
+# selected with xcode-select or DEVELOPER_DIR.
+XCRUN_SHIM_DIR = '/usr/bin'
+
+CLANG_VERSION_RE = re.compile(r'\bclang version ([0-9]+(?:\.[0-9]+)+)')
+# The version follows the parenthesized package description, e.g. "gcc (GCC) 11.2.1 20220127" or
+# "gcc (Ubuntu 9.4.0-1ubuntu1~20.04) 9.4.0".
+GCC_VERSION_RE = re.compile(r'^\S*gcc\S* \(.*?\) ([0-9]+(?:\.[0-9]+)+)')
+
+PROBE_TIMEOUT_SEC = 10
+
+CACHE_FILE_NAME = 'toolchains.json'
+CACHE_FORMAT_VERSION = 2
+CACHE_TTL_SEC = 24 * 60 * 60
+
+
+class Toolchain(NamedTuple):
+    family: str
+    version: str
+    path: str
+
+    def major_version(self) -> int:
+        return int(self.version.split('.')[0])
+
+    def mid_part_token(self) -> str:
+        """
+        Returns the component to pass as a mid part to SysConfiguration.id_for_packaging, which
+        consists of the family and the major version.
+
+        >>> Toolchain('clang', '11.1.0', '/usr/bin/clang-11').mid_part_token()
+        'clang11'
+        """
+        return '%s%d' % (self.family, self.major_version())
+
+
+def parse_version_output(output: str) -> Optional[Tuple[str, str]]:
+    """
+    Returns the family and version of a compiler from the output of its --version option, or None
+    if it is not a recognized compiler. Apple Clang installed as gcc is recognized as Clang.
+
+    >>> parse_version_output('gcc (GCC) 11.2.1 20220127 (Red Hat 11.2.1-9)\\n')
+    ('gcc', '11.2.1')
+    >>> parse_version_output('Ubuntu clang version 14.0.0-1ubuntu1\\n')
+    ('clang', '14.0.0')
+    >>> parse_version_output('Apple clang version 15.0.0 (clang-1500.1.0.2.5)\\n')
+    ('clang', '15.0.0')
+    >>> parse_version_output('GNU ar (GNU Binutils) 2.38\\n')
+    """
+    first_line = output.lstrip().split('\n', 1)[0]
+    clang_match = CLANG_VERSION_RE.search(first_line)
+    if clang_match:
+        return CLANG, clang_match.group(1)
+    gcc_match = GCC_VERSION_RE.match(first_line)
+    if gcc_match:
+        return GCC, gcc_match.group(1)
+    return None
+
+
+def get_default_search_dirs() -> List[str]:
+    """
+    Returns the directories on PATH, followed by the existing well-known installation directories,
+    newest versions first.
+    """
+    search_dirs = [
+        dir_path for dir_path in os.environ.get('PATH', '').split(os.pathsep) if dir_path]
+    for pattern in WELL_KNOWN_DIR_PATTERNS:
+        search_dirs.extend(sorted(glob.glob(pattern), key=_natural_sort_key, reverse=True))
+    return search_dirs
+
+
+def _natural_sort_key(s: str) -> List[Any]:
+    """
+    >>> sorted(['gcc-10', 'gcc', 'gcc-9'], key=_natural_sort_key)
+    ['gcc', 'gcc-9', 'gcc-10']
+    """
+    return [int(part) if part.isdigit() else part for part in re.split(r'([0-9]+)', s)]
+
+
+def find_compiler_candidates(search_dirs: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Returns the paths of the executables in the given directories whose names look like compiler
+    drivers, in the order of the directories. Within a directory, names are sorted, so e.g. gcc
+    comes before gcc-9, which comes before gcc-10.
+    Paths resolving to the same file are only returned once, unless the file is a wrapper such as
+    ccache, which runs a different compiler depending on the name it is invoked as.
+    """
+    if search_dirs is None:
+        search_dirs = get_default_search_dirs()
+    candidates: List[str] = []
+    seen_keys: Set[Union[str, Tuple[str, str]]] = set()
+    for dir_path in search_dirs:
+        try:
+            file_names = os.listdir(dir_path)
+        except OSError:
+            continue
+        for file_name in sorted(file_names, key=_natural_sort_key):
+            if not COMPILER_NAME_RE.match(file_name):
+                continue
+            path = os.path.join(dir_path, file_name)
+            real_path = os.path.realpath(path)
+            seen_key: Union[str, Tuple[str, str]] = real_path
+            if is_compiler_wrapper(real_path):
+                seen_key = (real_path, file_name)
+            if seen_key in seen_keys or not os.path.isfile(real_path) or \
+                    not os.access(real_path, os.X_OK):
+                continue
+            seen_keys.add(seen_key)
+            candidates.append(path)
+    return candidates
+
+
+def is_compiler_wrapper(real_path: str) -> bool:
+    """
+    Returns True if the given resolved path is a known wrapper that runs another compiler, so that
+    the compiler it runs can change without the wrapper changing.
+    """
+    if os.path.basename(real_path) in WRAPPER_NAMES:
+        return True
+    return sys.platform == 'darwin' and os.path.dirname(real_path) == XCRUN_SHIM_DIR
+
+
+def probe_compiler(path: str) -> Optional[Tuple[str, str]]:
+    """
+    Runs the given compiler with --version, and returns its family and version, or None if it
+    could not be run or is not a recognized compiler.
+    """
+    env = dict(os.environ)
+    # Make sure the output is not translated.
+    env['LC_ALL'] = 'C'
+    try:
+        result = subprocess.run(
+            [path, '--version'],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            timeout=PROBE_TIMEOUT_SEC)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return parse_version_output(result.stdout.decode('utf-8', 'replace'))
+
+
+def _get_file_key(path: str) -> Optional[List[int]]:
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return [stat_result.st_mtime_ns, stat_result.st_size]
+
+
+class ToolchainCache:
+    """
+    A persistent cache of probe results, keyed by the path, modification time and size of each
+    compiler, and expiring after CACHE_TTL_SEC. Errors reading or writing the cache are ignored,
+    as it is only an optimization.
+    """
+    cache_file_path: str
+
+    def __init__(self, cache_dir: Optional[str] = None) -> None:
+        self.cache_file_path = os.path.join(cache_dir or get_default_cache_dir(), CACHE_FILE_NAME)
+
+    def load(self) -> Dict[str, Any]:
+        try:
+            with open(self.cache_file_path) as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or cache.get('version') != CACHE_FORMAT_VERSION or \
+                not isinstance(cache.get('entries'), dict):
+            return {}
+        entries: Dict[str, Any] = cache['entries']
+        return entries
+
+    def store(self, entries: Dict[str, Any]) -> None:
+        tmp_file_path = '%s.tmp.%d' % (self.cache_file_path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(self.cache_file_path), exist_ok=True)
+            with open(tmp_file_path, 'w') as tmp_file:
+                json.dump(dict(version=CACHE_FORMAT_VERSION, entries=entries), tmp_file)
+            os.replace(tmp_file_path, self.cache_file_path)
+        except OSError:
+            try:
+                os.unlink(tmp_file_path)
+            except OSError:
+                pass
+
+
+def discover_toolchains(
+        search_dirs: Optional[Iterable[str]] = None,
+        jobs: Optional[int] = None,
+        use_cache: bool = True,
+        cache_dir: Optional[str] = None) -> List[Toolchain]:
+    """
+    Returns the GCC and Clang compilers found in the given directories, which default to PATH and
+    well-known installation prefixes, in search order. Compilers that are not in the cache, that
+    changed since they were cached or whose cache entries expired, and compiler wrappers, are
+    probed in parallel.
+
+    :param jobs: The maximum number of compilers to probe at the same time. Defaults to the number
+        of candidates.
+    """
+    candidates = find_compiler_candidates(search_dirs)
+    cache = ToolchainCache(cache_dir) if use_cache else None
+    cached_entries = cache.load() if cache is not None else {}
+
+    file_keys = {path: _get_file_key(path) for path in candidates}
+    wrapper_paths = {path for path in candidates if is_compiler_wrapper(os.path.realpath(path))}
+    now = time.time()
+    probe_results: Dict[str, Optional[Tuple[str, str]]] = {}
+    paths_to_probe: List[str] = []
+    for path in candidates:
+        cached_entry = cached_entries.get(path)
+        if path not in wrapper_paths and isinstance(cached_entry, dict) and \
+                cached_entry.get('key') == file_keys[path] and \
+                isinstance(cached_entry.get('time'), (int, float)) and \
+                0 <= now - cached_entry['time'] < CACHE_TTL_SEC:
+            result = cached_entry.get('result')
+            probe_results[path] = (result[0], result[1]) if result else None
+        else:
+            paths_to_probe.append(path)
+
+    if paths_to_probe:
+        with ThreadPoolExecutor(max_workers=jobs or len(paths_to_probe)) as executor:
+            for path, result in zip(paths_to_probe, executor.map(probe_compiler, paths_to_probe)):
+                probe_results[path] = result
+        if cache is not None:
+            # Entries of compilers in other directories are kept, in case those are searched by
+            # another caller.
+            new_entries = dict(cached_entries)
+            for path in paths_to_probe:
+                if path in wrapper_paths:
+                    new_entries.pop(path, None)
+                    continue
+                result = probe_results[path]
+                new_entries[path] = dict(
+                    key=file_keys[path], time=now, result=list(result) if result else None)
+            cache.store(new_entries)
+
+    toolchains: List[Toolchain] = []
+    for path in candidates:
+        result = probe_results[path]
+        if result is not None:
+            toolchains.append(Toolchain(family=result[0], version=result[1], path=path))
+    return toolchains
+
+
+def find_toolchain(
+        family: str,
+        search_dirs: Optional[Iterable[str]] = None,
+        use_cache: bool = True,
+        cache_dir: Optional[str] = None) -> Optional[Toolchain]:
+    """
+    Returns the first compiler of the given family in search order, i.e. the one that would be
+    found first on PATH, or None if there is none.
+    """
+    if family not in TOOLCHAIN_FAMILIES:
+        raise ValueError("Unknown toolchain family: %s, expected one of: %s" % (
+            family, ', '.join(TOOLCHAIN_FAMILIES)))
+    for toolchain in discover_toolchains(search_dirs, use_cache=use_cache, cache_dir=cache_dir):
+        if toolchain.family == family:
+            return toolchain
+    return None
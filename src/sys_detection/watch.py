@@ -0,0 +1,328 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Notifications of changes of the configuration of a system, e.g. after an in-place upgrade of the
+operating system, for long-running processes.
+
+Changes of the configuration files are detected using inotify on Linux, and by periodically
+comparing the inode numbers, modification times and sizes of the files elsewhere.
+"""
+
+import ctypes
+import logging
+import os
+import select
+import threading
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sys_detection import (
+    CONFIGURATION_FILE_NAMES, SysConfiguration, get_configuration_files_signature)
+from sys_detection import root_cache
+
+
+DEFAULT_POLL_INTERVAL_SEC = 5.0
+
+# How long to wait for further inotify events after an event before checking the configuration
+# files, so that e.g. replacing both os-release and redhat-release results in one notification.
+DEFAULT_SETTLE_TIME_SEC = 0.1
+
+# inotify event masks, from linux/inotify.h.
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+    IN_DELETE_SELF | IN_MOVE_SELF)
+
+ConfigurationCallback = Callable[[SysConfiguration], None]
+
+logger = logging.getLogger(__name__)
+
+
+class Inotify:
+    """
+    A minimal inotify binding using ctypes, watching directories for any changes.
+    """
+    fd: int
+
+    _libc: ctypes.CDLL
+    _watch_descriptors: Dict[str, int]
+
+    def __init__(self) -> None:
+        # The symbols of the process itself, which include the C library. Unlike
+        # ctypes.util.find_library, this does not run ldconfig or a compiler to find it.
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError("inotify is not available")
+        self._libc.inotify_init1.argtypes = [ctypes.c_int]
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.fd = fd
+        self._watch_descriptors = {}
+
+    def set_watched_dirs(self, dir_paths: Iterable[str]) -> None:
+        """
+        Makes the set of watched directories equal to the given one.
+        """
+        new_dir_paths = set(dir_paths)
+        for dir_path in list(self._watch_descriptors):
+            if dir_path not in new_dir_paths:
+                self._libc.inotify_rm_watch(self.fd, self._watch_descriptors.pop(dir_path))
+        for dir_path in new_dir_paths:
+            if dir_path in self._watch_descriptors:
+                continue
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dir_path), WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, os.strerror(errno), dir_path)
+            self._watch_descriptors[dir_path] = wd
+
+    def drain_events(self) -> None:
+        """
+        Discards all pending events. Their details are not needed, as the configuration files are
+        checked for changes after every batch of events anyway.
+        """
+        while True:
+            try:
+                if not os.read(self.fd, 65536):
+                    return
+            except BlockingIOError:
+                return
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class ConfigurationWatcher:
+    """
+    Watches the configuration files of the system rooted at the given directory, and calls the
+    given function with the new configuration whenever it changes. The callback is called from a
+    background thread.
+
+    The configuration memoized by SysConfiguration.from_local_system for the base directory is
+    invalidated on every change, so that it does not go stale.
+    """
+    base_dir: str
+    callback: ConfigurationCallback
+    poll_interval_sec: float
+    settle_time_sec: float
+
+    _use_inotify: bool
+    _inotify: Optional[Inotify]
+    _sys_conf: Optional[SysConfiguration]
+    _signature: Optional[List[Optional[Tuple[int, int, int]]]]
+    _thread: Optional[threading.Thread]
+    _stop_event: threading.Event
+    _wake_fds: Optional[Tuple[int, int]]
+    _lock: threading.Lock
+
+    def __init__(
+            self,
+            callback: ConfigurationCallback,
+            base_dir: str = '/',
+            poll_interval_sec: float = DEFAULT_POLL_INTERVAL_SEC,
+            use_inotify: bool = True,
+            settle_time_sec: float = DEFAULT_SETTLE_TIME_SEC) -> None:
+        """
+        :param poll_interval_sec: How often to check the configuration files for changes when
+            inotify is not used.
+        :param settle_time_sec: How long to wait for the changes to stop when inotify is used,
+            before checking the configuration files.
+        :param use_inotify: Use inotify if it is available. If False, or if inotify is not
+            available, the configuration files are polled.
+        """
+        self.base_dir = os.path.abspath(base_dir)
+        self.callback = callback
+        self.poll_interval_sec = poll_interval_sec
+        self.settle_time_sec = settle_time_sec
+        self._use_inotify = use_inotify
+        self._inotify = None
+        self._sys_conf = None
+        self._signature = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._wake_fds = None
+        self._lock = threading.Lock()
+
+    @property
+    def etc_dir_path(self) -> str:
+        return os.path.join(self.base_dir, 'etc')
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    @property
+    def sys_conf(self) -> Optional[SysConfiguration]:
+        """
+        The last detected configuration, or None if it could not be detected.
+        """
+        return self._sys_conf
+
+    def _get_watched_dirs(self) -> List[str]:
+        """
+        Returns the etc directory, as well as the directories containing the targets of the
+        configuration files if they are symbolic links, e.g. /usr/lib for /etc/os-release.
+        """
+        dir_paths = [self.etc_dir_path]
+        for file_name in CONFIGURATION_FILE_NAMES:
+            target_dir_path = os.path.dirname(
+                os.path.realpath(os.path.join(self.etc_dir_path, file_name)))
+            if target_dir_path not in dir_paths and os.path.isdir(target_dir_path):
+                dir_paths.append(target_dir_path)
+        return dir_paths
+
+    def _detect(self) -> Optional[SysConfiguration]:
+        root_cache.invalidate(self.base_dir)
+        try:
+            return SysConfiguration.from_local_system(self.base_dir)
+        except Exception:
+            # E.g. os-release is missing while it is being replaced. The configuration is detected
+            # again on the next change.
+            return None
+
+    def check(self) -> Optional[SysConfiguration]:
+        """
+        Checks the configuration files for changes, and calls the callback if the configuration
+        has changed. Returns the new configuration in that case, and None otherwise. This is
+        called automatically by the background thread, but can also be called directly.
+        """
+        with self._lock:
+            signature = get_configuration_files_signature(self.etc_dir_path)
+            if signature == self._signature:
+                return None
+            self._signature = signature
+            if self._inotify is not None:
+                try:
+                    self._inotify.set_watched_dirs(self._get_watched_dirs())
+                except OSError as ex:
+                    logger.warning("Failed to update inotify watches: %s", ex)
+            sys_conf = self._detect()
+            if sys_conf is None or sys_conf == self._sys_conf:
+                return None
+            self._sys_conf = sys_conf
+        try:
+            self.callback(sys_conf)
+        except Exception:
+            logger.exception("Configuration change callback failed")
+        return sys_conf
+
+    def start(self) -> 'ConfigurationWatcher':
+        """
+        Detects the current configuration and starts watching for changes in a background thread.
+        The callback is not called for the current configuration.
+        """
+        if self._thread is not None:
+            raise RuntimeError("The watcher has already been started")
+        if self._use_inotify:
+            try:
+                self._inotify = Inotify()
+                self._inotify.set_watched_dirs(self._get_watched_dirs())
+            except (OSError, AttributeError) as ex:
+                logger.debug("Falling back to polling, inotify is not usable: %s", ex)
+                if self._inotify is not None:
+                    self._inotify.close()
+                self._inotify = None
+        self._signature = get_configuration_files_signature(self.etc_dir_path)
+        self._sys_conf = self._detect()
+
+        self._stop_event.clear()
+        if self._inotify is not None:
+            self._wake_fds = os.pipe()
+            target = self._run_inotify
+        else:
+            target = self._run_polling
+        self._thread = threading.Thread(
+            target=target, name='sys-detection-watch', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops watching for changes, and waits for the background thread to finish.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        if self._wake_fds is not None:
+            os.write(self._wake_fds[1], b'\0')
+        self._thread.join()
+        self._thread = None
+        if self._wake_fds is not None:
+            for fd in self._wake_fds:
+                os.close(fd)
+            self._wake_fds = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _run_polling(self) -> None:
+        while not self._stop_event.wait(self.poll_interval_sec):
+            self.check()
+
+    def _run_inotify(self) -> None:
+        assert self._inotify is not None and self._wake_fds is not None
+        inotify_fd = self._inotify.fd
+        wake_fd = self._wake_fds[0]
+        while not self._stop_event.is_set():
+            readable_fds, _, _ = select.select([inotify_fd, wake_fd], [], [])
+            if self._stop_event.is_set():
+                break
+            if inotify_fd not in readable_fds:
+                continue
+            # Wait until no events have arrived for the settle time.
+            while inotify_fd in readable_fds and not self._stop_event.is_set():
+                self._inotify.drain_events()
+                readable_fds, _, _ = select.select(
+                    [inotify_fd, wake_fd], [], [], self.settle_time_sec)
+            if not self._stop_event.is_set():
+                self.check()
+
+    def __enter__(self) -> 'ConfigurationWatcher':
+        # Watchers returned by watch() have already been started.
+        if self._thread is None:
+            self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+
+def watch(
+        callback: ConfigurationCallback,
+        base_dir: str = '/',
+        poll_interval_sec: float = DEFAULT_POLL_INTERVAL_SEC,
+        use_inotify: bool = True,
+        settle_time_sec: float = DEFAULT_SETTLE_TIME_SEC) -> ConfigurationWatcher:
+    """
+    Starts watching the configuration of the system rooted at the given directory, and returns the
+    watcher. Call stop() on it, or use it as a context manager, to stop watching.
+    """
+    return ConfigurationWatcher(
+        callback,
+        base_dir=base_dir,
+        poll_interval_sec=poll_interval_sec,
+        use_inotify=use_inotify,
+        settle_time_sec=settle_time_sec).start()
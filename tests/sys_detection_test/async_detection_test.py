@@ -0,0 +1,149 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from typing import Awaitable, Dict, List, Optional, TypeVar
+from unittest import mock
+
+from sys_detection import OsReleaseVars, SysConfiguration, local_sys_conf_async
+from sys_detection.async_detection import AsyncDetector
+from sys_detection.batch import ScanResult
+from sys_detection.file_provider import FileProvider
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+ROOT_NAMES = ['centos8', 'ubuntu20.04', 'debian11']
+
+READ_DELAY_SEC = 0.05
+
+T = TypeVar('T')
+
+
+def run(coroutine: Awaitable[T]) -> T:
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestAsyncDetection(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp(prefix='sys_detection_async_test_')
+        self.roots: Dict[str, str] = {}
+        for root_name in ROOT_NAMES:
+            self.roots[root_name] = os.path.join(self.tmp_dir, root_name)
+            shutil.copytree(os.path.join(TEST_DATA_DIR, root_name), self.roots[root_name])
+
+        self.lock = threading.Lock()
+        self.num_reads = 0
+        self.num_concurrent_reads = 0
+        self.max_concurrent_reads = 0
+        original_read_file = OsReleaseVars.read_file
+
+        def delayed_read_file(
+                file_path: str, file_provider: Optional[FileProvider] = None) -> OsReleaseVars:
+            with self.lock:
+                self.num_reads += 1
+                self.num_concurrent_reads += 1
+                self.max_concurrent_reads = max(
+                    self.max_concurrent_reads, self.num_concurrent_reads)
+            try:
+                time.sleep(READ_DELAY_SEC)
+                return original_read_file(file_path, file_provider)
+            finally:
+                with self.lock:
+                    self.num_concurrent_reads -= 1
+
+        patcher = mock.patch.object(OsReleaseVars, 'read_file', side_effect=delayed_read_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def test_event_loop_not_blocked(self) -> None:
+        etc_dir_path = os.path.join(self.roots['centos8'], 'etc')
+
+        async def test() -> None:
+            ticks: List[float] = []
+
+            async def ticker() -> None:
+                while True:
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.005)
+
+            ticker_task = asyncio.ensure_future(ticker())
+            sys_conf = await SysConfiguration.from_etc_dir_async('Linux', 'x86_64', etc_dir_path)
+            ticker_task.cancel()
+            self.assertEqual('centos8-x86_64', sys_conf.id_for_packaging())
+            # The ticker kept running while the file was being read.
+            self.assertGreater(len(ticks), 3)
+
+        run(test())
+
+    def test_deduplication(self) -> None:
+        detector = AsyncDetector()
+
+        async def test() -> List[SysConfiguration]:
+            return await asyncio.gather(*[
+                detector.detect_root(root, 'Linux', 'x86_64')
+                for root in list(self.roots.values()) * 20
+            ])
+
+        results = run(test())
+        self.assertEqual(len(ROOT_NAMES), self.num_reads)
+        self.assertEqual(
+            [root_name + '-x86_64' for root_name in ROOT_NAMES] * 20,
+            [sys_conf.id_for_packaging() for sys_conf in results])
+
+    def test_scan_roots(self) -> None:
+        detector = AsyncDetector(max_concurrency=2)
+        roots = [
+            os.path.join(self.tmp_dir, 'root%d' % i)
+            for i in range(8)
+        ]
+        for i, root in enumerate(roots):
+            shutil.copytree(self.roots[ROOT_NAMES[i % len(ROOT_NAMES)]], root)
+        missing_root = os.path.join(self.tmp_dir, 'missing')
+
+        async def test() -> List[ScanResult]:
+            return [
+                result async for result in detector.scan_roots(
+                    iter(roots + [missing_root]), architecture='aarch64')
+            ]
+
+        results = run(test())
+        self.assertLessEqual(self.max_concurrent_reads, 2)
+        results_by_root = {result.root: result for result in results}
+        self.assertEqual(sorted(roots + [missing_root]), sorted(results_by_root))
+        self.assertEqual('FileNotFoundError', results_by_root[missing_root].error_type)
+        for i, root in enumerate(roots):
+            sys_conf = results_by_root[root].sys_conf
+            assert sys_conf is not None
+            self.assertEqual(
+                ROOT_NAMES[i % len(ROOT_NAMES)] + '-aarch64', sys_conf.id_for_packaging())
+
+    def test_local_sys_conf(self) -> None:
+        self.assertEqual(SysConfiguration.from_local_system(), run(local_sys_conf_async()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from typing import Dict, List
+
+from sys_detection.batch import ScanResult, scan_root, scan_roots
+
+from sys_detection_test.sys_detection_test import (
+    TEST_DATA_DIR, get_expected_short_name_and_version)
+
+
+# Test data directories without an os-release file.
+ROOTS_WITHOUT_OS_RELEASE = ['centos6']
+
+
+def get_test_roots() -> List[str]:
+    return sorted(
+        os.path.join(TEST_DATA_DIR, dir_name) for dir_name in os.listdir(TEST_DATA_DIR)
+        if os.path.isdir(os.path.join(TEST_DATA_DIR, dir_name)))
+
+
+class TestBatchScan(unittest.TestCase):
+    def check_results(self, results: Dict[str, ScanResult], roots: List[str]) -> None:
+        self.assertEqual(sorted(roots), sorted(results))
+        for root, result in results.items():
+            dir_basename = os.path.basename(root)
+            if dir_basename in ROOTS_WITHOUT_OS_RELEASE or not os.path.isdir(root):
+                self.assertFalse(result.is_ok())
+                self.assertEqual('FileNotFoundError', result.error_type)
+                self.assertIn('error', result.to_dict())
+                continue
+            assert result.sys_conf is not None
+            if dir_basename != 'opensuse-tumbleweed':
+                self.assertEqual(
+                    get_expected_short_name_and_version(dir_basename) + '-aarch64',
+                    result.sys_conf.id_for_packaging())
+
+    def test_threads(self) -> None:
+        roots = get_test_roots() + [os.path.join(TEST_DATA_DIR, 'no_such_root')]
+        results = {
+            result.root: result for result in scan_roots(
+                iter(roots), jobs=3, architecture='aarch64')
+        }
+        self.check_results(results, roots)
+
+    def test_processes(self) -> None:
+        roots = get_test_roots()
+        results = {
+            result.root: result for result in scan_roots(
+                roots, jobs=2, use_processes=True, architecture='aarch64')
+        }
+        self.check_results(results, roots)
+
+    def test_cli(self) -> None:
+        roots = get_test_roots()
+        output = subprocess.check_output(
+            [sys.executable, '-m', 'sys_detection', '--jobs', '4', '--scan-roots-from', '-'],
+            input='\n'.join(roots[1:]),
+            universal_newlines=True)
+        output += subprocess.check_output(
+            [sys.executable, '-m', 'sys_detection', '--scan-root', roots[0]],
+            universal_newlines=True)
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(roots, sorted(record['root'] for record in records))
+        num_errors = sum(1 for record in records if 'error' in record)
+        self.assertEqual(len(ROOTS_WITHOUT_OS_RELEASE), num_errors)
+
+    def test_cli_error_computing_id(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bad_root = os.path.join(tmp_dir, 'no_id')
+            os.makedirs(os.path.join(bad_root, 'etc'))
+            with open(os.path.join(bad_root, 'etc', 'os-release'), 'w') as os_release_file:
+                os_release_file.write('NAME="Something"\nVERSION_ID=1\n')
+            good_root = os.path.join(TEST_DATA_DIR, 'ubuntu20.04')
+            output = subprocess.check_output(
+                [sys.executable, '-m', 'sys_detection', '--jobs', '1', '--scan-root', bad_root,
+                 good_root],
+                universal_newlines=True)
+            result = scan_root(bad_root)
+        self.assertFalse(result.is_ok())
+        self.assertEqual('AttributeError', result.error_type)
+
+        records = {record['root']: record for record in map(json.loads, output.splitlines())}
+        self.assertEqual({bad_root, good_root}, set(records))
+        self.assertEqual('AttributeError', records[bad_root]['error']['type'])
+        self.assertNotIn('error', records[good_root])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from sys_detection import SysConfiguration
+from sys_detection.cgroup_limits import CgroupLimits, get_cgroup_limits
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+# Root directories containing proc/self/cgroup and sys/fs/cgroup.
+CGROUP_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cgroup_data')
+
+GIB = 1024 * 1024 * 1024
+
+EXPECTED_LIMITS = {
+    'v2_quota': CgroupLimits(
+        cgroup_version=2, cpu_quota=1.5, cpuset_cpu_count=8, memory_limit_bytes=4 * GIB),
+    # The limits of the parent cgroup apply, but the cpuset is the effective one of the cgroup.
+    'v2_nested': CgroupLimits(
+        cgroup_version=2, cpu_quota=4.0, cpuset_cpu_count=4, memory_limit_bytes=2 * GIB),
+    'v2_unlimited': CgroupLimits(cgroup_version=2, cpuset_cpu_count=32),
+    # Only the mount directory exists, as in a container without a cgroup namespace.
+    'v1_docker': CgroupLimits(
+        cgroup_version=1, cpu_quota=2.0, cpuset_cpu_count=16, memory_limit_bytes=1 * GIB),
+    'v1_unlimited': CgroupLimits(cgroup_version=1, cpuset_cpu_count=4),
+}
+
+EXPECTED_RECOMMENDED_JOBS = {
+    'v2_quota': 2,
+    'v2_nested': 4,
+    'v2_unlimited': 32,
+    'v1_docker': 2,
+    'v1_unlimited': 4,
+}
+
+
+class TestCgroupLimits(unittest.TestCase):
+    def test_fixtures(self) -> None:
+        self.assertEqual(sorted(EXPECTED_LIMITS), sorted(os.listdir(CGROUP_DATA_DIR)))
+        for dir_name, expected_limits in EXPECTED_LIMITS.items():
+            limits = get_cgroup_limits(os.path.join(CGROUP_DATA_DIR, dir_name))
+            self.assertEqual(expected_limits, limits, msg=dir_name)
+            self.assertEqual(
+                EXPECTED_RECOMMENDED_JOBS[dir_name], limits.recommended_jobs(cpu_count=64),
+                msg=dir_name)
+
+    def test_recommended_jobs(self) -> None:
+        limits = get_cgroup_limits(os.path.join(CGROUP_DATA_DIR, 'v2_quota'))
+        self.assertEqual(1, limits.recommended_jobs(cpu_count=1))
+        self.assertEqual(2, limits.recommended_jobs(cpu_count=64, memory_per_job_bytes=GIB))
+        self.assertEqual(1, limits.recommended_jobs(cpu_count=64, memory_per_job_bytes=8 * GIB))
+        self.assertEqual(64, CgroupLimits().recommended_jobs(cpu_count=64))
+
+    def test_no_cgroups(self) -> None:
+        with tempfile.TemporaryDirectory() as base_dir:
+            self.assertEqual(CgroupLimits(), get_cgroup_limits(base_dir))
+
+    def test_sys_configuration(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            base_dir = os.path.join(tmp_dir, 'root')
+            shutil.copytree(os.path.join(CGROUP_DATA_DIR, 'v1_docker'), base_dir)
+            shutil.copytree(os.path.join(TEST_DATA_DIR, 'ubuntu20.04', 'etc'),
+                            os.path.join(base_dir, 'etc'))
+            sys_conf = SysConfiguration.from_etc_dir(
+                'Linux', 'x86_64', os.path.join(base_dir, 'etc'))
+            self.assertEqual(EXPECTED_LIMITS['v1_docker'], sys_conf.cgroup_limits())
+            self.assertEqual(1, sys_conf.recommended_jobs(memory_per_job_bytes=GIB))
+
+
+if __name__ == '__main__':
+    unittest.main()
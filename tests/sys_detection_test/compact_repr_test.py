@@ -0,0 +1,151 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import copy
+import glob
+import os
+import pickle
+import tracemalloc
+import unittest
+
+from typing import Any, Callable, Dict, List, Optional
+
+from sys_detection import OsReleaseVars, SysConfiguration
+from sys_detection.os_release_parser import parse_os_release
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+NUM_COPIES = 50
+
+
+class LegacyOsReleaseVars:
+    """
+    Replicates the memory layout OsReleaseVars used to have, for comparison: every variable was
+    stored both in the vars dictionary and as an instance attribute.
+    """
+    def __init__(self, vars: Dict[str, str]) -> None:
+        self.vars = vars
+        for k, v in vars.items():
+            setattr(self, k, v)
+
+
+class LegacySysConfiguration:
+    def __init__(
+            self,
+            system: str,
+            architecture: str,
+            linux_os_release: Any,
+            redhat_release: Optional[str]) -> None:
+        self.system = system
+        self.architecture = architecture
+        self.linux_os_release = linux_os_release
+        self.redhat_release = redhat_release
+
+
+def read_corpus() -> List[bytes]:
+    corpus: List[bytes] = []
+    for file_path in sorted(glob.glob(os.path.join(TEST_DATA_DIR, '*', 'etc', 'os-release'))):
+        with open(file_path, 'rb') as input_file:
+            corpus.append(input_file.read())
+    return corpus
+
+
+def measure_retained_memory(create: Callable[[Dict[str, str]], Any], corpus: List[bytes]) -> int:
+    """
+    Parses every file in the corpus NUM_COPIES times, as if it came from a different host, and
+    returns the memory retained by the objects created from the parsed variables.
+    """
+    tracemalloc.start()
+    try:
+        objects = [
+            create(parse_os_release(data)) for _ in range(NUM_COPIES) for data in corpus
+        ]
+        retained_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(objects) == NUM_COPIES * len(corpus)
+    return retained_bytes
+
+
+class TestCompactRepresentation(unittest.TestCase):
+    def test_memory_reduction(self) -> None:
+        corpus = read_corpus()
+        legacy_bytes = measure_retained_memory(
+            lambda vars: LegacySysConfiguration(
+                'Linux', 'x86_64', LegacyOsReleaseVars(vars), None),
+            corpus)
+        compact_bytes = measure_retained_memory(
+            lambda vars: SysConfiguration('Linux', 'x86_64', OsReleaseVars(vars), None),
+            corpus)
+        self.assertLess(
+            compact_bytes, legacy_bytes * 0.25,
+            'Compact representation: %d bytes, legacy representation: %d bytes' % (
+                compact_bytes, legacy_bytes))
+
+    def test_attributes(self) -> None:
+        os_release = OsReleaseVars({'id': 'centos', 'version_id': '8', 'name': 'CentOS Linux'})
+        self.assertEqual('centos', os_release.id)
+        self.assertEqual('8', os_release.version_id)
+        self.assertEqual('CentOS Linux', os_release.name)
+        self.assertEqual('8', os_release.get('version_id'))
+        self.assertIsNone(os_release.get('variant_id'))
+        self.assertEqual(
+            {'id': 'centos', 'version_id': '8', 'name': 'CentOS Linux'}, os_release.vars)
+        with self.assertRaises(AttributeError):
+            os_release.variant_id
+        with self.assertRaises(AttributeError):
+            os_release.id = 'ubuntu'  # type: ignore
+        # Modifying the returned dictionary does not affect the object.
+        os_release.vars['id'] = 'ubuntu'
+        self.assertEqual('centos', os_release.id)
+
+        # Only keys that are valid attribute names are accessible as attributes.
+        arch_os_release = OsReleaseVars({'name': 'Arch Linux', 'build-id': 'rolling', '_x': 'y'})
+        self.assertEqual('rolling', arch_os_release.get('build-id'))
+        for name in ['id', 'version_id', 'build-id', '_x']:
+            self.assertFalse(hasattr(arch_os_release, name), name)
+
+        sys_conf = SysConfiguration('Linux', 'x86_64', os_release, 'CentOS Linux release 8')
+        with self.assertRaises(AttributeError):
+            sys_conf.architecture = 'aarch64'  # type: ignore
+        self.assertEqual('centos8-x86_64', sys_conf.id_for_packaging())
+
+    def test_hash_and_equality(self) -> None:
+        corpus = read_corpus()
+        sys_confs = []
+        for _ in range(2):
+            for data in corpus:
+                for architecture in ['x86_64', 'aarch64']:
+                    sys_confs.append(SysConfiguration(
+                        'Linux', architecture, OsReleaseVars(parse_os_release(data)), None))
+        unique_sys_confs = set(sys_confs)
+        # Some distributions in the corpus have identical os-release files.
+        self.assertEqual(len(set(corpus)) * 2, len(unique_sys_confs))
+
+        vars = {'id': 'ubuntu', 'version_id': '20.04'}
+        reordered_vars = {'version_id': '20.04', 'id': 'ubuntu'}
+        self.assertEqual(OsReleaseVars(vars), OsReleaseVars(reordered_vars))
+        self.assertEqual(hash(OsReleaseVars(vars)), hash(OsReleaseVars(reordered_vars)))
+        self.assertNotEqual(OsReleaseVars(vars), OsReleaseVars({'id': 'ubuntu'}))
+
+    def test_copy_and_pickle(self) -> None:
+        sys_conf = SysConfiguration(
+            'Linux', 'x86_64', OsReleaseVars({'id': 'ubuntu', 'version_id': '20.04'}), None)
+        for copied in [
+                copy.copy(sys_conf), copy.deepcopy(sys_conf), pickle.loads(pickle.dumps(sys_conf))]:
+            self.assertEqual(sys_conf, copied)
+            self.assertEqual('ubuntu20.04-x86_64', copied.id_for_packaging())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,265 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sys_detection import stats
+from sys_detection.batch import scan_root
+from sys_detection.container_image import ImageTarball, detect_image_tarball
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+# A layer entry: a file with the given contents, ('symlink', target), ('hardlink', target) or
+# ('dir', None).
+Entry = Union[bytes, Tuple[str, Optional[str]]]
+
+
+def read_test_file(os_name: str, file_name: str) -> bytes:
+    with open(os.path.join(TEST_DATA_DIR, os_name, 'etc', file_name), 'rb') as input_file:
+        return input_file.read()
+
+
+def add_member(tar: tarfile.TarFile, name: str, data: bytes = b'', **kwargs: Any) -> None:
+    tar_info = tarfile.TarInfo(name)
+    tar_info.size = len(data)
+    for key, value in kwargs.items():
+        setattr(tar_info, key, value)
+    tar.addfile(tar_info, io.BytesIO(data))
+
+
+def make_layer(entries: Dict[str, Entry], compress: bool = False) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as tar:
+        for name, entry in entries.items():
+            if isinstance(entry, bytes):
+                add_member(tar, name, entry)
+                continue
+            kind, target = entry
+            if kind == 'dir':
+                add_member(tar, name, type=tarfile.DIRTYPE)
+            elif kind == 'symlink':
+                add_member(tar, name, type=tarfile.SYMTYPE, linkname=target)
+            else:
+                add_member(tar, name, type=tarfile.LNKTYPE, linkname=target)
+    data = buffer.getvalue()
+    return gzip.compress(data) if compress else data
+
+
+def write_docker_save_tarball(
+        path: str, layers: List[bytes], architecture: str = 'amd64', tag: str = 'test:1') -> None:
+    """
+    Writes a tarball in the format of "docker save", with the given layers from the bottom up.
+    """
+    with tarfile.open(path, 'w') as tar:
+        layer_paths = []
+        for i, layer in enumerate(layers):
+            layer_path = 'layer%d/layer.tar' % i
+            add_member(tar, layer_path, layer)
+            layer_paths.append(layer_path)
+        add_member(tar, 'config.json', json.dumps(dict(architecture=architecture)).encode())
+        manifest = [dict(Config='config.json', RepoTags=[tag], Layers=layer_paths)]
+        add_member(tar, 'manifest.json', json.dumps(manifest).encode())
+
+
+def write_oci_tarball(
+        path: str, layers: List[bytes], architecture: str = 'arm64', multi_platform: bool = False
+        ) -> None:
+    """
+    Writes a tarball containing an OCI image layout, with the given layers from the bottom up.
+    """
+    with tarfile.open(path, 'w') as tar:
+        def add_blob(data: bytes, media_type: str, **kwargs: Any) -> Dict[str, Any]:
+            digest = hashlib.sha256(data).hexdigest()
+            add_member(tar, 'blobs/sha256/' + digest, data)
+            return dict(mediaType=media_type, digest='sha256:' + digest, size=len(data), **kwargs)
+
+        layer_descriptors = [
+            add_blob(layer, 'application/vnd.oci.image.layer.v1.tar+gzip') for layer in layers]
+        config_descriptor = add_blob(
+            json.dumps(dict(architecture=architecture, os='linux')).encode(),
+            'application/vnd.oci.image.config.v1+json')
+        manifest = dict(schemaVersion=2, config=config_descriptor, layers=layer_descriptors)
+        descriptor = add_blob(
+            json.dumps(manifest).encode(), 'application/vnd.oci.image.manifest.v1+json',
+            platform=dict(architecture=architecture, os='linux'))
+        if multi_platform:
+            attestation_descriptor = add_blob(
+                b'{}', 'application/vnd.oci.image.manifest.v1+json',
+                platform=dict(architecture='unknown', os='unknown'))
+            nested_index = dict(schemaVersion=2, manifests=[attestation_descriptor, descriptor])
+            descriptor = add_blob(
+                json.dumps(nested_index).encode(), 'application/vnd.oci.image.index.v1+json')
+        index = dict(schemaVersion=2, manifests=[descriptor])
+        add_member(tar, 'oci-layout', b'{"imageLayoutVersion": "1.0.0"}')
+        add_member(tar, 'index.json', json.dumps(index).encode())
+
+
+CENTOS7_BASE_LAYER = make_layer({
+    'etc': ('dir', None),
+    'etc/os-release': read_test_file('centos7', 'os-release'),
+    'etc/centos-release': read_test_file('centos7', 'redhat-release'),
+    'etc/redhat-release': ('symlink', 'centos-release'),
+    'usr/bin/true': b'\x7fELF',
+})
+
+UBUNTU_BASE_LAYER = make_layer({
+    './usr/lib/os-release': read_test_file('ubuntu20.04', 'os-release'),
+    './etc/os-release': ('symlink', '../usr/lib/os-release'),
+})
+
+APP_LAYER = make_layer({'opt/app/bin/app': b'#!/bin/sh\n'})
+
+# A layer that would fail to be read, to check that lower layers are not read unnecessarily.
+CORRUPT_LAYER = b'This is not a tarball' * 100
+
+
+class TestContainerImage(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+        stats.disable()
+
+    def write_docker_save_tarball(self, layers: List[bytes], **kwargs: Any) -> str:
+        path = os.path.join(self.tmp_dir.name, 'image%d.tar' % len(os.listdir(self.tmp_dir.name)))
+        write_docker_save_tarball(path, layers, **kwargs)
+        return path
+
+    def test_docker_save(self) -> None:
+        path = self.write_docker_save_tarball([CENTOS7_BASE_LAYER, APP_LAYER])
+        sys_conf = detect_image_tarball(path)
+        self.assertEqual('centos7-x86_64', sys_conf.id_for_packaging())
+        # redhat-release is a symbolic link to centos-release in the same layer.
+        self.assertEqual(
+            read_test_file('centos7', 'redhat-release').decode().strip(), sys_conf.redhat_release)
+        self.assertTrue(sys_conf.is_redhat_family())
+
+    def test_oci(self) -> None:
+        for multi_platform in [False, True]:
+            path = os.path.join(self.tmp_dir.name, 'oci%s.tar' % multi_platform)
+            write_oci_tarball(
+                path,
+                [make_layer({'etc/os-release': read_test_file('centos8', 'os-release')},
+                            compress=True),
+                 make_layer({'usr/lib/os-release': read_test_file('ubuntu20.04', 'os-release'),
+                             'etc/os-release': ('symlink', '/usr/lib/os-release'),
+                             'etc/.wh.redhat-release': b''},
+                            compress=True)],
+                multi_platform=multi_platform)
+            sys_conf = detect_image_tarball(path)
+            self.assertEqual('ubuntu20.04-aarch64', sys_conf.id_for_packaging())
+            self.assertIsNone(sys_conf.redhat_release)
+
+    def test_symlink_to_lower_layer(self) -> None:
+        # The upper layer replaces os-release with a symbolic link into a file of the lower layer.
+        path = self.write_docker_save_tarball([
+            make_layer({'usr/lib/os-release': read_test_file('ubuntu20.04', 'os-release'),
+                        'etc/os-release': read_test_file('centos7', 'os-release')}),
+            make_layer({'etc/os-release': ('symlink', '../usr/lib/os-release')}),
+        ])
+        self.assertEqual('ubuntu20.04', detect_image_tarball(path).short_os_name_and_version())
+
+    def test_hardlink(self) -> None:
+        path = self.write_docker_save_tarball([make_layer({
+            'usr/lib/os-release': read_test_file('ubuntu20.04', 'os-release'),
+            'etc/os-release': ('hardlink', 'usr/lib/os-release'),
+        })])
+        self.assertEqual('ubuntu20.04', detect_image_tarball(path).short_os_name_and_version())
+
+    def test_whiteouts(self) -> None:
+        centos8_layer = make_layer({
+            'etc/os-release': read_test_file('centos8', 'os-release'),
+            'etc/redhat-release': read_test_file('centos8', 'redhat-release'),
+        })
+        # A whiteout of /etc/os-release makes /usr/lib/os-release the one to use.
+        path = self.write_docker_save_tarball([
+            UBUNTU_BASE_LAYER, centos8_layer, make_layer({'etc/.wh.os-release': b''})])
+        sys_conf = detect_image_tarball(path)
+        assert sys_conf.linux_os_release is not None
+        self.assertEqual('ubuntu', sys_conf.linux_os_release.id)
+        self.assertIsNotNone(sys_conf.redhat_release)
+
+        # An opaque /etc hides everything in /etc in lower layers.
+        path = self.write_docker_save_tarball([
+            UBUNTU_BASE_LAYER, centos8_layer,
+            make_layer({'etc/.wh..wh..opq': b'', 'etc/hostname': b'test\n'})])
+        sys_conf = detect_image_tarball(path)
+        self.assertEqual('ubuntu20.04', sys_conf.short_os_name_and_version())
+        self.assertIsNone(sys_conf.redhat_release)
+
+        # Deleting /usr deletes /usr/lib/os-release.
+        path = self.write_docker_save_tarball([
+            UBUNTU_BASE_LAYER, make_layer({'.wh.usr': b''})])
+        with self.assertRaisesRegex(ValueError, 'No os-release file found'):
+            detect_image_tarball(path)
+
+    def test_lower_layers_not_read(self) -> None:
+        path = self.write_docker_save_tarball(
+            [CORRUPT_LAYER, CENTOS7_BASE_LAYER, APP_LAYER], architecture='arm64')
+        stats.enable()
+        sys_conf = detect_image_tarball(path)
+        self.assertEqual('centos7-aarch64', sys_conf.id_for_packaging())
+        self.assertEqual(2, stats.get_stats().counters['container_image.layers_scanned'])
+
+        path = self.write_docker_save_tarball([CORRUPT_LAYER, APP_LAYER])
+        with self.assertRaisesRegex(ValueError, 'Could not read a layer tarball'):
+            detect_image_tarball(path)
+
+    def test_read_file(self) -> None:
+        path = self.write_docker_save_tarball([CENTOS7_BASE_LAYER, APP_LAYER])
+        with ImageTarball(path) as image_tarball:
+            self.assertEqual(b'#!/bin/sh\n', image_tarball.read_file('/opt/app/bin/app'))
+            self.assertEqual(b'\x7fELF', image_tarball.read_file('/usr/bin/true'))
+            self.assertIsNone(image_tarball.read_file('/etc'))
+            self.assertIsNone(image_tarball.read_file('/nonexistent'))
+
+    def test_symlink_loop(self) -> None:
+        path = self.write_docker_save_tarball([make_layer({
+            'etc/os-release': ('symlink', 'os-release'),
+        })])
+        with self.assertRaisesRegex(ValueError, 'Too many levels of symbolic links'):
+            detect_image_tarball(path)
+
+    def test_tag(self) -> None:
+        path = self.write_docker_save_tarball([CENTOS7_BASE_LAYER], tag='centos:7')
+        self.assertEqual(
+            'centos7', detect_image_tarball(path, tag='centos:7').short_os_name_and_version())
+        with self.assertRaisesRegex(ValueError, 'Image centos:8 not found'):
+            detect_image_tarball(path, tag='centos:8')
+
+    def test_invalid_tarball(self) -> None:
+        path = os.path.join(self.tmp_dir.name, 'not_an_image.tar')
+        with tarfile.open(path, 'w') as tar:
+            add_member(tar, 'hello.txt', b'Hello')
+        with self.assertRaisesRegex(ValueError, 'Neither manifest.json nor index.json'):
+            detect_image_tarball(path)
+
+    def test_scan_root(self) -> None:
+        path = self.write_docker_save_tarball([UBUNTU_BASE_LAYER], architecture='arm64')
+        result = scan_root(path, architecture='x86_64')
+        self.assertTrue(result.is_ok())
+        self.assertEqual('ubuntu20.04-aarch64', result.to_dict()['id_for_packaging'])
+
+
+if __name__ == '__main__':
+    unittest.main()
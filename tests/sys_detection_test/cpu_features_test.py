@@ -0,0 +1,112 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from typing import List, Tuple
+
+from sys_detection import SysConfiguration
+from sys_detection.cpu_features import get_cpu_level, parse_cpuinfo, read_cpuinfo
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+# Files are named <architecture>-<expected level>-<description>.txt.
+CPUINFO_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cpuinfo_data')
+
+
+def get_cpuinfo_fixtures() -> List[Tuple[str, str, str]]:
+    """
+    Returns the path, architecture and expected level of every cpuinfo fixture.
+    """
+    fixtures = []
+    for file_name in sorted(os.listdir(CPUINFO_DATA_DIR)):
+        architecture, level, _ = file_name.split('-', 2)
+        fixtures.append((os.path.join(CPUINFO_DATA_DIR, file_name), architecture, level))
+    return fixtures
+
+
+class TestCpuFeatures(unittest.TestCase):
+    def test_levels(self) -> None:
+        fixtures = get_cpuinfo_fixtures()
+        self.assertEqual(
+            {'v1', 'v2', 'v3', 'v4', 'base', 'lse', 'sve'},
+            set(level for _, _, level in fixtures))
+        for cpuinfo_path, architecture, expected_level in fixtures:
+            features = read_cpuinfo(cpuinfo_path)
+            assert features is not None
+            self.assertEqual(
+                expected_level, get_cpu_level(architecture, features), msg=cpuinfo_path)
+
+    def test_only_first_processor_is_parsed(self) -> None:
+        lines = iter([
+            'processor\t: 0\n',
+            'model name\t: Test CPU\n',
+            'flags\t\t: fpu sse2\n',
+            '\n',
+            'processor\t: 1\n',
+            'flags\t\t: fpu sse2 avx\n',
+        ])
+        features = parse_cpuinfo(lines)
+        self.assertEqual(frozenset(['fpu', 'sse2']), features.flags)
+        self.assertEqual('Test CPU', features.model_name)
+        self.assertEqual('processor\t: 1\n', next(lines))
+
+    def test_sys_configuration(self) -> None:
+        with tempfile.TemporaryDirectory() as base_dir:
+            shutil.copytree(os.path.join(TEST_DATA_DIR, 'centos8', 'etc'),
+                            os.path.join(base_dir, 'etc'))
+            etc_dir_path = os.path.join(base_dir, 'etc')
+            sys_conf = SysConfiguration.from_etc_dir('Linux', 'x86_64', etc_dir_path)
+            self.assertEqual(base_dir, sys_conf.base_dir)
+            self.assertIsNone(sys_conf.cpu_level())
+            self.assertEqual(
+                'centos8-x86_64', sys_conf.id_for_packaging(include_cpu_level=True))
+
+            os.mkdir(os.path.join(base_dir, 'proc'))
+            shutil.copy(os.path.join(CPUINFO_DATA_DIR, 'x86_64-v3-haswell.txt'),
+                        os.path.join(base_dir, 'proc', 'cpuinfo'))
+            sys_conf = SysConfiguration.from_etc_dir('Linux', 'x86_64', etc_dir_path)
+            self.assertEqual('v3', sys_conf.cpu_level())
+            self.assertEqual('centos8-x86_64', sys_conf.id_for_packaging())
+            self.assertEqual(
+                'centos8-clang11-v3-x86_64',
+                sys_conf.id_for_packaging(mid_part=['clang11'], include_cpu_level=True))
+
+            # The result is cached on the object.
+            os.remove(os.path.join(base_dir, 'proc', 'cpuinfo'))
+            self.assertEqual('v3', sys_conf.cpu_level())
+
+            # The base directory is a part of the identity, since lazily detected properties
+            # depend on it, and survives serialization.
+            sys_conf_without_base_dir = SysConfiguration(
+                sys_conf.system, sys_conf.architecture, sys_conf.linux_os_release,
+                sys_conf.redhat_release)
+            self.assertNotEqual(sys_conf_without_base_dir, sys_conf)
+            self.assertEqual(
+                sys_conf,
+                SysConfiguration(
+                    sys_conf.system, sys_conf.architecture, sys_conf.linux_os_release,
+                    sys_conf.redhat_release, base_dir))
+            self.assertEqual(2, len({sys_conf, sys_conf_without_base_dir}))
+            self.assertIsNone(sys_conf_without_base_dir.cpu_level())
+            self.assertEqual(base_dir, pickle.loads(pickle.dumps(sys_conf)).base_dir)
+            self.assertEqual(
+                base_dir, SysConfiguration.from_dict(sys_conf.to_dict()).base_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
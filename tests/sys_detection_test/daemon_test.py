@@ -0,0 +1,141 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from unittest import mock
+
+from sys_detection import local_sys_conf
+from sys_detection.cgroup_limits import CgroupLimits
+from sys_detection.daemon import PROCESS_FIELDS, create_server, query, query_field_values
+from sys_detection.fields import FIELDS, FieldOptions
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp_dir.name, 'sys-detection.sock')
+        self.root = os.path.join(self.tmp_dir.name, 'root')
+        shutil.copytree(os.path.join(TEST_DATA_DIR, 'centos8', 'etc'),
+                        os.path.join(self.root, 'etc'))
+        self.server = create_server(self.socket_path)
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+        self.tmp_dir.cleanup()
+
+    def test_query(self) -> None:
+        values = query_field_values(
+            self.socket_path, ['short_os_name_and_version', 'id_for_packaging'],
+            FieldOptions(mid_part=['clang11'], separator='_'), root=self.root)
+        assert values is not None
+        self.assertEqual('centos8', values['short_os_name_and_version'])
+        self.assertTrue(values['id_for_packaging'].startswith('centos8_clang11_'))
+
+    def test_invalidation(self) -> None:
+        self.assertEqual(
+            {'short_os_version': '8'},
+            query_field_values(self.socket_path, ['short_os_version'], root=self.root))
+        os_release_path = os.path.join(self.root, 'etc', 'os-release')
+        with open(os_release_path, 'a') as os_release_file:
+            os_release_file.write('VERSION_ID="9"\n')
+        self.assertEqual(
+            {'short_os_version': '9'},
+            query_field_values(self.socket_path, ['short_os_version'], root=self.root))
+
+    def test_errors(self) -> None:
+        response = query(self.socket_path, dict(root=os.path.join(self.tmp_dir.name, 'missing')))
+        assert response is not None
+        self.assertEqual('FileNotFoundError', response['error']['type'])
+        with self.assertRaises(RuntimeError):
+            query_field_values(self.socket_path, ['no_such_field'])
+
+    def test_invalid_mid_part(self) -> None:
+        for mid_part in ['clang11', ['clang11', 11], {'a': 'b'}]:
+            response = query(self.socket_path, dict(fields=['id_for_packaging'], mid_part=mid_part))
+            assert response is not None
+            self.assertEqual('TypeError', response['error']['type'], mid_part)
+
+    def test_process_fields(self) -> None:
+        # The server cannot determine the limits of the calling process.
+        response = query(self.socket_path, dict(root=self.root, fields=['recommended_jobs']))
+        assert response is not None
+        self.assertEqual('ValueError', response['error']['type'])
+        response = query(self.socket_path, dict(root=self.root))
+        assert response is not None
+        self.assertEqual(
+            [name for name in FIELDS if name not in PROCESS_FIELDS], list(response['values']))
+
+        # The client computes them itself, and returns all fields in order.
+        with mock.patch('sys_detection.cgroup_limits.get_cgroup_limits',
+                        return_value=CgroupLimits(cgroup_version=2, cpu_quota=2.0)):
+            values = query_field_values(
+                self.socket_path, ['recommended_jobs', 'short_os_name_and_version', 'cpu_quota'],
+                root=self.root)
+            assert values is not None
+            self.assertEqual(
+                ['recommended_jobs', 'short_os_name_and_version', 'cpu_quota'], list(values))
+            self.assertEqual('centos8', values['short_os_name_and_version'])
+            self.assertEqual(2.0, values['cpu_quota'])
+            self.assertLessEqual(values['recommended_jobs'], 2)
+
+            all_values = query_field_values(self.socket_path, root=self.root)
+            assert all_values is not None
+            self.assertEqual(list(FIELDS), list(all_values))
+
+    def test_unreachable_server(self) -> None:
+        # A server that accepts connections but does not respond.
+        unresponsive_socket_path = os.path.join(self.tmp_dir.name, 'unresponsive.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server_socket:
+            server_socket.bind(unresponsive_socket_path)
+            server_socket.listen(1)
+            self.assertIsNone(query(unresponsive_socket_path, dict(fields=[]), timeout=0.1))
+
+        with mock.patch.object(socket.socket, 'connect', side_effect=PermissionError):
+            self.assertIsNone(query(self.socket_path, dict(fields=[])))
+            self.assertIsNone(query_field_values(self.socket_path, ['system']))
+
+    def test_multiple_requests_per_connection(self) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+            client_socket.connect(self.socket_path)
+            client_socket.sendall(b'not json\n{"fields": ["system"]}\n')
+            with client_socket.makefile('rb') as response_file:
+                self.assertIn(b'"error"', response_file.readline())
+                self.assertIn(b'"values"', response_file.readline())
+
+    def test_already_running(self) -> None:
+        with self.assertRaises(RuntimeError):
+            create_server(self.socket_path)
+
+    def test_cli(self) -> None:
+        expected_id = local_sys_conf().id_for_packaging()
+        for socket_path in [self.socket_path, os.path.join(self.tmp_dir.name, 'not-running')]:
+            output = subprocess.check_output(
+                [sys.executable, '-m', 'sys_detection', '--socket', socket_path])
+            self.assertEqual(expected_id, output.decode('utf-8').strip())
+
+
+if __name__ == '__main__':
+    unittest.main()
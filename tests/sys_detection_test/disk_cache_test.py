@@ -0,0 +1,90 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+
+from sys_detection import SysConfiguration, get_system_and_machine
+from sys_detection.disk_cache import DiskCache, compute_cache_key
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp(prefix='sys_detection_disk_cache_test_')
+        self.base_dir = os.path.join(self.tmp_dir, 'root')
+        shutil.copytree(os.path.join(TEST_DATA_DIR, 'centos8'), self.base_dir)
+        self.cache = DiskCache(os.path.join(self.tmp_dir, 'cache'))
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def get_sys_conf_counting_detections(self) -> SysConfiguration:
+        with mock.patch.object(
+                SysConfiguration, 'from_etc_dir', wraps=SysConfiguration.from_etc_dir
+                ) as from_etc_dir_mock:
+            sys_conf = self.cache.get_sys_conf(self.base_dir)
+            self.num_detections = from_etc_dir_mock.call_count
+        return sys_conf
+
+    def test_hit_and_invalidation(self) -> None:
+        _, machine = get_system_and_machine()
+
+        sys_conf = self.get_sys_conf_counting_detections()
+        self.assertEqual(1, self.num_detections)
+        if sys_conf.is_linux():
+            self.assertEqual('centos8-%s' % machine, sys_conf.id_for_packaging())
+
+        cached_sys_conf = self.get_sys_conf_counting_detections()
+        self.assertEqual(0, self.num_detections)
+        self.assertEqual(sys_conf.to_dict(), cached_sys_conf.to_dict())
+
+        os_release_path = os.path.join(self.base_dir, 'etc', 'os-release')
+        with open(os_release_path, 'a') as os_release_file:
+            os_release_file.write('VARIANT_ID=test\n')
+        self.get_sys_conf_counting_detections()
+        self.assertEqual(1, self.num_detections)
+
+        os.unlink(os.path.join(self.base_dir, 'etc', 'redhat-release'))
+        self.get_sys_conf_counting_detections()
+        self.assertEqual(1, self.num_detections)
+        self.get_sys_conf_counting_detections()
+        self.assertEqual(0, self.num_detections)
+
+    def test_machine_change(self) -> None:
+        self.get_sys_conf_counting_detections()
+        key = compute_cache_key(os.path.abspath(self.base_dir))
+        with mock.patch(
+                'sys_detection.disk_cache.get_system_and_machine',
+                return_value=(key['system'], 'some_other_arch')):
+            sys_conf = self.get_sys_conf_counting_detections()
+        self.assertEqual(1, self.num_detections)
+        self.assertEqual('some_other_arch', sys_conf.architecture)
+
+    def test_corrupted_cache_file(self) -> None:
+        self.get_sys_conf_counting_detections()
+        cache_file_path = self.cache.get_cache_file_path(os.path.abspath(self.base_dir))
+        with open(cache_file_path, 'w') as cache_file:
+            cache_file.write('{not json')
+        self.get_sys_conf_counting_detections()
+        self.assertEqual(1, self.num_detections)
+        self.get_sys_conf_counting_detections()
+        self.assertEqual(0, self.num_detections)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from pathlib import Path
+from typing import List
+
+from sys_detection import SysConfiguration, local_sys_conf
+from sys_detection.fields import (
+    FIELDS, FieldOptions, format_field_values, get_field_values, parse_field_names)
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR, get_platform_conf
+
+
+def get_test_sys_confs() -> List[SysConfiguration]:
+    return [
+        get_platform_conf('Linux', 'x86_64', Path(TEST_DATA_DIR, dir_name))
+        for dir_name in sorted(os.listdir(TEST_DATA_DIR))
+        if os.path.isfile(os.path.join(TEST_DATA_DIR, dir_name, 'etc', 'os-release'))
+    ]
+
+
+def run_cli(*args: str) -> str:
+    return subprocess.check_output(
+        [sys.executable, '-m', 'sys_detection'] + list(args)).decode('utf-8')
+
+
+class TestFields(unittest.TestCase):
+    def test_dict_round_trip(self) -> None:
+        for sys_conf in get_test_sys_confs():
+            restored = SysConfiguration.from_dict(json.loads(json.dumps(sys_conf.to_dict())))
+            self.assertEqual(sys_conf, restored)
+            self.assertEqual(sys_conf.id_for_packaging(), restored.id_for_packaging())
+
+    def test_field_values(self) -> None:
+        options = FieldOptions(mid_part=['clang11'], separator='_')
+        for sys_conf in get_test_sys_confs():
+            values = get_field_values(sys_conf, options=options)
+            self.assertEqual(list(FIELDS), list(values))
+            self.assertEqual(
+                sys_conf.id_for_packaging(mid_part=['clang11'], separator='_'),
+                values['id_for_packaging'])
+            self.assertEqual(sys_conf.short_os_name_and_version(),
+                             values['short_os_name_and_version'])
+            # Every field must be serializable for the JSON output format.
+            json.dumps(values)
+
+    def test_selected_fields(self) -> None:
+        sys_conf = get_test_sys_confs()[0]
+        field_names = parse_field_names('architecture,system')
+        self.assertEqual(
+            ['architecture', 'system'], list(get_field_values(sys_conf, field_names)))
+
+    def test_shell_format_is_evaluable(self) -> None:
+        values = {'short_os_name': 'centos', 'redhat_release': "It's \"quoted\" $HOME"}
+        script = format_field_values(values, 'shell') + (
+            '\necho "$SYS_DETECTION_SHORT_OS_NAME"\necho "$SYS_DETECTION_REDHAT_RELEASE"')
+        output = subprocess.check_output(['sh', '-c', script]).decode('utf-8')
+        self.assertEqual('centos\nIt\'s "quoted" $HOME\n', output)
+
+    def test_cli(self) -> None:
+        sys_conf = local_sys_conf()
+        self.assertEqual(
+            sys_conf.id_for_packaging(mid_part=['a', 'b'], separator='_'),
+            run_cli('--mid-part', 'a', '--mid-part', 'b', '--separator', '_').strip())
+        self.assertEqual(
+            dict(system=sys_conf.system, id_for_packaging=sys_conf.id_for_packaging()),
+            json.loads(run_cli('--format', 'json', '--fields', 'system,id_for_packaging')))
+        self.assertIn(
+            'export SYS_DETECTION_ARCHITECTURE=%s\n' % sys_conf.architecture,
+            run_cli('--format', 'shell'))
+
+
+if __name__ == '__main__':
+    unittest.main()
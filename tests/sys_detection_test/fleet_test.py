@@ -0,0 +1,130 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from collections import Counter
+from typing import List
+
+from sys_detection import is_compatible_os_and_version
+from sys_detection.batch import scan_root
+from sys_detection.fields import get_field_values
+from sys_detection.fleet import ReportAggregator, aggregate_file, aggregate_files
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+def get_scan_report_lines() -> List[str]:
+    return [
+        json.dumps(scan_root(os.path.join(TEST_DATA_DIR, dir_name), architecture='x86_64')
+                   .to_dict()) + '\n'
+        for dir_name in sorted(os.listdir(TEST_DATA_DIR))
+    ]
+
+
+class TestFleet(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.report_lines = get_scan_report_lines()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def write_reports(self, file_name: str, lines: List[str]) -> str:
+        path = os.path.join(self.tmp_dir.name, file_name)
+        data = ''.join(lines).encode('utf-8')
+        with open(path, 'wb') as output_file:
+            output_file.write(gzip.compress(data) if file_name.endswith('.gz') else data)
+        return path
+
+    def test_aggregate_file(self) -> None:
+        lines = self.report_lines * 3 + ['\n', 'not json\n', '[1, 2]\n', '{"sys_conf": {}}\n']
+        path = self.write_reports('reports.jsonl', lines)
+        aggregate = aggregate_file(path)
+
+        num_errors = sum(1 for line in self.report_lines if '"error"' in line)
+        self.assertEqual(1, num_errors)
+        self.assertEqual((len(self.report_lines) - num_errors) * 3, aggregate.num_reports)
+        self.assertEqual(num_errors * 3, aggregate.num_errors)
+        self.assertEqual(3, aggregate.num_invalid_lines)
+
+        expected_ids: Counter[str] = Counter()
+        for line in self.report_lines:
+            record = json.loads(line)
+            if 'id_for_packaging' in record:
+                expected_ids[record['id_for_packaging']] += 3
+        self.assertEqual(expected_ids, aggregate.histograms['id_for_packaging'])
+        self.assertEqual(aggregate.num_reports, sum(aggregate.histograms['architecture'].values()))
+        self.assertEqual({'x86_64': aggregate.num_reports}, aggregate.histograms['architecture'])
+        compatibility_classes = aggregate.histograms['compatibility_class']
+        self.assertEqual(
+            sum(count for id_for_packaging, count in expected_ids.items()
+                if is_compatible_os_and_version(id_for_packaging[:-len('-x86_64')], 'centos8')),
+            compatibility_classes['rhel-family:8'])
+        self.assertEqual(
+            expected_ids['ubuntu20.04-x86_64'], compatibility_classes['ubuntu20.04'])
+
+        # Clearing the table of configurations must not change the result.
+        aggregator = ReportAggregator(max_interned=2)
+        for line in lines:
+            aggregator.add_line(line.encode('utf-8'))
+        self.assertEqual(aggregate, aggregator.aggregate)
+
+    def test_shards(self) -> None:
+        whole_path = self.write_reports('all.jsonl', self.report_lines * 4)
+        shard_paths = [
+            self.write_reports('shard%d.jsonl.gz' % i, self.report_lines[i::3] * 4)
+            for i in range(3)
+        ]
+        # Compressed files are recognized by their contents, not their names.
+        os.rename(shard_paths[0], shard_paths[0][:-3])
+        shard_paths[0] = shard_paths[0][:-3]
+        expected_aggregate = aggregate_file(whole_path)
+        self.assertEqual(expected_aggregate, aggregate_files(shard_paths, jobs=1))
+        self.assertEqual(expected_aggregate, aggregate_files(shard_paths, jobs=3))
+
+    def test_field_records(self) -> None:
+        aggregator = ReportAggregator()
+        scan_result = scan_root(os.path.join(TEST_DATA_DIR, 'centos7'), architecture='aarch64')
+        assert scan_result.sys_conf is not None
+        record = get_field_values(scan_result.sys_conf)
+        for _ in range(2):
+            aggregator.add_record(record)
+        aggregator.add_record(dict(record, short_os_name=None))
+        aggregate = aggregator.aggregate
+        self.assertEqual(2, aggregate.num_reports)
+        self.assertEqual(1, aggregate.num_invalid_lines)
+        self.assertEqual({'centos7-aarch64': 2}, aggregate.histograms['id_for_packaging'])
+        self.assertEqual({'rhel-family:7': 2}, aggregate.histograms['compatibility_class'])
+
+    def test_cli(self) -> None:
+        path = self.write_reports('reports.jsonl.gz', self.report_lines)
+        output = subprocess.check_output(
+            [sys.executable, '-m', 'sys_detection', 'aggregate', path, '--output-format', 'json'])
+        self.assertEqual(aggregate_file(path).to_dict(), json.loads(output))
+
+        output = subprocess.check_output(
+            [sys.executable, '-m', 'sys_detection', 'aggregate', '-', '--top', '2'],
+            input=''.join(self.report_lines).encode('utf-8'))
+        lines = output.decode('utf-8').splitlines()
+        self.assertTrue(lines[0].startswith('reports: %d,' % aggregate_file(path).num_reports))
+        self.assertIn('id_for_packaging:', lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
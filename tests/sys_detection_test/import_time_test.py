@@ -0,0 +1,112 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import subprocess
+import sys
+import unittest
+
+from typing import Dict, List
+
+
+# Modules that must not be imported by "import sys_detection", or by the common is_linux() /
+# id_for_packaging() code paths.
+HEAVY_MODULES = ['autorepr', 'platform', 'shlex']
+
+# The maximum time, in milliseconds, that "import sys_detection" may take on top of importing the
+# typing module, which is needed for type annotations. Can be overridden for slow machines.
+IMPORT_TIME_BUDGET_MS_ENV_VAR = 'SYS_DETECTION_IMPORT_TIME_BUDGET_MS'
+DEFAULT_IMPORT_TIME_BUDGET_MS = 15.0
+
+NUM_IMPORT_TIME_RUNS = 5
+
+
+def get_cumulative_import_times_us(code: str) -> Dict[str, int]:
+    """
+    Runs the given code in a new interpreter with -X importtime and returns the cumulative import
+    time, in microseconds, of every module that was imported.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True)
+    import_times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields: List[str] = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        import_times[fields[2].strip()] = int(fields[1])
+    return import_times
+
+
+class TestImportTime(unittest.TestCase):
+    def test_no_heavy_imports(self) -> None:
+        import_times = get_cumulative_import_times_us('import sys_detection')
+        self.assertIn('sys_detection', import_times)
+        for module_name in HEAVY_MODULES:
+            self.assertNotIn(module_name, import_times)
+
+        import_times = get_cumulative_import_times_us(
+            'import sys_detection; '
+            'sys_conf = sys_detection.local_sys_conf(); '
+            'sys_detection.is_linux(); '
+            'sys_conf.id_for_packaging()')
+        for module_name in HEAVY_MODULES:
+            self.assertNotIn(module_name, import_times)
+
+    def test_no_regex_compilation(self) -> None:
+        # Patterns compiled while importing sys_detection, and the result of using the public
+        # regular expression constants afterwards.
+        code = '''
+import re
+import typing
+compiled_patterns = []
+compile = re.compile
+def record_compile(pattern, flags=0):
+    compiled_patterns.append(pattern)
+    return compile(pattern, flags)
+re.compile = record_compile
+import sys_detection
+from sys_detection import os_compatibility
+print(compiled_patterns)
+print(bool(sys_detection.VALID_ATTR_RE.match('id')),
+      sys_detection.REDHAT_FAMILY_OS_AND_VERSION_NAME_RE.match('centos8').groups(),
+      os_compatibility.RHEL_FAMILY_RE.pattern == os_compatibility.RHEL_FAMILY_RE_STR)
+'''
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            check=True)
+        self.assertEqual(['[]', "True ('centos', '8') True"], result.stdout.splitlines())
+
+    def test_import_time_budget(self) -> None:
+        budget_ms = float(os.environ.get(
+            IMPORT_TIME_BUDGET_MS_ENV_VAR, DEFAULT_IMPORT_TIME_BUDGET_MS))
+        import_times_ms: List[float] = []
+        for _ in range(NUM_IMPORT_TIME_RUNS):
+            import_times = get_cumulative_import_times_us('import sys_detection')
+            import_times_ms.append(
+                (import_times['sys_detection'] - import_times.get('typing', 0)) / 1000.0)
+        best_import_time_ms = min(import_times_ms)
+        self.assertLessEqual(
+            best_import_time_ms, budget_ms,
+            'import sys_detection took %.2f ms (excluding typing), which exceeds the budget of '
+            '%.2f ms. All measurements: %s' % (best_import_time_ms, budget_ms, import_times_ms))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from unittest import mock
+
+from sys_detection import SysConfiguration
+from sys_detection.fields import get_field_values
+from sys_detection.kernel_info import (
+    NumaNode, get_page_size, read_kernel_release, read_numa_nodes,
+    read_transparent_hugepage_mode)
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+# Root directories containing the files under /proc and /sys that kernel_info reads.
+KERNEL_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kernel_data')
+
+KIB = 1024
+
+
+class TestKernelInfo(unittest.TestCase):
+    def test_fixtures(self) -> None:
+        base_dir = os.path.join(KERNEL_DATA_DIR, 'x86_64_two_nodes')
+        self.assertEqual('5.15.0-91-generic', read_kernel_release(base_dir))
+        self.assertEqual(4096, get_page_size(base_dir))
+        self.assertEqual('madvise', read_transparent_hugepage_mode(base_dir))
+        numa_nodes = read_numa_nodes(base_dir)
+        self.assertEqual([
+            NumaNode(node_id=0, cpu_list='0-15,32-47', memory_bytes=65843900 * KIB),
+            NumaNode(node_id=1, cpu_list='16-31,48-63', memory_bytes=66035488 * KIB),
+        ], numa_nodes)
+        assert numa_nodes is not None
+        self.assertEqual([32, 32], [node.cpu_count() for node in numa_nodes])
+
+        base_dir = os.path.join(KERNEL_DATA_DIR, 'aarch64_64k_pages')
+        self.assertEqual('4.18.0-513.5.1.el8_9.aarch64', read_kernel_release(base_dir))
+        self.assertEqual(65536, get_page_size(base_dir))
+        self.assertEqual('always', read_transparent_hugepage_mode(base_dir))
+        self.assertEqual(
+            [NumaNode(node_id=0, cpu_list='0-79', memory_bytes=263735296 * KIB)],
+            read_numa_nodes(base_dir))
+
+    def test_missing_files(self) -> None:
+        with tempfile.TemporaryDirectory() as base_dir:
+            self.assertIsNone(read_kernel_release(base_dir))
+            self.assertIsNone(get_page_size(base_dir))
+            self.assertIsNone(read_transparent_hugepage_mode(base_dir))
+            self.assertIsNone(read_numa_nodes(base_dir))
+
+            node_dir = os.path.join(base_dir, 'sys', 'devices', 'system', 'node', 'node3')
+            os.makedirs(node_dir)
+            self.assertEqual(
+                [NumaNode(node_id=3, cpu_list='', memory_bytes=None)], read_numa_nodes(base_dir))
+
+    def test_local_system(self) -> None:
+        page_size = get_page_size('/')
+        assert page_size is not None
+        self.assertGreaterEqual(page_size, 4096)
+
+    def test_sys_configuration(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            base_dir = os.path.join(tmp_dir, 'root')
+            shutil.copytree(os.path.join(KERNEL_DATA_DIR, 'x86_64_two_nodes'), base_dir)
+            shutil.copytree(os.path.join(TEST_DATA_DIR, 'ubuntu20.04', 'etc'),
+                            os.path.join(base_dir, 'etc'))
+            sys_conf = SysConfiguration.from_etc_dir(
+                'Linux', 'x86_64', os.path.join(base_dir, 'etc'))
+            self.assertEqual('5.15.0-91-generic', sys_conf.kernel_release())
+            self.assertEqual(4096, sys_conf.page_size())
+            self.assertEqual('madvise', sys_conf.transparent_hugepage_mode())
+            self.assertEqual(read_numa_nodes(base_dir), sys_conf.numa_nodes())
+
+            # Values are only read once per configuration.
+            with mock.patch('sys_detection.kernel_info.read_numa_nodes') as read_mock:
+                sys_conf.numa_nodes()
+                self.assertEqual(0, read_mock.call_count)
+
+            values = get_field_values(
+                sys_conf, ['kernel_release', 'page_size', 'transparent_hugepage_mode',
+                           'numa_nodes'])
+            self.assertEqual(dict(
+                kernel_release='5.15.0-91-generic',
+                page_size=4096,
+                transparent_hugepage_mode='madvise',
+                numa_nodes=[
+                    dict(node_id=0, cpu_list='0-15,32-47', cpu_count=32,
+                         memory_bytes=65843900 * KIB),
+                    dict(node_id=1, cpu_list='16-31,48-63', cpu_count=32,
+                         memory_bytes=66035488 * KIB),
+                ]), json.loads(json.dumps(values)))
+
+        sys_conf_without_base_dir = SysConfiguration(
+            'Linux', 'x86_64', linux_os_release=None, redhat_release=None)
+        self.assertIsNone(sys_conf_without_base_dir.kernel_release())
+        self.assertIsNone(sys_conf_without_base_dir.numa_nodes())
+
+    def test_cli(self) -> None:
+        output = subprocess.check_output(
+            [sys.executable, '-m', 'sys_detection', '--format', 'json', '--fields',
+             'kernel_release,page_size,transparent_hugepage_mode,numa_nodes'])
+        self.assertEqual(
+            ['kernel_release', 'page_size', 'transparent_hugepage_mode', 'numa_nodes'],
+            list(json.loads(output)))
+
+
+if __name__ == '__main__':
+    unittest.main()
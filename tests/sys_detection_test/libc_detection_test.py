@@ -0,0 +1,137 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from unittest import mock
+
+from sys_detection import SysConfiguration
+from sys_detection.libc_detection import (
+    GLIBC, MUSL, LibcInfo, detect_libc_in_root, get_local_libc, read_elf_interpreter)
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+# Root directories with a shell, whose ELF header requests a dynamic linker, and C libraries.
+LIBC_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'libc_data')
+
+EXPECTED_LIBC_BY_ROOT = {
+    'alpine3.14': LibcInfo(MUSL, '1.2.2'),
+    'centos7_i686': LibcInfo(GLIBC, '2.17'),
+    # Debian's musl package installs the musl dynamic linker alongside glibc.
+    'debian11_with_musl': LibcInfo(GLIBC, '2.31'),
+    'ubuntu20.04_s390x': LibcInfo(GLIBC, '2.31'),
+    # Without a shell to examine, glibc takes precedence.
+    'ubuntu22.04_with_musl_no_shell': LibcInfo(GLIBC, '2.35'),
+}
+
+
+def write_file(path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as output_file:
+        output_file.write(content)
+
+
+class TestLibcDetection(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_fixture_roots(self) -> None:
+        self.assertEqual(sorted(EXPECTED_LIBC_BY_ROOT), sorted(os.listdir(LIBC_DATA_DIR)))
+        for root_name, expected_libc in EXPECTED_LIBC_BY_ROOT.items():
+            self.assertEqual(
+                expected_libc, detect_libc_in_root(os.path.join(LIBC_DATA_DIR, root_name)),
+                root_name)
+
+    def test_elf_interpreter(self) -> None:
+        self.assertEqual(
+            '/lib/ld-linux.so.2',
+            read_elf_interpreter(os.path.join(LIBC_DATA_DIR, 'centos7_i686', 'bin', 'sh')))
+        self.assertEqual(
+            '/lib/ld64.so.1',
+            read_elf_interpreter(os.path.join(LIBC_DATA_DIR, 'ubuntu20.04_s390x', 'bin', 'sh')))
+        not_elf_path = os.path.join(LIBC_DATA_DIR, 'alpine3.14', 'lib', 'ld-musl-x86_64.so.1')
+        self.assertIsNone(read_elf_interpreter(not_elf_path))
+        self.assertIsNone(read_elf_interpreter(os.path.join(self.root, 'nonexistent')))
+
+    def test_musl_compatibility_links(self) -> None:
+        # A statically linked shell, and the glibc compatibility links of Alpine's libc6-compat.
+        write_file(os.path.join(self.root, 'bin', 'sh'), b'\x7fELF\2\1\1' + bytes(57))
+        write_file(os.path.join(self.root, 'lib', 'ld-musl-x86_64.so.1'), b'\0001.2.2\0')
+        os.symlink('/lib/ld-musl-x86_64.so.1', os.path.join(self.root, 'lib', 'libc.so.6'))
+        self.assertEqual(LibcInfo(MUSL, '1.2.2'), detect_libc_in_root(self.root))
+
+    def test_musl_root(self) -> None:
+        write_file(os.path.join(self.root, 'lib', 'ld-musl-x86_64.so.1'),
+                   b'\x7fELF\0\0/lib/ld-musl-x86_64.so.1\0Dynamic Program Loader\n\0' +
+                   b'1.2.2\0rest of the library')
+        os.symlink('/lib/ld-musl-x86_64.so.1',
+                   os.path.join(self.root, 'lib', 'libc.musl-x86_64.so.1'))
+        self.assertEqual(LibcInfo(MUSL, '1.2.2'), detect_libc_in_root(self.root))
+
+    def test_glibc_banner(self) -> None:
+        write_file(os.path.join(self.root, 'usr', 'lib64', 'libc.so.6'),
+                   b'\x7fELF\0GLIBC_2.2.5\0GLIBC_2.17\0GNU C Library (GNU libc) stable release '
+                   b'version 2.28.\nCopyright (C) 2018\0')
+        self.assertEqual(LibcInfo(GLIBC, '2.28'), detect_libc_in_root(self.root))
+
+    def test_glibc_symbol_versions(self) -> None:
+        write_file(os.path.join(self.root, 'lib', 'x86_64-linux-gnu', 'libc.so.6'),
+                   b'\x7fELF\0GLIBC_2.2.5\0GLIBC_2.9\0GLIBC_2.17\0GLIBC_PRIVATE\0')
+        self.assertEqual(LibcInfo(GLIBC, '2.17'), detect_libc_in_root(self.root))
+
+    def test_glibc_versioned_file_name(self) -> None:
+        write_file(os.path.join(self.root, 'lib64', 'libc-2.17.so'), b'\x7fELF\0')
+        # An absolute link target is resolved within the root directory.
+        os.symlink('/lib64/libc-2.17.so', os.path.join(self.root, 'lib64', 'libc.so.6'))
+        self.assertEqual(LibcInfo(GLIBC, '2.17'), detect_libc_in_root(self.root))
+
+    def test_no_libc(self) -> None:
+        self.assertIsNone(detect_libc_in_root(self.root))
+
+    def test_sys_configuration(self) -> None:
+        shutil.copytree(os.path.join(TEST_DATA_DIR, 'alpine3.14', 'etc'),
+                        os.path.join(self.root, 'etc'))
+        write_file(os.path.join(self.root, 'lib', 'ld-musl-aarch64.so.1'), b'\0001.2.2\0')
+        sys_conf = SysConfiguration.from_etc_dir(
+            'Linux', 'aarch64', os.path.join(self.root, 'etc'))
+        with mock.patch.object(subprocess, 'Popen', side_effect=AssertionError):
+            self.assertEqual(LibcInfo(MUSL, '1.2.2'), sys_conf.libc())
+        self.assertEqual('alpine3.14-musl1.2-aarch64', sys_conf.id_for_packaging(include_libc=True))
+        self.assertEqual('alpine3.14-aarch64', sys_conf.id_for_packaging())
+
+        # The result is cached on the object.
+        shutil.rmtree(os.path.join(self.root, 'lib'))
+        self.assertEqual(LibcInfo(MUSL, '1.2.2'), sys_conf.libc())
+        self.assertIsNone(SysConfiguration.from_etc_dir(
+            'Linux', 'aarch64', os.path.join(self.root, 'etc')).libc())
+
+    def test_local_system(self) -> None:
+        try:
+            confstr_value = os.confstr('CS_GNU_LIBC_VERSION')
+        except (AttributeError, ValueError, OSError):
+            confstr_value = None
+        if not confstr_value:
+            self.skipTest("The local system does not use glibc")
+        self.assertEqual(LibcInfo(*confstr_value.split(' ', 1)), get_local_libc())
+
+
+if __name__ == '__main__':
+    unittest.main()
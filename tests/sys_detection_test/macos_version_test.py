@@ -0,0 +1,86 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import plistlib
+import tempfile
+import unittest
+
+from unittest import mock
+
+from sys_detection import SysConfiguration
+from sys_detection.macos_version import SYSTEM_VERSION_PLIST_PATH, read_macos_version
+from sys_detection.packaging_id import parse_packaging_id
+
+
+MACOS_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'macos_data')
+
+
+def get_macos_conf(base_dir: str, architecture: str = 'arm64') -> SysConfiguration:
+    return SysConfiguration.from_etc_dir('Darwin', architecture, os.path.join(base_dir, 'etc'))
+
+
+class TestMacOsVersion(unittest.TestCase):
+    def test_fixtures(self) -> None:
+        for dir_name, expected_id in [
+            ('macos14.2.1', 'macos14-arm64'),
+            ('macos11.7.10', 'macos11-arm64'),
+            ('macos10.15.7', 'macos10.15-arm64'),
+        ]:
+            sys_conf = get_macos_conf(os.path.join(MACOS_DATA_DIR, dir_name))
+            self.assertEqual(dir_name[len('macos'):], sys_conf.macos_version())
+            self.assertEqual(expected_id, sys_conf.id_for_packaging())
+            packaging_id = parse_packaging_id(expected_id)
+            assert packaging_id is not None
+            self.assertEqual('macos', packaging_id.os_name)
+            self.assertEqual(sys_conf.short_os_version(), packaging_id.os_version)
+
+    def test_cached(self) -> None:
+        sys_conf = get_macos_conf(os.path.join(MACOS_DATA_DIR, 'macos14.2.1'))
+        with mock.patch('plistlib.load', wraps=plistlib.load) as load_mock:
+            self.assertEqual('macos14', sys_conf.short_os_name_and_version())
+            self.assertEqual('macos14-arm64', sys_conf.id_for_packaging())
+            self.assertEqual(1, load_mock.call_count)
+
+    def test_binary_and_invalid_plists(self) -> None:
+        with tempfile.TemporaryDirectory() as base_dir:
+            plist_path = os.path.join(base_dir, SYSTEM_VERSION_PLIST_PATH)
+            self.assertIsNone(read_macos_version(base_dir))
+            self.assertEqual('macos-x86_64', get_macos_conf(base_dir, 'x86_64').id_for_packaging())
+
+            os.makedirs(os.path.dirname(plist_path))
+            with open(plist_path, 'wb') as plist_file:
+                plistlib.dump(
+                    {'ProductName': 'macOS', 'ProductVersion': '13.6'}, plist_file,
+                    fmt=plistlib.FMT_BINARY)
+            self.assertEqual('13.6', read_macos_version(base_dir))
+
+            for invalid_data in [b'', b'<plist><dict>', plistlib.dumps(['13.6']),
+                                 plistlib.dumps({'ProductName': 'macOS'})]:
+                with open(plist_path, 'wb') as plist_file:
+                    plist_file.write(invalid_data)
+                self.assertIsNone(read_macos_version(base_dir))
+
+    def test_without_base_dir(self) -> None:
+        sys_conf = SysConfiguration(
+            'Darwin', 'arm64', linux_os_release=None, redhat_release=None)
+        self.assertIsNone(sys_conf.macos_version())
+        self.assertEqual('macos-arm64', sys_conf.id_for_packaging())
+
+        linux_conf = SysConfiguration.from_dict(dict(
+            system='Linux', architecture='x86_64', linux_os_release={'ID': 'arch'},
+            base_dir=os.path.join(MACOS_DATA_DIR, 'macos14.2.1')))
+        self.assertIsNone(linux_conf.macos_version())
+
+
+if __name__ == '__main__':
+    unittest.main()
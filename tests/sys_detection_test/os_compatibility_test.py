@@ -0,0 +1,62 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import itertools
+import unittest
+
+from typing import List, Tuple
+
+from sys_detection import is_compatible_os_and_version
+from sys_detection.os_compatibility import (
+    CompatibilityIndex, REDHAT_FAMILY_OS_NAMES, is_compatible_os)
+
+
+OS_AND_VERSIONS = [
+    'almalinux8', 'centos7', 'centos8', 'ol7', 'ol8', 'rhel8', 'rocky8', 'rocky9', 'centos',
+    'ubuntu18.04', 'ubuntu20.04', 'alpine3.14', 'amzn2', 'arch', 'macos', 'centos8.2',
+]
+
+
+class TestOsCompatibility(unittest.TestCase):
+    def test_functions_agree(self) -> None:
+        for os1, os2 in itertools.product(OS_AND_VERSIONS, repeat=2):
+            self.assertEqual(
+                is_compatible_os(os1, os2), is_compatible_os_and_version(os1, os2), (os1, os2))
+
+    def test_redhat_family(self) -> None:
+        for os1, os2 in itertools.product(REDHAT_FAMILY_OS_NAMES, repeat=2):
+            self.assertTrue(is_compatible_os(os1 + '8', os2 + '8'))
+            self.assertFalse(is_compatible_os(os1 + '7', os2 + '8'))
+        self.assertFalse(is_compatible_os('centos8.2', 'centos8'))
+        self.assertFalse(is_compatible_os('fedora8', 'centos8'))
+
+    def test_index(self) -> None:
+        entries: List[Tuple[str, str]] = [
+            (os_and_version, '%s-%d.tar.gz' % (os_and_version, i))
+            for i, os_and_version in enumerate(OS_AND_VERSIONS * 3)
+        ]
+        index: CompatibilityIndex[str] = CompatibilityIndex()
+        index.add_all(entries[:10])
+        for os_and_version, item in entries[10:]:
+            index.add(os_and_version, item)
+        self.assertEqual(len(entries), len(index))
+
+        for target in OS_AND_VERSIONS + ['ubuntu22.04', 'rhel7']:
+            self.assertEqual(
+                [item for os_and_version, item in entries
+                 if is_compatible_os(os_and_version, target)],
+                list(index.find_compatible(target)),
+                target)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import glob
+import os
+import shlex
+import unittest
+
+from typing import Dict
+
+from sys_detection import OsReleaseVars
+from sys_detection.os_release_parser import parse_os_release, parse_os_release_value
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+def parse_os_release_with_shlex(file_path: str) -> Dict[str, str]:
+    """
+    The shlex-based implementation that was used before the dedicated parser was introduced.
+    """
+    result: Dict[str, str] = {}
+    with open(file_path) as input_file:
+        for line in input_file:
+            line = line.strip()
+            if not line:
+                continue
+            items = line.split('=', 1)
+            tokens = list(shlex.shlex(items[1], posix=True))
+            result[items[0].lower()] = tokens[0] if len(tokens) == 1 else items[1]
+    return result
+
+
+class TestOsReleaseParser(unittest.TestCase):
+    def test_equivalence_with_shlex(self) -> None:
+        file_paths = glob.glob(os.path.join(TEST_DATA_DIR, '*', 'etc', 'os-release'))
+        self.assertGreater(len(file_paths), 30)
+        for file_path in file_paths:
+            expected = parse_os_release_with_shlex(file_path)
+            # The shlex-based parser did not recognize comment lines.
+            expected = {k: v for k, v in expected.items() if not k.startswith('#')}
+            self.assertEqual(expected, OsReleaseVars.read_file(file_path).vars, file_path)
+
+    def test_quoting_and_escaping(self) -> None:
+        self.assertEqual(
+            {
+                'name': 'Some OS',
+                'version': '1.0 (Code Name)',
+                'id': 'someos',
+                'id_like': 'rhel fedora',
+                'pretty_name': 'It\'s "quoted" $HOME \\n',
+                'home_url': 'https://example.com/?a=b',
+                'ansi_color': '0;31',
+                'empty': '',
+            },
+            parse_os_release(
+                b'# A comment\n'
+                b'\n'
+                b'NAME="Some OS"\r\n'
+                b'  VERSION = "1.0 (Code Name)"  \n'
+                b'ID=someos # trailing comment\n'
+                b"ID_LIKE='rhel fedora'\n"
+                b'PRETTY_NAME="It\'s \\"quoted\\" \\$HOME \\n"\n'
+                b'HOME_URL=https://example.com/?a=b\n'
+                b'ANSI_COLOR=0\\;31\n'
+                b'not an assignment\n'
+                b'EMPTY='))
+
+    def test_unterminated_quotes(self) -> None:
+        # An unterminated quote ends at the end of its line, and does not swallow later keys, even
+        # if a later line contains the same quote character.
+        expected = {
+            'name': 'Broken OS',
+            'id': 'centos',
+            'pretty_name': 'Broken OS 8',
+            'version_id': '8',
+        }
+        for quote in ['"', "'"]:
+            for pretty_name in ["'Broken OS 8", '"Broken OS 8"', "'Broken OS 8'"]:
+                data = (
+                    'NAME=%sBroken OS\n'
+                    'ID=centos\n'
+                    'PRETTY_NAME=%s\n'
+                    'VERSION_ID=8\n') % (quote, pretty_name)
+                self.assertEqual(expected, parse_os_release(data), data)
+        # Values do not span lines, and a backslash does not continue a line.
+        self.assertEqual(
+            {'multi_line': 'first', 'continued': 'a\\', 'id': 'x'},
+            parse_os_release('MULTI_LINE="first\nsecond"\nCONTINUED="a\\\nb"\nID=x\n'))
+        self.assertEqual({'name': 'a\\', 'id': 'x'}, parse_os_release('NAME="a\\\nID=x'))
+        self.assertEqual({'name': 'last'}, parse_os_release("NAME='last"))
+
+    def test_value(self) -> None:
+        self.assertEqual('a#b', parse_os_release_value('a#b'))
+        self.assertEqual('a', parse_os_release_value('a #b'))
+        self.assertEqual('a b', parse_os_release_value('a\\ b'))
+        self.assertEqual('', parse_os_release_value('""'))
+        self.assertEqual('unterminated', parse_os_release_value('"unterminated'))
+
+    def test_buffer_types(self) -> None:
+        data = b'ID=centos\nVERSION_ID="8"\n'
+        expected = {'id': 'centos', 'version_id': '8'}
+        self.assertEqual(expected, parse_os_release(data))
+        self.assertEqual(expected, parse_os_release(bytearray(data)))
+        self.assertEqual(expected, parse_os_release(memoryview(data)))
+        self.assertEqual(expected, parse_os_release(data.decode('utf-8')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import unittest
+
+from pathlib import Path
+from typing import List
+
+from sys_detection.packaging_id import (
+    KNOWN_ARCHITECTURES, PackagingId, PackagingIdParser, parse_packaging_id)
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR, get_platform_conf
+
+
+MID_PARTS: List[List[str]] = [[], ['clang11'], ['gcc9', 'lto'], ['']]
+SEPARATORS = ['-', '_', '--', '.']
+
+
+class TestPackagingIdParser(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        parsers = {separator: PackagingIdParser(separator) for separator in SEPARATORS}
+        num_checked = 0
+        for test_dir_path in Path(TEST_DATA_DIR).glob('*'):
+            if not os.path.isfile(test_dir_path.joinpath('etc', 'os-release')):
+                continue
+            for architecture in KNOWN_ARCHITECTURES:
+                sys_conf = get_platform_conf('Linux', architecture, test_dir_path)
+                for separator, parser in parsers.items():
+                    for mid_part in MID_PARTS:
+                        id_for_packaging = sys_conf.id_for_packaging(mid_part, separator)
+                        packaging_id = parser.parse(id_for_packaging)
+                        assert packaging_id is not None, id_for_packaging
+                        self.assertEqual(
+                            PackagingId(
+                                os_name=sys_conf.short_os_name() or '',
+                                os_version=sys_conf.short_os_version(),
+                                mid_part=tuple(mid_part),
+                                architecture=architecture),
+                            packaging_id,
+                            id_for_packaging)
+                        self.assertEqual(
+                            id_for_packaging, packaging_id.to_string(separator))
+                        num_checked += 1
+        self.assertGreater(num_checked, 1000)
+
+    def test_parse_many(self) -> None:
+        lines = [
+            'centos8-x86_64\n',
+            'not-an-id\n',
+            '  ubuntu20.04-clang12-aarch64  \n',
+            'macos-arm64',
+            'centos8-mips',
+        ]
+        parser = PackagingIdParser()
+        self.assertEqual(
+            ['centos8-x86_64', 'ubuntu20.04-clang12-aarch64', 'macos-arm64'],
+            [packaging_id.to_string() for packaging_id in parser.parse_many(lines)])
+        with self.assertRaises(ValueError):
+            list(parser.parse_many(lines, strict=True))
+
+    def test_custom_names(self) -> None:
+        parser = PackagingIdParser(os_names=['myos'], architectures=['riscv64'])
+        packaging_id = parser.parse('myos1.2-riscv64')
+        assert packaging_id is not None
+        self.assertEqual(('myos', '1.2', (), 'riscv64'), tuple(packaging_id))
+        self.assertIsNone(parser.parse('centos8-x86_64'))
+        self.assertIsNotNone(parse_packaging_id('centos8_x86_64', separator='_'))
+
+
+if __name__ == '__main__':
+    unittest.main()
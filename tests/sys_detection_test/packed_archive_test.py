@@ -0,0 +1,146 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from unittest import mock
+
+from sys_detection import OsReleaseVars, SysConfiguration
+from sys_detection.file_provider import DictFileProvider, FileProvider, LocalFileProvider
+from sys_detection.packed_archive import PackedArchive, iter_dir_files, write_packed_archive
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+PACK_TEST_DATA_SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'bin', 'pack_test_data.py')
+
+
+class TestPackedArchive(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.archive_path = os.path.join(self.tmp_dir.name, 'test_data.pack')
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_corpus(self) -> None:
+        num_files = write_packed_archive(iter_dir_files(TEST_DATA_DIR), self.archive_path)
+        total_size = sum(len(data) for _, data in iter_dir_files(TEST_DATA_DIR))
+        # Identical files, e.g. os-release of the x86_64 and aarch64 images, are stored once.
+        self.assertLess(os.path.getsize(self.archive_path), total_size)
+
+        with PackedArchive(self.archive_path) as archive:
+            self.assertEqual(num_files, len(archive))
+            roots = archive.get_roots()
+            self.assertIn('centos7', roots)
+            for root in roots:
+                etc_dir_path = os.path.join(TEST_DATA_DIR, root, 'etc')
+                expected_sys_conf = SysConfiguration.from_etc_dir('Linux', 'x86_64', etc_dir_path)
+                sys_conf = SysConfiguration.from_etc_dir(
+                    'Linux', 'x86_64', root + '/etc', file_provider=archive)
+                self.assertEqual(
+                    expected_sys_conf.linux_os_release, sys_conf.linux_os_release, msg=root)
+                self.assertEqual(
+                    expected_sys_conf.redhat_release, sys_conf.redhat_release, msg=root)
+                self.assertIsNone(sys_conf.base_dir)
+
+            data = archive.read_bytes('/centos7/etc/os-release')
+            assert isinstance(data, memoryview)
+            with open(os.path.join(TEST_DATA_DIR, 'centos7', 'etc', 'os-release'), 'rb') as f:
+                self.assertEqual(f.read(), data)
+            data.release()
+
+            with self.assertRaises(FileNotFoundError):
+                archive.read_bytes('centos7/etc/nonexistent')
+            with self.assertRaises(FileNotFoundError):
+                SysConfiguration.from_etc_dir('Linux', 'x86_64', 'nonexistent/etc', archive)
+
+    def test_view_lifetime(self) -> None:
+        write_packed_archive([
+            ('a/etc/os-release', b'ID=centos\nVERSION_ID=8\n'),
+            ('a/etc/redhat-release', b'CentOS Linux release 8.4.2105\n'),
+        ], self.archive_path)
+
+        archive = PackedArchive(self.archive_path)
+        data = archive.read_bytes('a/etc/os-release')
+        with self.assertRaises(BufferError):
+            archive.close()
+        self.assertEqual(b'ID=centos\nVERSION_ID=8\n', bytes(data))
+        data.release()  # type: ignore
+        archive.close()
+
+        # The views read by from_etc_dir do not outlive it, even if parsing fails.
+        with self.assertRaises(ValueError):
+            with PackedArchive(self.archive_path) as archive:
+                with mock.patch.object(
+                        OsReleaseVars, 'from_bytes', side_effect=ValueError("Parse error")):
+                    SysConfiguration.from_etc_dir('Linux', 'x86_64', 'a/etc', archive)
+        with PackedArchive(self.archive_path) as archive:
+            sys_conf = SysConfiguration.from_etc_dir('Linux', 'x86_64', 'a/etc', archive)
+        self.assertEqual('centos8-x86_64', sys_conf.id_for_packaging())
+        self.assertEqual('CentOS Linux release 8.4.2105', sys_conf.redhat_release)
+
+    def test_invalid_archives(self) -> None:
+        write_packed_archive([('a/etc/os-release', b'ID=alpine\n')], self.archive_path)
+        with open(self.archive_path, 'rb') as archive_file:
+            archive_data = archive_file.read()
+        for corrupted_data in [b'', b'Hello, world', archive_data[:-1]]:
+            with open(self.archive_path, 'wb') as archive_file:
+                archive_file.write(corrupted_data)
+            with self.assertRaises(ValueError):
+                PackedArchive(self.archive_path)
+
+    def test_file_providers(self) -> None:
+        provider = DictFileProvider({
+            'root1/etc/os-release': b'ID=centos\nVERSION_ID="8"\n',
+            'root1/etc/redhat-release': b'CentOS Linux release 8.4.2105\n',
+        })
+        sys_conf = SysConfiguration.from_etc_dir('Linux', 'x86_64', 'root1/etc', provider)
+        self.assertEqual('centos8-x86_64', sys_conf.id_for_packaging())
+        self.assertEqual('CentOS Linux release 8.4.2105', sys_conf.redhat_release)
+        self.assertIsNone(sys_conf.cpu_level())
+
+        os_release_path = os.path.join(TEST_DATA_DIR, 'ubuntu20.04', 'etc', 'os-release')
+        self.assertEqual(
+            OsReleaseVars.read_file(os_release_path),
+            OsReleaseVars.read_file(os_release_path, LocalFileProvider()))
+
+        class IncompleteFileProvider(FileProvider):
+            def read_bytes(self, path: str) -> bytes:
+                return b''
+
+        with self.assertRaises(TypeError):
+            IncompleteFileProvider()  # type: ignore
+
+    def test_pack_test_data_script(self) -> None:
+        subprocess.run(
+            [sys.executable, PACK_TEST_DATA_SCRIPT_PATH, '--output', self.archive_path,
+             '--synthetic-roots', '100'],
+            stderr=subprocess.PIPE,
+            check=True)
+        with PackedArchive(self.archive_path) as archive:
+            roots = archive.get_roots()
+            self.assertEqual(['root%06d' % i for i in range(100)], roots)
+            for root in roots:
+                sys_conf = SysConfiguration.from_etc_dir(
+                    'Linux', 'x86_64', root + '/etc', file_provider=archive)
+                self.assertTrue(sys_conf.short_os_name_and_version())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from contextlib import redirect_stdout
+from types import ModuleType
+from typing import Dict, List
+from unittest import mock
+
+
+SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'bin', 'populate_test_data.py')
+
+# Emulates the subset of the docker command line used by the script. Image digests are read from
+# digests.json in the state directory, and every invocation is appended to calls.log there.
+FAKE_DOCKER_SCRIPT = '''
+import json
+import os
+import sys
+import time
+
+state_dir = os.path.dirname(os.path.abspath(__file__))
+args = sys.argv[1:]
+with open(os.path.join(state_dir, 'calls.log'), 'a') as log_file:
+    log_file.write(' '.join(args[:2]) + '\\n')
+
+if args[0] == 'pull':
+    sys.exit(0)
+if args[:2] == ['image', 'inspect']:
+    with open(os.path.join(state_dir, 'digests.json')) as digests_file:
+        print(json.load(digests_file).get(args[-1], 'sha256:initial'))
+    sys.exit(0)
+if args[0] == 'run':
+    image = args[2]
+    name, version = image.split(':')
+    # Warnings of the docker command itself are written to standard error.
+    sys.stderr.write('WARNING: The requested image platform does not match\\n')
+    if name == 'broken':
+        with open(os.path.join(state_dir, 'broken.pid'), 'w') as pid_file:
+            pid_file.write(str(os.getpid()))
+        print('unexpected output', flush=True)
+        time.sleep(60)
+        sys.exit(0)
+    print('ls: cannot access /etc/*version*: No such file or directory')
+    print('--- Contents of file: /etc/os-release')
+    print('ID=%s' % name)
+    print('VERSION_ID="%s"' % version)
+    print('--- End of file contents')
+    print('--- Message: File /etc/lsb-release does not exist')
+    print('--- Contents of file: /tmp/libc_version.txt')
+    print('ldd (GNU libc) 2.28')
+    print('--- End of file contents')
+    sys.exit(0)
+sys.exit(1)
+'''
+
+VERSIONS_BY_OS = {
+    'centos': [7, 8],
+    'ubuntu': ['20.04'],
+    'archlinux': ['latest'],
+}
+
+
+def load_script() -> ModuleType:
+    spec = importlib.util.spec_from_file_location('populate_test_data', SCRIPT_PATH)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore
+    return module
+
+
+class TestPopulateTestData(unittest.TestCase):
+    def setUp(self) -> None:
+        self.script = load_script()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_dir = os.path.join(self.tmp_dir.name, 'state')
+        os.mkdir(self.state_dir)
+        self.docker_path = os.path.join(self.state_dir, 'docker')
+        with open(self.docker_path, 'w') as docker_file:
+            docker_file.write('#!%s\n%s' % (sys.executable, FAKE_DOCKER_SCRIPT))
+        os.chmod(self.docker_path, 0o755)
+        self.set_digests({})
+        self.test_data_dir = os.path.join(self.tmp_dir.name, 'test_data')
+        self.manifest_path = os.path.join(self.tmp_dir.name, 'manifest.json')
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def set_digests(self, digests: Dict[str, str]) -> None:
+        with open(os.path.join(self.state_dir, 'digests.json'), 'w') as digests_file:
+            json.dump(digests, digests_file)
+
+    def run_script(self) -> List[str]:
+        """
+        Runs the script with the fake docker executable and returns the commands it invoked.
+        """
+        calls_path = os.path.join(self.state_dir, 'calls.log')
+        if os.path.exists(calls_path):
+            os.remove(calls_path)
+        with mock.patch.object(self.script, 'VERSIONS_BY_OS', VERSIONS_BY_OS), \
+                redirect_stdout(io.StringIO()):
+            self.script.main([
+                '--docker', self.docker_path,
+                '--jobs', '3',
+                '--test-data-dir', self.test_data_dir,
+                '--manifest', self.manifest_path,
+            ])
+        with open(calls_path) as calls_file:
+            return calls_file.read().splitlines()
+
+    def read_test_data_file(self, *path: str) -> str:
+        with open(os.path.join(self.test_data_dir, *path)) as test_data_file:
+            return test_data_file.read()
+
+    def test_populate(self) -> None:
+        calls = self.run_script()
+        self.assertEqual(4, calls.count('run --rm'))
+        self.assertEqual(
+            'ID=centos\nVERSION_ID="7"\n', self.read_test_data_file('centos7', 'etc', 'os-release'))
+        self.assertEqual(
+            'ID=archlinux\nVERSION_ID="latest"\n',
+            self.read_test_data_file('archlinux', 'etc', 'os-release'))
+        self.assertEqual(
+            'ldd (GNU libc) 2.28\n',
+            self.read_test_data_file('ubuntu20.04', 'tmp', 'libc_version.txt'))
+        self.assertFalse(os.path.exists(os.path.join(self.test_data_dir, 'centos7', 'etc',
+                                                     'lsb-release')))
+        with open(self.manifest_path) as manifest_file:
+            self.assertEqual({
+                'archlinux:latest': 'sha256:initial',
+                'centos:7': 'sha256:initial',
+                'centos:8': 'sha256:initial',
+                'ubuntu:20.04': 'sha256:initial',
+            }, json.load(manifest_file))
+
+    def test_skip_unchanged_images(self) -> None:
+        self.run_script()
+        os_release_path = os.path.join(self.test_data_dir, 'centos8', 'etc', 'os-release')
+        os.utime(os_release_path, (0, 0))
+
+        # Unchanged digests: no containers are run.
+        calls = self.run_script()
+        self.assertEqual(0, calls.count('run --rm'))
+        self.assertEqual(4, calls.count('image inspect'))
+
+        # A changed digest with unchanged output reruns the container but rewrites no files.
+        self.set_digests({'centos:8': 'sha256:updated'})
+        calls = self.run_script()
+        self.assertEqual(1, calls.count('run --rm'))
+        self.assertEqual(0, os.stat(os_release_path).st_mtime)
+        with open(self.manifest_path) as manifest_file:
+            self.assertEqual('sha256:updated', json.load(manifest_file)['centos:8'])
+
+    def test_changed_file_is_rewritten(self) -> None:
+        self.run_script()
+        os_release_path = os.path.join(self.test_data_dir, 'ubuntu20.04', 'etc', 'os-release')
+        with open(os_release_path, 'w') as os_release_file:
+            os_release_file.write('ID=stale\n')
+        self.set_digests({'ubuntu:20.04': 'sha256:updated'})
+        self.run_script()
+        self.assertEqual(
+            'ID=ubuntu\nVERSION_ID="20.04"\n',
+            self.read_test_data_file('ubuntu20.04', 'etc', 'os-release'))
+
+    def test_parse_error_kills_container(self) -> None:
+        runner = self.script.ContainerRunner(self.docker_path)
+        start_time = time.monotonic()
+        with self.assertRaisesRegex(ValueError, 'Unrecognized line: unexpected output'):
+            self.script.process_image(
+                runner, 'broken:1', os.path.join(self.test_data_dir, 'broken1'), None, False)
+        self.assertLess(time.monotonic() - start_time, 30)
+        with open(os.path.join(self.state_dir, 'broken.pid')) as pid_file:
+            pid = int(pid_file.read())
+        # The process has been killed and waited for, so it no longer exists.
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    def test_output_parser(self) -> None:
+        parser = self.script.ContainerOutputParser()
+        with self.assertRaises(ValueError):
+            parser.feed_line('unexpected output\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from unittest import mock
+
+from sys_detection import SysConfiguration, root_cache
+from sys_detection.root_cache import RootCache
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+ROOT_NAMES = ['centos8', 'ubuntu20.04', 'alpine3.14']
+
+
+class TestRootCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.mkdtemp(prefix='sys_detection_root_cache_test_')
+        self.roots: Dict[str, str] = {}
+        for root_name in ROOT_NAMES:
+            self.roots[root_name] = os.path.join(self.tmp_dir, root_name)
+            shutil.copytree(os.path.join(TEST_DATA_DIR, root_name), self.roots[root_name])
+        self.detected_roots: List[str] = []
+        self.detected_roots_lock = threading.Lock()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+
+    def slow_detect_root(self, base_dir: str) -> SysConfiguration:
+        with self.detected_roots_lock:
+            self.detected_roots.append(os.path.basename(base_dir))
+        time.sleep(0.05)
+        return SysConfiguration.from_etc_dir('Linux', 'x86_64', os.path.join(base_dir, 'etc'))
+
+    def test_per_root_results(self) -> None:
+        cache = RootCache()
+        for root_name, root in self.roots.items():
+            self.assertEqual(root_name, cache.get(root).short_os_name_and_version())
+        for root_name, root in self.roots.items():
+            self.assertEqual(root_name, cache.get(root).short_os_name_and_version())
+
+    @mock.patch.object(root_cache, 'detect_root')
+    def test_concurrent_detection_once_per_root(self, detect_root_mock: mock.Mock) -> None:
+        detect_root_mock.side_effect = self.slow_detect_root
+        cache = RootCache()
+        roots = list(self.roots.values()) * 10
+        with ThreadPoolExecutor(max_workers=len(roots)) as executor:
+            results = list(executor.map(cache.get, roots))
+        self.assertEqual(sorted(ROOT_NAMES), sorted(self.detected_roots))
+        for root, result in zip(roots, results):
+            self.assertEqual(os.path.basename(root), result.short_os_name_and_version())
+
+    @mock.patch.object(root_cache, 'detect_root')
+    def test_lru_eviction_and_invalidation(self, detect_root_mock: mock.Mock) -> None:
+        detect_root_mock.side_effect = self.slow_detect_root
+        cache = RootCache(max_size=2)
+        centos8, ubuntu, alpine = [self.roots[root_name] for root_name in ROOT_NAMES]
+        cache.get(centos8)
+        cache.get(ubuntu)
+        cache.get(centos8)
+        # Evicts ubuntu, the least recently used entry.
+        cache.get(alpine)
+        self.assertEqual(2, len(cache))
+        cache.get(centos8)
+        cache.get(ubuntu)
+        self.assertEqual(['centos8', 'ubuntu20.04', 'alpine3.14', 'ubuntu20.04'],
+                         self.detected_roots)
+
+        cache.invalidate(ubuntu)
+        cache.get(ubuntu)
+        cache.invalidate()
+        self.assertEqual(0, len(cache))
+        cache.get(alpine)
+        self.assertEqual(['ubuntu20.04', 'alpine3.14'], self.detected_roots[4:])
+
+    def test_validation(self) -> None:
+        cache = RootCache()
+        root = self.roots['centos8']
+        sys_conf = cache.get(root)
+        os_release_path = os.path.join(root, 'etc', 'os-release')
+        with open(os_release_path) as os_release_file:
+            os_release_text = os_release_file.read()
+        with open(os_release_path, 'w') as os_release_file:
+            os_release_file.write(os_release_text.replace('VERSION_ID="8"', 'VERSION_ID="9"'))
+
+        self.assertIs(sys_conf, cache.get(root))
+        self.assertEqual('centos9', cache.get(root, validate=True).short_os_name_and_version())
+
+    def test_from_local_system(self) -> None:
+        try:
+            root = self.roots['ubuntu20.04']
+            sys_conf = SysConfiguration.from_local_system(root)
+            self.assertIs(sys_conf, SysConfiguration.from_local_system(root))
+            if sys_conf.is_linux():
+                self.assertEqual('ubuntu20.04', sys_conf.short_os_name_and_version())
+            root_cache.invalidate(root)
+            self.assertIsNot(sys_conf, SysConfiguration.from_local_system(root))
+        finally:
+            root_cache.invalidate()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from contextlib import redirect_stderr, redirect_stdout
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Tuple
+from unittest import mock
+
+from sys_detection import SysConfiguration
+
+
+SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'benchmarks', 'run_benchmarks.py')
+
+BASELINE_METRICS: Dict[str, Tuple[float, str]] = {
+    'sys_configuration.from_etc_dir': (20.0, 'us'),
+    'cli.cold_start': (50.0, 'ms'),
+}
+
+
+def load_script() -> ModuleType:
+    spec = importlib.util.spec_from_file_location('run_benchmarks', SCRIPT_PATH)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore
+    return module
+
+
+def make_results(metrics: Dict[str, Tuple[float, str]]) -> Dict[str, Any]:
+    return dict(metrics={
+        name: dict(value=value, unit=unit) for name, (value, unit) in metrics.items()
+    })
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    def setUp(self) -> None:
+        self.script = load_script()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.baseline_path = os.path.join(self.tmp_dir.name, 'baseline.json')
+        with open(self.baseline_path, 'w') as baseline_file:
+            json.dump(make_results(BASELINE_METRICS), baseline_file)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def compare(self, metrics: Dict[str, Tuple[float, str]]) -> Tuple[List[str], str]:
+        report = io.StringIO()
+        with redirect_stderr(report):
+            regressions = self.script.compare(  # type: ignore
+                make_results(metrics), make_results(BASELINE_METRICS), 0.2)
+        return regressions, report.getvalue()
+
+    def test_compare_pass(self) -> None:
+        # Faster, and slower but within the threshold.
+        regressions, report = self.compare({
+            'sys_configuration.from_etc_dir': (15.0, 'us'),
+            'cli.cold_start': (59.0, 'ms'),
+            'new.metric': (1.0, 'us'),
+        })
+        self.assertEqual([], regressions)
+        self.assertNotIn('REGRESSION', report)
+        self.assertIn('new.metric', report)
+        self.assertIn('(no baseline)', report)
+
+    def test_compare_regression(self) -> None:
+        regressions, report = self.compare({
+            'sys_configuration.from_etc_dir': (25.0, 'us'),
+            'cli.cold_start': (50.0, 'ms'),
+        })
+        self.assertEqual(['sys_configuration.from_etc_dir'], regressions)
+        regression_lines = [line for line in report.splitlines() if 'REGRESSION' in line]
+        self.assertEqual(1, len(regression_lines))
+        self.assertIn('+25.0%', regression_lines[0])
+
+    def test_no_cached_results(self) -> None:
+        """
+        The benchmarks of values that SysConfiguration caches compute them on every call.
+        """
+        def call_twice(func: Callable[[], Any], num_items: int, repeat: int, number: int) -> float:
+            func()
+            func()
+            return 1.0
+
+        num_items = len(self.script.get_etc_dirs())  # type: ignore
+        with mock.patch.object(self.script, 'time_per_item_us', side_effect=call_twice), \
+                mock.patch.object(self.script, 'time_cli_cold_start_ms', return_value=1.0), \
+                mock.patch.object(
+                    SysConfiguration, 'short_os_name', autospec=True,
+                    side_effect=lambda sys_conf: 'os') as short_os_name:
+            self.script.run_benchmarks(quick=True)  # type: ignore
+        # Two benchmarks, each called twice.
+        self.assertEqual(4 * num_items, short_os_name.call_count)
+
+    def run_main(self, metrics: Dict[str, Tuple[float, str]]) -> Tuple[int, str]:
+        """
+        Runs the script in compare mode with the given benchmark results, and returns the exit
+        status and the standard error output.
+        """
+        argv = ['run_benchmarks.py', '--compare', self.baseline_path, '--threshold', '0.2']
+        stderr = io.StringIO()
+        exit_code = 0
+        with mock.patch.object(self.script, 'run_benchmarks', return_value=metrics), \
+                mock.patch('sys.argv', argv), \
+                redirect_stdout(io.StringIO()), redirect_stderr(stderr):
+            try:
+                self.script.main()  # type: ignore
+            except SystemExit as ex:
+                exit_code = ex.code if isinstance(ex.code, int) else 1
+        return exit_code, stderr.getvalue()
+
+    def test_main_pass(self) -> None:
+        exit_code, stderr = self.run_main(BASELINE_METRICS)
+        self.assertEqual(0, exit_code)
+        self.assertNotIn('Regressed', stderr)
+
+    def test_main_regression(self) -> None:
+        exit_code, stderr = self.run_main({
+            'sys_configuration.from_etc_dir': (20.0, 'us'),
+            'cli.cold_start': (100.0, 'ms'),
+        })
+        self.assertEqual(1, exit_code)
+        self.assertIn('Regressed by more than 20%: cli.cold_start', stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from sys_detection import SysConfiguration, stats
+from sys_detection.disk_cache import DiskCache
+from sys_detection.root_cache import RootCache
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+class TestStats(unittest.TestCase):
+    def tearDown(self) -> None:
+        stats.disable()
+        stats.reset()
+
+    def test_disabled(self) -> None:
+        stats.reset()
+        SysConfiguration.from_etc_dir(
+            'Linux', 'x86_64', os.path.join(TEST_DATA_DIR, 'centos7', 'etc'))
+        self.assertEqual(stats.Stats(timers={}, counters={}), stats.get_stats())
+
+    def test_from_etc_dir(self) -> None:
+        etc_dir_path = os.path.join(TEST_DATA_DIR, 'centos7', 'etc')
+        os_release_size = os.path.getsize(os.path.join(etc_dir_path, 'os-release'))
+        redhat_release_size = os.path.getsize(os.path.join(etc_dir_path, 'redhat-release'))
+
+        stats.enable()
+        for _ in range(2):
+            SysConfiguration.from_etc_dir('Linux', 'x86_64', etc_dir_path)
+        collected_stats = stats.get_stats()
+        for stage in ['from_etc_dir', 'os_release.read', 'os_release.parse',
+                      'redhat_release.read']:
+            self.assertEqual(2, collected_stats.timers[stage].calls, msg=stage)
+        self.assertGreaterEqual(
+            collected_stats.timers['from_etc_dir'].total_sec,
+            collected_stats.timers['os_release.parse'].total_sec)
+        self.assertEqual(4, collected_stats.counters['files_read'])
+        self.assertEqual(
+            2 * (os_release_size + redhat_release_size), collected_stats.counters['bytes_read'])
+        self.assertEqual(2 * os_release_size, collected_stats.counters['bytes_parsed'])
+        self.assertIn('from_etc_dir', collected_stats.format())
+
+        stats.enable()
+        self.assertEqual({}, stats.get_stats().counters)
+
+    def test_caches(self) -> None:
+        base_dir = os.path.join(TEST_DATA_DIR, 'ubuntu20.04')
+        stats.enable()
+        root_cache = RootCache()
+        for _ in range(3):
+            root_cache.get(base_dir)
+        counters = stats.get_stats().counters
+        self.assertEqual(1, counters['root_cache.misses'])
+        self.assertEqual(2, counters['root_cache.hits'])
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            disk_cache = DiskCache(cache_dir)
+            for _ in range(2):
+                disk_cache.get_sys_conf(base_dir)
+        collected_stats = stats.get_stats()
+        self.assertEqual(1, collected_stats.counters['disk_cache.misses'])
+        self.assertEqual(1, collected_stats.counters['disk_cache.hits'])
+        self.assertEqual(2, collected_stats.timers['disk_cache.load'].calls)
+        self.assertEqual(1, collected_stats.timers['disk_cache.store'].calls)
+        self.assertEqual(collected_stats.counters, collected_stats.to_dict()['counters'])
+
+    def test_lazy_values(self) -> None:
+        sys_conf = SysConfiguration.from_etc_dir(
+            'Linux', 'x86_64', os.path.join(TEST_DATA_DIR, 'ubuntu20.04', 'etc'))
+        stats.enable()
+        for _ in range(2):
+            sys_conf.libc()
+        self.assertEqual(1, stats.get_stats().timers['lazy.libc'].calls)
+
+    def test_cli_profile(self) -> None:
+        result = subprocess.run(
+            [sys.executable, '-m', 'sys_detection', '--profile'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True)
+        # The breakdown does not pollute the output, which can still be captured by scripts.
+        self.assertEqual(1, len(result.stdout.splitlines()))
+        self.assertIn('from_etc_dir', result.stderr)
+        self.assertIn('files_read', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from typing import List
+from unittest import mock
+
+from sys_detection import SysConfiguration, toolchains
+from sys_detection.toolchains import (
+    Toolchain, discover_toolchains, find_compiler_candidates, find_toolchain)
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+GCC9_VERSION_OUTPUT = """gcc (Ubuntu 9.4.0-1ubuntu1~20.04.1) 9.4.0
+Copyright (C) 2019 Free Software Foundation, Inc.
+"""
+GCC11_VERSION_OUTPUT = "gcc-11 (GCC) 11.2.1 20220127 (Red Hat 11.2.1-9)\n"
+CLANG11_VERSION_OUTPUT = """clang version 11.1.0
+Target: x86_64-unknown-linux-gnu
+"""
+APPLE_CLANG_VERSION_OUTPUT = "Apple clang version 15.0.0 (clang-1500.1.0.2.5)\n"
+
+
+@unittest.skipIf(sys.platform == 'win32', "Fake compilers are shell scripts")
+class TestToolchains(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.bin_dir = os.path.join(self.tmp_dir.name, 'bin')
+        self.llvm_bin_dir = os.path.join(self.tmp_dir.name, 'llvm', 'bin')
+        self.cache_dir = os.path.join(self.tmp_dir.name, 'cache')
+        self.log_path = os.path.join(self.tmp_dir.name, 'calls.log')
+        os.makedirs(self.bin_dir)
+        os.makedirs(self.llvm_bin_dir)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def write_compiler(
+            self, dir_path: str, name: str, version_output: str, delay_sec: float = 0) -> str:
+        """
+        Writes a fake compiler that logs its invocations and prints the given version output.
+        """
+        path = os.path.join(dir_path, name)
+        with open(path, 'w') as script_file:
+            script_file.write('#!/bin/sh\n')
+            script_file.write('echo "$0" >>"%s"\n' % self.log_path)
+            if delay_sec:
+                script_file.write('sleep %s\n' % delay_sec)
+            script_file.write("cat <<'EOF'\n%sEOF\n" % version_output)
+        os.chmod(path, 0o755)
+        return path
+
+    def get_calls(self) -> List[str]:
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path) as log_file:
+            return log_file.read().split()
+
+    def discover(self) -> List[Toolchain]:
+        return discover_toolchains([self.bin_dir, self.llvm_bin_dir], cache_dir=self.cache_dir)
+
+    def test_discovery(self) -> None:
+        gcc_path = self.write_compiler(self.bin_dir, 'gcc', GCC9_VERSION_OUTPUT)
+        gcc11_path = self.write_compiler(self.bin_dir, 'gcc-11', GCC11_VERSION_OUTPUT)
+        clang_path = self.write_compiler(self.llvm_bin_dir, 'clang', CLANG11_VERSION_OUTPUT)
+        # Not compilers, or not recognized.
+        self.write_compiler(self.bin_dir, 'gcc-ar', 'GNU ar (GNU Binutils) 2.38\n')
+        self.write_compiler(self.bin_dir, 'clang-format', 'clang-format version 14.0.0\n')
+        self.write_compiler(self.bin_dir, 'clang-13', 'Segmentation fault\n')
+        # The same compiler under another name is only probed once.
+        os.symlink(clang_path, os.path.join(self.llvm_bin_dir, 'clang-11'))
+
+        self.assertEqual([
+            Toolchain('gcc', '9.4.0', gcc_path),
+            Toolchain('gcc', '11.2.1', gcc11_path),
+            Toolchain('clang', '11.1.0', clang_path),
+        ], self.discover())
+        self.assertEqual(
+            [os.path.join(self.bin_dir, 'clang-13'), gcc_path, gcc11_path, clang_path],
+            find_compiler_candidates([self.bin_dir, self.llvm_bin_dir]))
+
+        toolchain = find_toolchain(
+            'clang', [self.bin_dir, self.llvm_bin_dir], cache_dir=self.cache_dir)
+        assert toolchain is not None
+        sys_conf = SysConfiguration.from_etc_dir(
+            'Linux', 'x86_64', os.path.join(TEST_DATA_DIR, 'centos7', 'etc'))
+        self.assertEqual(
+            'centos7-clang11-x86_64',
+            sys_conf.id_for_packaging(mid_part=[toolchain.mid_part_token()]))
+        self.assertIsNone(find_toolchain('gcc', [self.llvm_bin_dir], use_cache=False))
+        with self.assertRaises(ValueError):
+            find_toolchain('icc', [self.bin_dir])
+
+    def test_apple_clang_as_gcc(self) -> None:
+        gcc_path = self.write_compiler(self.bin_dir, 'gcc', APPLE_CLANG_VERSION_OUTPUT)
+        self.assertEqual([Toolchain('clang', '15.0.0', gcc_path)], self.discover())
+
+    def test_cache(self) -> None:
+        gcc_path = self.write_compiler(self.bin_dir, 'gcc', GCC9_VERSION_OUTPUT)
+        clang_path = self.write_compiler(self.bin_dir, 'clang', CLANG11_VERSION_OUTPUT)
+        toolchains = self.discover()
+        self.assertEqual(2, len(toolchains))
+        self.assertEqual(sorted([gcc_path, clang_path]), sorted(self.get_calls()))
+
+        # Nothing is run again while the compilers do not change.
+        self.assertEqual(toolchains, self.discover())
+        self.assertEqual(2, len(self.get_calls()))
+
+        # Only the replaced compiler is run again.
+        self.write_compiler(self.bin_dir, 'gcc', GCC11_VERSION_OUTPUT + '\n' * 10)
+        self.assertEqual(
+            ['11.1.0', '11.2.1'], [toolchain.version for toolchain in self.discover()])
+        self.assertEqual([gcc_path], self.get_calls()[2:])
+
+        # Without the cache, the compilers are always run.
+        discover_toolchains([self.bin_dir], use_cache=False)
+        self.assertEqual(5, len(self.get_calls()))
+
+    def write_wrapper(self, dir_path: str, name: str, compiler_dir_path: str) -> str:
+        """
+        Writes a wrapper that runs the compiler with the name it is invoked as from the given
+        directory, like ccache does with the next compiler on PATH.
+        """
+        path = os.path.join(dir_path, name)
+        with open(path, 'w') as script_file:
+            script_file.write('#!/bin/sh\n')
+            script_file.write('exec "%s/$(basename "$0")" "$@"\n' % compiler_dir_path)
+        os.chmod(path, 0o755)
+        return path
+
+    def test_ccache_wrapper(self) -> None:
+        real_bin_dir = os.path.join(self.tmp_dir.name, 'real_bin')
+        os.makedirs(real_bin_dir)
+        self.write_compiler(real_bin_dir, 'gcc', GCC9_VERSION_OUTPUT)
+        self.write_compiler(real_bin_dir, 'clang', CLANG11_VERSION_OUTPUT)
+        ccache_path = self.write_wrapper(self.tmp_dir.name, 'ccache', real_bin_dir)
+        gcc_path = os.path.join(self.bin_dir, 'gcc')
+        clang_path = os.path.join(self.bin_dir, 'clang')
+        os.symlink(ccache_path, gcc_path)
+        os.symlink(ccache_path, clang_path)
+
+        # Symlinks to the same wrapper are different compilers.
+        self.assertEqual([
+            Toolchain('clang', '11.1.0', clang_path),
+            Toolchain('gcc', '9.4.0', gcc_path),
+        ], self.discover())
+
+        # The compiler behind the unchanged wrapper is upgraded.
+        self.write_compiler(real_bin_dir, 'gcc', GCC11_VERSION_OUTPUT + '\n' * 10)
+        self.assertEqual(
+            ['11.1.0', '11.2.1'], [toolchain.version for toolchain in self.discover()])
+
+    def test_cache_expiry(self) -> None:
+        real_bin_dir = os.path.join(self.tmp_dir.name, 'real_bin')
+        os.makedirs(real_bin_dir)
+        self.write_compiler(real_bin_dir, 'gcc', GCC9_VERSION_OUTPUT)
+        # A wrapper script that is not recognized as one.
+        self.write_wrapper(self.bin_dir, 'gcc', real_bin_dir)
+        self.assertEqual(['9.4.0'], [toolchain.version for toolchain in self.discover()])
+
+        self.write_compiler(real_bin_dir, 'gcc', GCC11_VERSION_OUTPUT + '\n' * 10)
+        self.assertEqual(['9.4.0'], [toolchain.version for toolchain in self.discover()])
+        self.assertEqual(1, len(self.get_calls()))
+        with mock.patch.object(toolchains, 'CACHE_TTL_SEC', 0):
+            self.assertEqual(['11.2.1'], [toolchain.version for toolchain in self.discover()])
+        self.assertEqual(2, len(self.get_calls()))
+
+    def test_parallel_probing(self) -> None:
+        delay_sec = 1.0
+        for i in range(4):
+            self.write_compiler(
+                self.bin_dir, 'gcc-%d' % (i + 5), GCC9_VERSION_OUTPUT, delay_sec=delay_sec)
+        start_time = time.monotonic()
+        self.assertEqual(4, len(discover_toolchains([self.bin_dir], use_cache=False)))
+        self.assertLess(time.monotonic() - start_time, 3 * delay_sec)
+
+    def test_cli(self) -> None:
+        self.write_compiler(self.bin_dir, 'gcc', GCC9_VERSION_OUTPUT)
+        env = dict(os.environ, PATH=self.bin_dir + os.pathsep + os.environ.get('PATH', ''))
+        result = subprocess.run(
+            [sys.executable, '-m', 'sys_detection', '--with-toolchain', 'gcc',
+             '--cache-dir', self.cache_dir],
+            stdout=subprocess.PIPE,
+            env=env,
+            universal_newlines=True,
+            check=True)
+        self.assertRegex(result.stdout.strip(), '-gcc9-[^-]+$')
+
+
+if __name__ == '__main__':
+    unittest.main()
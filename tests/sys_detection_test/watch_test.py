@@ -0,0 +1,117 @@
+# Copyright (c) Yugabyte, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from unittest import mock
+
+from sys_detection import SysConfiguration
+from sys_detection.watch import ConfigurationWatcher, watch
+
+from sys_detection_test.sys_detection_test import TEST_DATA_DIR
+
+
+TIMEOUT_SEC = 10
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.etc_dir = os.path.join(self.root, 'etc')
+        shutil.copytree(os.path.join(TEST_DATA_DIR, 'centos7', 'etc'), self.etc_dir)
+        self.changes: 'queue.Queue[SysConfiguration]' = queue.Queue()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def upgrade(self, from_dir_name: str, to_dir_name: str) -> None:
+        """
+        Replaces the configuration files atomically, like a package manager does.
+        """
+        for file_name in ['os-release', 'redhat-release']:
+            target_path = os.path.realpath(os.path.join(self.etc_dir, file_name))
+            shutil.copy(os.path.join(TEST_DATA_DIR, to_dir_name, 'etc', file_name),
+                        target_path + '.new')
+            os.replace(target_path + '.new', target_path)
+
+    def start_watcher(self, use_inotify: bool) -> ConfigurationWatcher:
+        watcher = watch(
+            self.changes.put, base_dir=self.root, poll_interval_sec=0.05, use_inotify=use_inotify)
+        sys_conf = watcher.sys_conf
+        assert sys_conf is not None
+        self.assertEqual('centos7', sys_conf.short_os_name_and_version())
+        return watcher
+
+    def check_upgrade(self, use_inotify: bool) -> None:
+        with self.start_watcher(use_inotify):
+            self.upgrade('centos7', 'centos8')
+            sys_conf = self.changes.get(timeout=TIMEOUT_SEC)
+            # The callback may have been called for an intermediate state in which only some of
+            # the files were replaced, in which case it is called again.
+            time.sleep(0.3)
+            while not self.changes.empty():
+                sys_conf = self.changes.get_nowait()
+            self.assertEqual('centos8', sys_conf.short_os_name_and_version())
+            self.assertTrue(sys_conf.is_redhat_family())
+            # The memoized configuration is invalidated too.
+            memoized_sys_conf = SysConfiguration.from_local_system(self.root)
+            self.assertEqual('centos8', memoized_sys_conf.short_os_name_and_version())
+
+            # Touching the files without changing the configuration does not fire the callback.
+            os.utime(os.path.join(self.etc_dir, 'os-release'))
+            time.sleep(0.3)
+            self.assertTrue(self.changes.empty())
+
+    def test_polling(self) -> None:
+        self.check_upgrade(use_inotify=False)
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify is only available on Linux")
+    def test_inotify(self) -> None:
+        # Loading the C library does not run any programs, e.g. ldconfig.
+        with mock.patch.object(subprocess, 'Popen', side_effect=AssertionError), \
+                self.start_watcher(use_inotify=True) as watcher:
+            self.assertTrue(watcher.uses_inotify)
+        self.check_upgrade(use_inotify=True)
+
+    def test_symlinked_os_release(self) -> None:
+        # E.g. /etc/os-release is a link to /usr/lib/os-release on many distributions.
+        usr_lib_dir = os.path.join(self.root, 'usr', 'lib')
+        os.makedirs(usr_lib_dir)
+        os.replace(os.path.join(self.etc_dir, 'os-release'),
+                   os.path.join(usr_lib_dir, 'os-release'))
+        os.symlink('../usr/lib/os-release', os.path.join(self.etc_dir, 'os-release'))
+        self.check_upgrade(use_inotify=True)
+
+    def test_check(self) -> None:
+        watcher = ConfigurationWatcher(self.changes.put, base_dir=self.root)
+        try:
+            watcher.start()
+            self.assertIsNone(watcher.check())
+        finally:
+            watcher.stop()
+        self.upgrade('centos7', 'centos8')
+        sys_conf = watcher.check()
+        assert sys_conf is not None
+        self.assertEqual('centos8', sys_conf.short_os_name_and_version())
+        self.assertEqual(sys_conf, self.changes.get_nowait())
+
+
+if __name__ == '__main__':
+    unittest.main()